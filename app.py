@@ -1,8 +1,5 @@
 import streamlit as st
-import geopandas as gpd
 from shapely.geometry import Point
-import pandas as pd
-import fiona
 from src.models.zone import Zone
 from src.models.resource import Resource
 from src.models.allocation import ResourceAllocator
@@ -10,6 +7,10 @@ from src.visualization.map import DamageMap
 from src.visualization.dashboard import Dashboard
 
 def load_data():
+    # geopandas/fiona are only needed to read the KML file
+    import geopandas as gpd
+    import fiona
+
     # Load municipality boundaries using fiona
     fiona.drvsupport.supported_drivers['KML'] = 'rw'
     
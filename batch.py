@@ -0,0 +1,60 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from src.utils.scenario_io import find_scenarios
+from src.utils.pipeline import ALLOCATION_MODES, prepare_road_router, run_scenario_file
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Executa o fluxo completo (pontuação, alocação, rotas e previsão) sem Streamlit."
+    )
+    parser.add_argument("scenarios", help="Arquivo de cenário JSON ou diretório com cenários")
+    parser.add_argument("-o", "--output", default="output", help="Diretório de saída dos arquivos Parquet")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(),
+                        help="Número de processos (padrão: número de CPUs)")
+    parser.add_argument("--roads", help="Malha viária (.osm.pbf, .osm ou .geojson) para rotas pelas ruas")
+    parser.add_argument("--allocation", choices=ALLOCATION_MODES, default="sequential",
+                        help="Alocação sequencial ou por regiões em paralelo com reconciliação (padrão: sequential)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    scenarios = find_scenarios(args.scenarios)
+    if not scenarios:
+        print(f"Nenhum cenário encontrado em {args.scenarios}", file=sys.stderr)
+        return 1
+
+    road_router_dir = prepare_road_router(args.roads, args.output) if args.roads else None
+
+    failures = 0
+    workers = max(1, min(args.workers or 1, len(scenarios)))
+    # CPUs que sobram para as regiões de cada cenário na alocação particionada
+    partition_workers = max(1, (args.workers or 1) // workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_scenario_file, path, args.output, road_router_dir, args.allocation,
+                                   partition_workers): path for path in scenarios}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"{path.name}: erro - {e}", file=sys.stderr)
+                continue
+            print(f"{summary['scenario']}: {summary['allocations']} alocações, "
+                  f"{summary['routes']} passos de rota, {summary['predictions']} previsões")
+
+    return 1 if failures else 0
+
+
+# Run the batch pipeline
+if __name__ == "__main__":
+    sys.exit(main())
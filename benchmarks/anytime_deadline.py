@@ -0,0 +1,88 @@
+"""
+Verifica que a alocação anytime (src/models/anytime.py) respeita o prazo em
+cenários grandes e mostra a qualidade obtida em cada prazo, tanto no solver quanto
+na chamada completa de `ResourceAllocator.allocate_anytime` (preparação das zonas e
+aplicação do plano incluídas).
+
+    python benchmarks/anytime_deadline.py --sizes 10000 100000 1000000 --deadlines 0.05 0.2 1.0
+
+Sai com código 1 se alguma execução não entregar o plano guloso completo ou
+ultrapassar o prazo além da tolerância (o plano guloso e sua aplicação são sempre
+produzidos; só conta o atraso além deles).
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from shapely.geometry import Point
+from src.models.allocation import ResourceAllocator
+from src.models.anytime import solve_anytime
+from src.models.resource import Resource
+from src.models.zone import Zone
+
+
+def make_scenario(size: int, rng: np.random.Generator):
+    location = Point(-44.2, -20.1)
+    zones = [Zone(id=f"z{i}", name=f"Zona {i}", geometry=location, population=1000, damage_level=2.0,
+                  priority_score=priority) for i, priority in enumerate(rng.random(size).tolist())]
+    resources = [Resource(id=f"r{k}", name=f"Recurso {k}", type="Ambulância", capacity=capacity,
+                          location=location)
+                 for k, capacity in enumerate(rng.integers(1, 6, max(1, size // 10)).tolist())]
+    return zones, resources
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Aderência ao prazo da alocação anytime")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="Números de zonas (recursos = 10%% das zonas)")
+    parser.add_argument("--deadlines", type=float, nargs="+", default=[0.05, 0.2, 1.0])
+    parser.add_argument("--scenario-sizes", type=int, nargs="+", default=[10_000, 100_000],
+                        help="Números de zonas para a chamada completa com objetos Zone e Resource")
+    parser.add_argument("--tolerance", type=float, default=0.02, help="Atraso aceito, em segundos")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    violations = 0
+    print(f"{'zonas':>9} {'prazo':>7} {'tempo':>7} {'t.guloso':>8} {'guloso':>7} {'final':>7} {'movimentos':>10}")
+    for size in args.sizes:
+        priorities = rng.random(size)
+        capacities = rng.integers(1, 6, max(1, size // 10))
+        # Prazo zero: só o plano guloso, referência da cobertura que toda execução deve atingir
+        greedy = solve_anytime(priorities, capacities, 0.0).trace[0][1]
+        for deadline in args.deadlines:
+            result = solve_anytime(priorities, capacities, deadline)
+            violations += _report(size, deadline, result, args.tolerance, greedy,
+                                  f"{result.greedy_seconds:>8.3f} {result.trace[0][1]:>7.3f} "
+                                  f"{result.score:>7.3f} {result.moves:>10}")
+
+    print("\nchamada completa (ResourceAllocator.allocate_anytime)")
+    print(f"{'zonas':>9} {'prazo':>7} {'tempo':>7} {'t.guloso':>8} {'aplicação':>9} {'final':>7} "
+          f"{'atribuições':>11}")
+    for size in args.scenario_sizes:
+        for deadline in args.deadlines:
+            # Objetos novos a cada execução: a alocação altera zonas e recursos
+            zones, resources = make_scenario(size, np.random.default_rng(size))
+            greedy = solve_anytime([zone.priority_score for zone in zones],
+                                   [resource.capacity for resource in resources], 0.0).trace[0][1]
+            result = ResourceAllocator().allocate_anytime(zones, resources, deadline)
+            assigned = sum(len(resource_ids) for resource_ids in result.plan.values())
+            violations += _report(size, deadline, result, args.tolerance, greedy,
+                                  f"{result.greedy_seconds:>8.3f} {result.apply_seconds:>9.3f} "
+                                  f"{result.score:>7.3f} {assigned:>11}")
+
+    sys.exit(1 if violations else 0)
+
+
+def _report(size: int, deadline: float, result, tolerance: float, greedy: float, columns: str) -> bool:
+    incomplete = result.trace[0][1] < greedy - 1e-9
+    late = result.overrun > tolerance
+    print(f"{size:>9} {deadline:>7.2f} {result.elapsed_seconds:>7.3f} {columns}"
+          f"{'  GULOSO INCOMPLETO' if incomplete else ''}{'  ATRASADO' if late else ''}")
+    return incomplete or late
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Teste de carga da API local (src/api/server.py).
+
+Abre conexões concorrentes, envia requisições de rota e previsão e informa
+as latências p50/p99 e a vazão.
+
+    python -m src.api.server --scenario cenario.json &
+    python benchmarks/api_load_test.py --concurrency 64 --requests 50
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import List
+
+
+async def request(reader, writer, path: str, payload: dict) -> dict:
+    body = json.dumps(payload).encode('utf-8')
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body
+    )
+    await writer.drain()
+
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    data = await reader.readexactly(length)
+    if b' 200 ' not in status_line:
+        raise RuntimeError(f"{path}: {status_line.decode().strip()} {data.decode()}")
+    return json.loads(data)
+
+
+async def client(host: str, port: int, zone_ids: List[str], n_requests: int,
+                 endpoint: str, latencies: List[float]) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(n_requests):
+            if endpoint == 'route':
+                path, payload = '/route', {'source': random.choice(zone_ids), 'target': random.choice(zone_ids)}
+            else:
+                path, payload = '/predict', {'zone_ids': random.sample(zone_ids, min(5, len(zone_ids)))}
+            start = time.perf_counter()
+            await request(reader, writer, path, payload)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(args) -> None:
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    zone_ids = [f"zone_{i}" for i in range(1, 11)]
+    if args.zone_ids:
+        zone_ids = args.zone_ids.split(',')
+    await request(reader, writer, '/allocate', {})
+    writer.close()
+
+    for endpoint in args.endpoints.split(','):
+        latencies: List[float] = []
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            client(args.host, args.port, zone_ids, args.requests, endpoint, latencies)
+            for _ in range(args.concurrency)
+        ])
+        elapsed = time.perf_counter() - start
+        print(f"{endpoint:>8}: {len(latencies)} requisições em {elapsed:.2f}s "
+              f"({len(latencies) / elapsed:.0f} req/s) | "
+              f"p50 {percentile(latencies, 50) * 1000:.1f} ms | p99 {percentile(latencies, 99) * 1000:.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Teste de carga da API de despacho")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--concurrency", type=int, default=32, help="Conexões simultâneas")
+    parser.add_argument("--requests", type=int, default=50, help="Requisições por conexão")
+    parser.add_argument("--endpoints", default="route,predict")
+    parser.add_argument("--zone-ids", help="IDs de zonas separados por vírgula (padrão: zone_1..zone_10)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Mede o posicionamento de depósitos por k-medianas ponderadas
+(src/models/facility_location.py) e compara com bases sorteadas.
+
+    python benchmarks/depot_placement.py --zones 100000 --depots 50 --swaps 200
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from src.models.facility_location import place_depots
+from src.utils.distance import nearest
+
+
+def weighted_cost(points: np.ndarray, weights: np.ndarray, depots: np.ndarray) -> float:
+    _, distances = nearest(points, depots)
+    return float(np.dot(weights, distances) / weights.sum())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="K-medianas ponderadas para bases de recursos")
+    parser.add_argument("--zones", type=int, default=100_000)
+    parser.add_argument("--depots", type=int, default=50)
+    parser.add_argument("--swaps", type=int, default=200, help="Tentativas de troca local")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # Aglomerados urbanos espalhados por Minas Gerais, prioridades assimétricas
+    hubs = np.column_stack([rng.uniform(-50.0, -41.0, 40), rng.uniform(-22.5, -15.0, 40)])
+    points = hubs[rng.integers(0, len(hubs), args.zones)] + rng.normal(0, 0.3, (args.zones, 2))
+    weights = rng.beta(2, 5, args.zones)
+
+    random_depots = points[rng.choice(args.zones, args.depots, replace=False)]
+    print(f"bases sorteadas:     custo médio {weighted_cost(points, weights, random_depots):8.2f} km")
+
+    for swaps in (0, args.swaps):
+        start = time.perf_counter()
+        result = place_depots(points, weights, args.depots, swap_attempts=swaps, seed=1)
+        elapsed = time.perf_counter() - start
+        print(f"k-medianas, {swaps:>4} trocas: custo médio {weighted_cost(points, weights, result.depots):8.2f} km  "
+              f"({elapsed:.2f}s, {result.iterations} iterações, {result.swaps} trocas aceitas)")
+
+
+if __name__ == "__main__":
+    main()
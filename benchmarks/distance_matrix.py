@@ -0,0 +1,72 @@
+"""
+Mede o cálculo de matrizes de distância haversine (src/utils/distance.py) em blocos,
+comparando a memória temporária de pico com o limite configurado.
+
+    python benchmarks/distance_matrix.py --size 10000 --memory-cap-mb 64
+
+A saída float32 de 10k x 10k ocupa ~400 MB; com --memmap ela é gravada em disco e
+apenas os temporários dos blocos ficam em memória. Sai com código 1 se o pico de
+temporários ultrapassar o limite.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from src.utils.distance import haversine_matrix, nearest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Matriz de distâncias em blocos com limite de memória")
+    parser.add_argument("--size", type=int, default=10_000, help="Pontos em cada conjunto")
+    parser.add_argument("--memory-cap-mb", type=float, default=64.0,
+                        help="Limite de memória dos temporários por bloco")
+    parser.add_argument("--memmap", action="store_true", help="Grava a matriz em um np.memmap temporário")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # Pontos espalhados por uma área do tamanho de Minas Gerais
+    a = np.column_stack([rng.uniform(-51.0, -40.0, args.size), rng.uniform(-23.0, -14.0, args.size)])
+    b = np.column_stack([rng.uniform(-51.0, -40.0, args.size), rng.uniform(-23.0, -14.0, args.size)])
+    cap = int(args.memory_cap_mb * 1024 * 1024)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for dtype in (np.float32, np.float64):
+            if args.memmap:
+                out = np.memmap(os.path.join(tmp, f"distances_{np.dtype(dtype).name}.dat"),
+                                dtype=dtype, mode="w+", shape=(args.size, args.size))
+            else:
+                out = np.empty((args.size, args.size), dtype=dtype)
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            haversine_matrix(a, b, dtype=dtype, max_block_bytes=cap, out=out)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            status = "OK" if peak <= cap else "ACIMA DO LIMITE"
+            print(f"{np.dtype(dtype).name:>8}: {elapsed:6.2f}s  saída {out.nbytes / 2**20:7.1f} MB  "
+                  f"pico de temporários {peak / 2**20:6.1f} MB (limite {args.memory_cap_mb:.0f} MB)  {status}")
+            del out
+            if peak > cap:
+                sys.exit(1)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    nearest(a, b, max_block_bytes=cap)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f" nearest: {elapsed:6.2f}s  pico {peak / 2**20:6.1f} MB sem materializar a matriz")
+    if peak > cap:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Mede o tempo de importação dos módulos carregados antes da primeira renderização
+(`python -X importtime`) e verifica que dependências pesadas não são importadas
+de forma antecipada, nem pelos módulos nem pelas páginas do Streamlit (as
+importações de nível de módulo de cada página são lidas sem executá-la).
+
+    python benchmarks/import_time.py            # relatório de tempos
+    python benchmarks/import_time.py --check    # falha se algum módulo pesado for importado cedo
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+from typing import List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos do projeto importados no caminho até a primeira renderização
+STARTUP_MODULES = [
+    'src.models.zone',
+    'src.models.resource',
+    'src.models.allocation',
+    'src.models.ml_models',
+    'src.utils.data_loader',
+    'src.utils.resource_allocator',
+    'src.utils.snapshot',
+    'src.visualization.map',
+    'src.visualization.dashboard',
+    'src.visualization.render_cache',
+    'src.utils.scenario_cache',
+    'src.utils.scenario_store',
+    'src.utils.hexgrid',
+    'src.utils.report_stream',
+    'src.models.priority',
+    'src.models.dispatch_simulation',
+]
+
+# Scripts executados pelo Streamlit: página principal e páginas
+ENTRY_POINTS = [
+    'src/app.py',
+    'src/pages/1_Data_Input.py',
+    'src/pages/2_Dashboard.py',
+]
+
+# Só devem ser carregados pelo código que realmente os usa
+HEAVY_MODULES = ['sklearn', 'networkx', 'geopandas', 'fiona', 'folium', 'plotly']
+
+
+def _run(args: List[str]) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable] + args, cwd=PROJECT_ROOT, capture_output=True, text=True)
+
+
+def eagerly_imported(*modules: str) -> Optional[List[str]]:
+    """Retorna os módulos pesados carregados ao importar `modules` (None se a importação falhar)."""
+    code = (
+        "import importlib, json, sys\n"
+        f"for module in {list(modules)!r}:\n"
+        "    importlib.import_module(module)\n"
+        "print(json.dumps(sorted({name.split('.')[0] for name in sys.modules})))"
+    )
+    result = _run(['-c', code])
+    if result.returncode != 0:
+        return None
+    loaded = set(json.loads(result.stdout.strip().splitlines()[-1]))
+    return [name for name in HEAVY_MODULES if name in loaded]
+
+
+def script_imports(path: str) -> List[str]:
+    """Módulos importados por um script ao ser executado (fora de funções), sem executá-lo."""
+    with open(os.path.join(PROJECT_ROOT, path), encoding='utf-8') as source:
+        tree = ast.parse(source.read(), path)
+    modules = []
+
+    def visit(node: ast.AST) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+                continue
+            if isinstance(child, ast.Import):
+                modules.extend(alias.name for alias in child.names)
+            elif isinstance(child, ast.ImportFrom) and child.module and not child.level:
+                modules.append(child.module)
+            visit(child)
+
+    visit(tree)
+    return list(dict.fromkeys(modules))
+
+
+def import_time_us(modules: List[str], repeat: int = 5) -> int:
+    """Melhor tempo cumulativo (µs) de `python -X importtime` para importar `modules`."""
+    code = "\n".join(f"try:\n    import {m}\nexcept ImportError:\n    pass" for m in modules)
+    best = None
+    for _ in range(repeat):
+        result = _run(['-X', 'importtime', '-c', code])
+        total = 0
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, name = line.split('|')
+            # Somente entradas de nível superior; as aninhadas já estão no cumulativo
+            if not name[1:].startswith(' '):
+                total += int(cumulative)
+        best = total if best is None else min(best, total)
+    return best
+
+
+def check() -> int:
+    failures = 0
+    for module in STARTUP_MODULES:
+        heavy = eagerly_imported(module)
+        if heavy is None:
+            print(f"SKIP  {module} (dependência não instalada)")
+        elif heavy:
+            failures += 1
+            print(f"FAIL  {module} importa antecipadamente: {', '.join(heavy)}")
+        else:
+            print(f"OK    {module}")
+    for path in ENTRY_POINTS:
+        modules = script_imports(path)
+        direct = [name for name in HEAVY_MODULES if any(m.split('.')[0] == name for m in modules)]
+        heavy = direct or eagerly_imported(*modules)
+        if heavy is None:
+            print(f"SKIP  {path} (dependência não instalada)")
+        elif heavy:
+            failures += 1
+            print(f"FAIL  {path} importa antecipadamente: {', '.join(heavy)}")
+        else:
+            print(f"OK    {path}")
+    return 1 if failures else 0
+
+
+def report(repeat: int) -> None:
+    available = [m for m in HEAVY_MODULES if _run(['-c', f"import {m}"]).returncode == 0]
+    lazy = import_time_us(STARTUP_MODULES, repeat)
+    eager = import_time_us(STARTUP_MODULES + available, repeat)
+
+    print(f"Dependências pesadas instaladas: {', '.join(available) or 'nenhuma'}")
+    print(f"Importação dos módulos de inicialização (lazy):     {lazy / 1000:8.1f} ms")
+    print(f"Importação com dependências pesadas antecipadas:    {eager / 1000:8.1f} ms")
+    if eager:
+        print(f"Redução no tempo até a primeira renderização:      {(1 - lazy / eager):8.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de tempo de importação")
+    parser.add_argument("--check", action="store_true", help="Falha se um módulo pesado for importado antecipadamente")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(check())
+    report(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Compara memória por objeto e custo de associação/remoção entre os modelos
+`Zone`/`Resource` (slots + conjunto ordenado de IDs) e o layout anterior
+(dataclass com __dict__ + lista).
+
+    python benchmarks/model_memory.py --n 100000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shapely.geometry import Point
+from src.models.zone import Zone
+from src.models.resource import Resource
+
+
+@dataclass
+class LegacyZone:
+    id: str
+    name: str
+    geometry: object
+    population: int
+    damage_level: float
+    infrastructure_damage: float = 0.0
+    accessibility: float = 0.0
+    critical_facilities: int = 0
+    historical_risk: float = 0.0
+    priority_score: float = 0.0
+    resources_allocated: List[str] = None
+
+    def __post_init__(self):
+        if self.resources_allocated is None:
+            self.resources_allocated = []
+
+
+@dataclass
+class LegacyResource:
+    id: str
+    name: str
+    type: str
+    capacity: int
+    location: object
+    assigned_zones: List[str] = None
+    is_available: bool = True
+
+    def __post_init__(self):
+        if self.assigned_zones is None:
+            self.assigned_zones = []
+
+    def assign_to_zone(self, zone_id: str) -> bool:
+        if self.is_available and zone_id not in self.assigned_zones:
+            self.assigned_zones.append(zone_id)
+            return True
+        return False
+
+    def remove_from_zone(self, zone_id: str) -> bool:
+        if zone_id in self.assigned_zones:
+            self.assigned_zones.remove(zone_id)
+            return True
+        return False
+
+
+def bytes_per_object(factory, n: int) -> float:
+    # Geometria compartilhada: mede apenas o custo do próprio modelo
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [factory(i) for i in range(n)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del objects
+    return total / n
+
+
+def assign_remove_seconds(resource, n: int) -> float:
+    zone_ids = [f"zone_{i}" for i in range(n)]
+    start = time.perf_counter()
+    for zone_id in zone_ids:
+        resource.assign_to_zone(zone_id)
+    for zone_id in zone_ids:
+        resource.remove_from_zone(zone_id)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Memória e custo de associação dos modelos")
+    parser.add_argument("--n", type=int, default=100000, help="Número de objetos/associações")
+    parser.add_argument("--legacy-n", type=int, default=20000,
+                        help="Associações no layout anterior (quadrático; use um valor menor)")
+    args = parser.parse_args()
+
+    geometry = Point(-44.0, -20.0).buffer(0.01)
+    location = Point(-44.0, -20.0)
+
+    zone_new = bytes_per_object(
+        lambda i: Zone(id=f"zone_{i}", name=f"Zona {i}", geometry=geometry, population=1000, damage_level=1.0),
+        args.n)
+    zone_old = bytes_per_object(
+        lambda i: LegacyZone(id=f"zone_{i}", name=f"Zona {i}", geometry=geometry, population=1000, damage_level=1.0),
+        args.n)
+    resource_new = bytes_per_object(
+        lambda i: Resource(id=f"R{i}", name=f"Recurso {i}", type="Ambulância", capacity=5, location=location),
+        args.n)
+    resource_old = bytes_per_object(
+        lambda i: LegacyResource(id=f"R{i}", name=f"Recurso {i}", type="Ambulância", capacity=5, location=location),
+        args.n)
+
+    print(f"Memória por zona:    {zone_old:7.0f} B -> {zone_new:7.0f} B ({1 - zone_new / zone_old:.0%} menor)")
+    print(f"Memória por recurso: {resource_old:7.0f} B -> {resource_new:7.0f} B "
+          f"({1 - resource_new / resource_old:.0%} menor)")
+
+    new_seconds = assign_remove_seconds(
+        Resource(id="R", name="R", type="Ambulância", capacity=args.n, location=location), args.n)
+    old_seconds = assign_remove_seconds(
+        LegacyResource(id="R", name="R", type="Ambulância", capacity=args.legacy_n, location=location), args.legacy_n)
+
+    print(f"Associar + remover {args.n} zonas (conjunto): {new_seconds:.3f}s "
+          f"({new_seconds / args.n * 1e9:.0f} ns/op)")
+    print(f"Associar + remover {args.legacy_n} zonas (lista):    {old_seconds:.3f}s "
+          f"({old_seconds / args.legacy_n * 1e9:.0f} ns/op)")
+
+
+if __name__ == "__main__":
+    main()
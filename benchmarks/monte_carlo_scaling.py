@@ -0,0 +1,60 @@
+"""
+Vazão da simulação de Monte Carlo (src/utils/simulation.py) por número de processos.
+
+    python benchmarks/monte_carlo_scaling.py --zones 200 --resources 60 --scenarios 4000
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from shapely.geometry import Point
+from src.models.zone import Zone
+from src.models.resource import Resource
+from src.utils.simulation import simulate_coverage
+
+
+def make_scenario(n_zones: int, n_resources: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    zones = []
+    for i in range(n_zones):
+        zone = Zone(
+            id=f"zone_{i}",
+            name=f"Zona {i}",
+            geometry=Point(-44 + rng.random(), -20 + rng.random()).buffer(0.01),
+            population=int(rng.integers(1000, 10000)),
+            damage_level=float(rng.uniform(0, 4))
+        )
+        zone.calculate_priority()
+        zones.append(zone)
+    resources = [
+        Resource(id=f"R{i}", name=f"Recurso {i}", type="Ambulância",
+                 capacity=int(rng.integers(1, 6)), location=Point(-44 + rng.random(), -20 + rng.random()))
+        for i in range(n_resources)
+    ]
+    return zones, resources
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Escalabilidade da simulação de Monte Carlo")
+    parser.add_argument("--zones", type=int, default=200)
+    parser.add_argument("--resources", type=int, default=60)
+    parser.add_argument("--scenarios", type=int, default=4000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    zones, resources = make_scenario(args.zones, args.resources)
+    workers = 1
+    baseline = None
+    while workers <= args.max_workers:
+        result = simulate_coverage(zones, resources, n_scenarios=args.scenarios, seed=42, workers=workers)
+        baseline = baseline or result.scenarios_per_second
+        print(f"{workers:3d} processos: {result.scenarios_per_second:9.0f} cenários/s "
+              f"(aceleração {result.scenarios_per_second / baseline:.2f}x)")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
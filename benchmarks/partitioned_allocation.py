@@ -0,0 +1,78 @@
+"""
+Compara a alocação sequencial (src/utils/resource_allocator.py) com a alocação por
+regiões em paralelo com reconciliação (src/utils/partitioned_allocation.py): tempo,
+aceleração por número de processos e qualidade do plano em relação ao sequencial.
+
+    python benchmarks/partitioned_allocation.py --zones 50000 --resources 5000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from shapely.geometry import Point
+from src.models.zone import Zone
+from src.models.resource import Resource
+from src.utils.partitioned_allocation import allocate_partitioned
+from src.utils.resource_allocator import ResourceAllocator
+
+# Fração mínima da prioridade atendida pelo plano sequencial que o plano por regiões deve atingir
+MIN_QUALITY = 0.98
+
+
+def make_scenario(n_zones: int, n_resources: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    # Zonas concentradas em alguns focos e bases espalhadas: as regiões ficam desequilibradas
+    hotspots = rng.uniform([-45.0, -21.0], [-43.0, -19.0], (5, 2))
+    centers = hotspots[rng.integers(0, len(hotspots), n_zones)] + rng.normal(0, 0.2, (n_zones, 2))
+    zones = []
+    for i, (lon, lat) in enumerate(centers.tolist()):
+        zone = Zone(id=f"z{i}", name=f"Zona {i}", geometry=Point(lon, lat),
+                    population=int(rng.integers(100, 2000)), damage_level=float(rng.uniform(0, 4)))
+        zone.calculate_priority()
+        zones.append(zone)
+    resources = [Resource(id=f"r{k}", name=f"Recurso {k}", type="Ambulância", capacity=int(rng.integers(50, 1000)),
+                          location=Point(rng.uniform(-45, -43), rng.uniform(-21, -19)))
+                 for k in range(n_resources)]
+    return zones, resources
+
+
+def quality(zones) -> float:
+    return sum(zone.priority_score for zone in zones if zone.resources_allocated)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Alocação sequencial x por regiões em paralelo")
+    parser.add_argument("--zones", type=int, default=50_000)
+    parser.add_argument("--resources", type=int, default=5_000)
+    parser.add_argument("--regions", type=int, default=None)
+    parser.add_argument("--method", choices=["grid", "kmedians"], default="grid")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    zones, resources = make_scenario(args.zones, args.resources)
+    start = time.perf_counter()
+    ResourceAllocator().allocate_resources(zones, resources)
+    sequential = time.perf_counter() - start
+    baseline = quality(zones)
+    print(f"{os.cpu_count()} CPUs; sequencial: {sequential:.2f}s, prioridade atendida {baseline:.1f}")
+
+    failed = False
+    for workers in args.workers:
+        zones, resources = make_scenario(args.zones, args.resources)
+        result = allocate_partitioned(zones, resources, regions=args.regions or max(args.workers),
+                                      method=args.method, workers=workers)
+        ratio = quality(zones) / baseline if baseline else 1.0
+        failed |= ratio < MIN_QUALITY
+        steps = ", ".join(f"{step} {seconds:.2f}s" for step, seconds in result.timings.items())
+        print(f"{workers} processo(s): {result.elapsed_seconds:.2f}s ({sequential / result.elapsed_seconds:.1f}x; "
+              f"{steps}), qualidade {ratio:.1%}, {result.reconciled} recursos reconciliados")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Mede a vazão da ingestão de relatórios de danos (src/utils/report_stream.py):
+um arquivo JSONL acompanhado como `tail -f` ou um socket TCP, com lotes aplicados
+incrementalmente às zonas.
+
+    python benchmarks/report_ingestion.py --zones 10000 --reports 200000
+    python benchmarks/report_ingestion.py --source socket
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from shapely.geometry import Point
+from src.models.zone import Zone
+from src.utils.report_stream import LiveDamageState, ReportIngestor
+
+
+def make_zones(n: int):
+    rng = np.random.default_rng(0)
+    zones = []
+    for i in range(n):
+        zone = Zone(id=f"z{i}", name=f"Zona {i}", geometry=Point(-44 + rng.random(), -20 + rng.random()),
+                    population=int(rng.integers(100, 20000)), damage_level=float(rng.uniform(0, 4)))
+        zone.calculate_priority()
+        zones.append(zone)
+    return zones
+
+
+def report_lines(n_reports: int, n_zones: int) -> bytes:
+    rng = np.random.default_rng(1)
+    zone_ids = rng.integers(0, n_zones, n_reports)
+    damage = rng.uniform(0, 4, n_reports)
+    infrastructure = rng.random(n_reports)
+    return "".join(
+        json.dumps({"zone_id": f"z{z}", "damage_level": round(d, 2), "infrastructure_damage": round(f, 2)}) + "\n"
+        for z, d, f in zip(zone_ids.tolist(), damage.tolist(), infrastructure.tolist())
+    ).encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Vazão da ingestão de relatórios de danos")
+    parser.add_argument("--zones", type=int, default=10_000)
+    parser.add_argument("--reports", type=int, default=200_000)
+    parser.add_argument("--source", choices=["file", "socket"], default="file")
+    args = parser.parse_args()
+
+    zones = make_zones(args.zones)
+    state = LiveDamageState(zones)
+    payload = report_lines(args.reports, args.zones)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "relatorios.jsonl")
+        open(path, "wb").close()
+        if args.source == "file":
+            ingestor = ReportIngestor(state, path=path).start()
+        else:
+            ingestor = ReportIngestor(state, port=0).start()
+
+        start = time.perf_counter()
+        if args.source == "file":
+            with open(path, "ab") as f:
+                f.write(payload)
+        else:
+            with socket.create_connection(("127.0.0.1", ingestor.port)) as connection:
+                connection.sendall(payload)
+
+        while state.reports_applied < args.reports and time.perf_counter() - start < 120:
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        ingestor.stop()
+
+    stats = ingestor.stats()
+    # Os agregados incrementais devem coincidir com o recálculo completo
+    expected_mean = np.mean([zone.damage_level for zone in zones])
+    drift = abs(state.aggregates()["average_damage"] - expected_mean)
+    print(f"{stats['applied']} relatórios em {elapsed:.2f}s ({stats['applied'] / elapsed:,.0f}/s), "
+          f"{stats['batches']} lotes, {stats['malformed']} malformados, desvio do dano médio {drift:.1e}")
+    if stats["applied"] < args.reports or drift > 1e-6:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
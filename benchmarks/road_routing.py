@@ -0,0 +1,88 @@
+"""
+Compara consultas ponto a ponto na hierarquia de contração (src/models/road_routing.py)
+com o Dijkstra simples sobre a mesma malha viária.
+
+    python benchmarks/road_routing.py --grid 150 --queries 200
+    python benchmarks/road_routing.py --network malha.osm.pbf --cache malha_ch.npz
+
+Sem --network, uma malha em grade (vias principais a cada 10 quadras) é gerada em
+GeoJSON e lida pelo importador. Sai com código 1 se algum custo divergir do Dijkstra.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from src.utils.road_network import load_road_network
+from src.models.road_routing import ContractionHierarchy
+
+
+def grid_geojson(size: int, path: str) -> None:
+    # Quadras de ~100 m em torno de Belo Horizonte
+    step = 0.001
+    rng = np.random.default_rng(0)
+    lon = -43.94 + np.arange(size)[:, None] * step + rng.normal(0, step / 10, (size, size))
+    lat = -19.92 + np.arange(size)[None, :] * step + rng.normal(0, step / 10, (size, size))
+    features = []
+    for line in range(size):
+        highway = 'primary' if line % 10 == 0 else 'residential'
+        for coordinates in (np.column_stack([lon[line], lat[line]]), np.column_stack([lon[:, line], lat[:, line]])):
+            features.append({'type': 'Feature', 'properties': {'highway': highway},
+                             'geometry': {'type': 'LineString', 'coordinates': coordinates.tolist()}})
+    with open(path, 'w') as f:
+        json.dump({'type': 'FeatureCollection', 'features': features}, f)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hierarquia de contração x Dijkstra")
+    parser.add_argument("--network", help="Malha viária (.osm.pbf, .osm, .geojson ou .npz)")
+    parser.add_argument("--grid", type=int, default=100, help="Lado da grade sintética")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--cache", help="Arquivo .npz para guardar/reutilizar a hierarquia")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.network:
+        network = load_road_network(args.network)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'grid.geojson')
+            grid_geojson(args.grid, path)
+            network = load_road_network(path)
+    print(f"malha: {network.n_nodes} nós, {network.n_edges} arestas, lida em {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    if args.cache and os.path.exists(args.cache):
+        hierarchy = ContractionHierarchy.load(args.cache)
+        print(f"hierarquia carregada em {time.perf_counter() - start:.2f}s")
+    else:
+        hierarchy = ContractionHierarchy.build(network)
+        print(f"pré-processamento: {time.perf_counter() - start:.2f}s, {hierarchy.n_shortcuts} atalhos")
+        if args.cache:
+            hierarchy.save(args.cache)
+
+    rng = np.random.default_rng(1)
+    pairs = rng.integers(0, network.n_nodes, (args.queries, 2)).tolist()
+
+    start = time.perf_counter()
+    ch_costs = [hierarchy.query(s, t)[0] for s, t in pairs]
+    ch_ms = (time.perf_counter() - start) / len(pairs) * 1000
+
+    start = time.perf_counter()
+    dijkstra_costs = [network.dijkstra(s, t)[0] for s, t in pairs]
+    dijkstra_ms = (time.perf_counter() - start) / len(pairs) * 1000
+
+    mismatches = sum(not np.isclose(a, b, rtol=1e-6) for a, b in zip(ch_costs, dijkstra_costs))
+    print(f"hierarquia: {ch_ms:8.3f} ms/consulta")
+    print(f"dijkstra:   {dijkstra_ms:8.3f} ms/consulta  (aceleração {dijkstra_ms / ch_ms:.1f}x)")
+    print(f"custos divergentes: {mismatches}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
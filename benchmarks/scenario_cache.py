@@ -0,0 +1,121 @@
+"""
+Mede o cache de cenários compartilhado entre sessões (src/utils/scenario_cache.py):
+memória de N sessões abrindo o mesmo cenário com e sem deduplicação, custo do hash
+de conteúdo e da cópia na primeira edição (copy-on-write), e a estimativa de
+memória usada pelo teto contra o RSS real de um processo novo (Linux).
+
+    python benchmarks/scenario_cache.py --zones 20000 --resources 2000 --sessions 20
+"""
+import argparse
+import gc
+import multiprocessing
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from shapely.geometry import Point
+from src.models.zone import Zone
+from src.models.resource import Resource
+from src.utils.scenario_cache import ScenarioCache
+
+# Faixa aceita para estimativa / RSS medido
+ESTIMATE_RANGE = (0.75, 1.25)
+
+
+def make_scenario(n_zones: int, n_resources: int, seed: int = 0):
+    # Mesma semente: cada sessão que "carrega" o cenário recebe objetos novos de mesmo conteúdo
+    rng = np.random.default_rng(seed)
+    coordinates = rng.uniform([-45.0, -21.0], [-43.0, -19.0], (n_zones, 2)).tolist()
+    zones = [Zone(id=f"z{i}", name=f"Zona {i}", geometry=Point(lon, lat),
+                  population=int(population), damage_level=float(damage))
+             for i, ((lon, lat), population, damage) in enumerate(zip(
+                 coordinates, rng.integers(100, 2000, n_zones).tolist(), rng.uniform(0, 4, n_zones).tolist()))]
+    resources = [Resource(id=f"r{k}", name=f"Recurso {k}", type="Ambulância", capacity=int(rng.integers(50, 1000)),
+                          location=Point(rng.uniform(-45, -43), rng.uniform(-21, -19)))
+                 for k in range(n_resources)]
+    return zones, resources
+
+
+def measure(function):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def resident_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def measure_resident(n_zones: int, n_resources: int, queue) -> None:
+    # Em um processo novo: o RSS não é afetado por memória já liberada de outras medições;
+    # inclui as geometrias no GEOS, que o tracemalloc não enxerga. Um cenário pequeno
+    # antes da medição tira do resultado os custos fixos (arenas, caches do numpy e shapely)
+    ScenarioCache().acquire(*make_scenario(100, 10)).release()
+    gc.collect()
+    before = resident_bytes()
+    cache = ScenarioCache()
+    lease = cache.acquire(*make_scenario(n_zones, n_resources))
+    gc.collect()
+    queue.put((resident_bytes() - before, cache.stats()['bytes_held'], len(lease.zones)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cache de cenários compartilhado entre sessões")
+    parser.add_argument("--zones", type=int, default=20_000)
+    parser.add_argument("--resources", type=int, default=2_000)
+    parser.add_argument("--sessions", type=int, default=20)
+    args = parser.parse_args()
+
+    sessions, private, elapsed = measure(
+        lambda: [make_scenario(args.zones, args.resources) for _ in range(args.sessions)])
+    print(f"{args.sessions} sessões sem cache: {private / 2**20:.1f} MB no heap do Python ({elapsed:.2f}s)")
+    del sessions
+
+    cache = ScenarioCache()
+    leases, shared, elapsed = measure(
+        lambda: [cache.acquire(*make_scenario(args.zones, args.resources)) for _ in range(args.sessions)])
+    stats = cache.stats()
+    print(f"{args.sessions} sessões com cache: {shared / 2**20:.1f} MB no heap do Python ({elapsed:.2f}s), "
+          f"{stats['entries']} cenário(s), taxa de acerto {stats['hit_rate']:.0%}, "
+          f"{stats['bytes_held'] / 2**20:.1f} MB estimados em cache")
+    print(f"memória: {private / max(shared, 1):.1f}x menor")
+
+    start = time.perf_counter()
+    zones, resources, _ = leases[0].edit()
+    print(f"cópia na primeira edição: {(time.perf_counter() - start) * 1000:.1f} ms")
+    zones[0].damage_level += 1
+    print(f"visão compartilhada intacta: {leases[1].zones[0].damage_level != zones[0].damage_level}")
+
+    if os.path.exists("/proc/self/statm"):
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        process = context.Process(target=measure_resident, args=(args.zones, args.resources, queue))
+        process.start()
+        resident, estimated, _ = queue.get()
+        process.join()
+        ratio = estimated / max(resident, 1)
+        print(f"um cenário: {estimated / 2**20:.1f} MB estimados, {resident / 2**20:.1f} MB de RSS ({ratio:.2f}x)")
+        if not ESTIMATE_RANGE[0] <= ratio <= ESTIMATE_RANGE[1]:
+            print("ERRO: estimativa de memória fora da faixa aceita")
+            sys.exit(1)
+
+    del leases
+    gc.collect()
+    cache.resize(0)
+    stats = cache.stats()
+    print(f"sem sessões e teto zero: {stats['entries']} cenário(s), {stats['evictions']} descartes")
+
+
+if __name__ == "__main__":
+    main()
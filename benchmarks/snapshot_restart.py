@@ -0,0 +1,120 @@
+"""
+Compara o reinício do aplicativo preparando os dados do zero (leitura do cenário,
+prioridades, grafo de rotas e alocação) com a abertura de um snapshot mapeado em
+memória (src/utils/snapshot.py). Cada medida roda em um processo novo, como um
+reinício real, e inclui o tempo de importação.
+
+    python benchmarks/snapshot_restart.py --zones 1000 --resources 200
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COLD_START = """
+from src.utils.scenario_io import load_scenario
+from src.models.ml_models import RouteOptimizer
+from src.utils.resource_allocator import ResourceAllocator
+zones, resources = load_scenario({scenario!r})
+for zone in zones:
+    zone.calculate_priority()
+optimizer = RouteOptimizer()
+optimizer.build_graph(zones, resources)
+ResourceAllocator().allocate_resources(zones, resources)
+"""
+
+SNAPSHOT_START = """
+from src.utils.snapshot import apply_allocation_plan, load_snapshot
+snapshot = load_snapshot({snapshot!r})
+zones, resources = snapshot.zones(), snapshot.resources()
+optimizer = snapshot.route_optimizer()
+apply_allocation_plan(zones, resources, snapshot.allocation_plan())
+{extra}"""
+
+# A primeira rota monta o grafo networkx a partir dos arrays do snapshot
+FIRST_ROUTE = "optimizer.find_optimal_route(zones[0].id, zones[-1].id)\n"
+
+# Só abre o snapshot e lê as colunas exibidas primeiro (sem criar objetos nem grafo)
+SNAPSHOT_METRICS = """
+from src.utils.snapshot import load_snapshot
+snapshot = load_snapshot({snapshot!r})
+total = int(snapshot.arrays['zone.population'].sum()), float(snapshot.arrays['zone.priority_score'].max())
+"""
+
+
+def write_scenario(path: str, n_zones: int, n_resources: int) -> None:
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    lon = rng.uniform(-44.5, -43.5, n_zones)
+    lat = rng.uniform(-20.3, -19.5, n_zones)
+    types = ["Ambulância", "Equipe de Resgate", "Hospitais de Campanha"]
+    data = {
+        "zones": [{"id": f"z{i}", "lon": lon[i], "lat": lat[i], "radius": 0.005,
+                   "population": int(rng.integers(100, 20000)), "damage_level": float(rng.uniform(0, 4)),
+                   "infrastructure_damage": float(rng.random()), "accessibility": float(rng.random())}
+                  for i in range(n_zones)],
+        "resources": [{"id": f"r{k}", "type": types[k % len(types)], "capacity": int(rng.integers(1, 50)),
+                       "lon": float(rng.uniform(-44.5, -43.5)), "lat": float(rng.uniform(-20.3, -19.5))}
+                      for k in range(n_resources)],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def timed_process(code: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, check=True)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reinício com e sem snapshot mapeado em memória")
+    parser.add_argument("--zones", type=int, default=1000)
+    parser.add_argument("--resources", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por modo (vale a menor)")
+    args = parser.parse_args()
+
+    sys.path.insert(0, PROJECT_ROOT)
+    from src.utils.scenario_io import load_scenario
+    from src.models.ml_models import RouteOptimizer
+    from src.utils.resource_allocator import ResourceAllocator
+    from src.utils.snapshot import save_snapshot
+
+    with tempfile.TemporaryDirectory() as workdir:
+        scenario = os.path.join(workdir, "cenario.json")
+        snapshot = os.path.join(workdir, "snapshot")
+        write_scenario(scenario, args.zones, args.resources)
+
+        zones, resources = load_scenario(scenario)
+        for zone in zones:
+            zone.calculate_priority()
+        optimizer = RouteOptimizer()
+        optimizer.build_graph(zones, resources)
+        allocation = ResourceAllocator().allocate_resources(zones, resources)
+        plan = {zone_id: [r.id for r in allocated] for zone_id, allocated in allocation.items()}
+        start = time.perf_counter()
+        save_snapshot(snapshot, zones, resources, optimizer, plan)
+        size_mb = sum(os.path.getsize(os.path.join(snapshot, name)) for name in os.listdir(snapshot)) / 2**20
+        print(f"snapshot gravado em {time.perf_counter() - start:.2f}s ({size_mb:.1f} MB)")
+
+        modes = [
+            ("preparação completa", COLD_START.format(scenario=scenario)),
+            ("snapshot (objetos e plano)", SNAPSHOT_START.format(snapshot=snapshot, extra="")),
+            ("snapshot + primeira rota", SNAPSHOT_START.format(snapshot=snapshot, extra=FIRST_ROUTE)),
+            ("snapshot (métricas)", SNAPSHOT_METRICS.format(snapshot=snapshot)),
+        ]
+        baseline = None
+        for label, code in modes:
+            elapsed = min(timed_process(code) for _ in range(args.repeat))
+            baseline = baseline or elapsed
+            print(f"{label:<28} {elapsed:6.2f}s  ({baseline / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Callable, List, Optional
+
+
+class MicroBatcher:
+    """
+    Agrupa requisições concorrentes em uma única chamada executada no executor.
+
+    As requisições que chegam dentro de `max_delay` segundos (ou até `max_batch_size`
+    itens) são entregues juntas a `batch_fn`, que deve devolver um resultado por item,
+    na mesma ordem.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], max_batch_size: int = 64,
+                 max_delay: float = 0.002, executor: Optional[Executor] = None):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.executor = executor
+        self._pending = []
+        self._flush_handle = None
+        self.batches_run = 0
+        self.items_processed = 0
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush(loop)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_delay, self._flush, loop)
+
+        return await future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        loop.create_task(self._run_batch(loop, batch))
+
+    async def _run_batch(self, loop: asyncio.AbstractEventLoop, batch: List) -> None:
+        items = [item for item, _ in batch]
+        try:
+            results = await loop.run_in_executor(self.executor, self.batch_fn, items)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches_run += 1
+        self.items_processed += len(items)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,297 @@
+import argparse
+import asyncio
+import copy
+import json
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from src.models.zone import Zone
+from src.models.resource import Resource
+from src.models.ml_models import DisasterPredictor, RouteOptimizer, zone_to_features
+from src.utils.resource_allocator import ResourceAllocator
+from src.api.batching import MicroBatcher
+
+# Mínimo de zonas para treinar o modelo de previsão com divisão treino/teste
+MIN_ZONES_FOR_PREDICTION = 5
+
+FEATURE_KEYS = ('population', 'infrastructure_damage', 'accessibility',
+                'critical_facilities', 'historical_risk')
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           422: 'Unprocessable Entity', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class DispatchService:
+    """
+    Mantém o cenário, o grafo de rotas e o modelo de previsão carregados em memória
+    e expõe as operações usadas pelos endpoints HTTP.
+    """
+
+    def __init__(self, zones: List[Zone], resources: List[Resource]):
+        self.zones = zones
+        self.resources = resources
+        self.zone_ids = {zone.id for zone in zones}
+
+        for zone in zones:
+            zone.calculate_priority()
+
+        self.route_optimizer = RouteOptimizer()
+        self.route_optimizer.build_graph(zones, resources)
+
+        self.predictor = DisasterPredictor()
+        if len(zones) >= MIN_ZONES_FOR_PREDICTION:
+            self.predictor.train([zone_to_features(zone) for zone in zones])
+
+        # O alocador altera zonas e recursos; as chamadas são serializadas
+        self._allocation_lock = threading.Lock()
+
+    def allocate(self) -> Dict:
+        with self._allocation_lock:
+            zones = copy.deepcopy(self.zones)
+            resources = copy.deepcopy(self.resources)
+
+        allocator = ResourceAllocator()
+        allocation = allocator.allocate_resources(zones, resources)
+        return {
+            'allocation': {zone_id: [r.id for r in allocated] for zone_id, allocated in allocation.items()},
+            'metrics': allocator.calculate_allocation_metrics(zones, resources)
+        }
+
+    def route_batch(self, pairs: List[Tuple[str, str]]) -> List:
+        results = [None] * len(pairs)
+        valid = []
+        for i, (source, target) in enumerate(pairs):
+            if source not in self.zone_ids or target not in self.zone_ids:
+                results[i] = HTTPError(422, f"Zona desconhecida: {source if source not in self.zone_ids else target}")
+            else:
+                valid.append(i)
+
+        routes = self.route_optimizer.find_optimal_routes([pairs[i] for i in valid])
+        for i, route in zip(valid, routes):
+            results[i] = {'route': route}
+        return results
+
+    def update_edges(self, updates: List[Dict]) -> Dict:
+        # Fechamentos e lentidões informados em campo; as rotas em cache são corrigidas localmente.
+        # Todas as atualizações são validadas antes da primeira ser aplicada: uma inválida
+        # não deixa o grafo atualizado pela metade
+        parsed = [self._parse_edge_update(update) for update in updates]
+        recomputed = 0
+        for source, target, status, factor in parsed:
+            if status == 'closed':
+                recomputed += self.route_optimizer.close_edge(source, target)
+            elif status == 'open':
+                recomputed += self.route_optimizer.reopen_edge(source, target)
+            else:
+                recomputed += self.route_optimizer.set_edge_slowdown(source, target, factor)
+        return {'updated': len(updates), 'nodes_recomputed': recomputed}
+
+    def _parse_edge_update(self, update: Dict) -> Tuple[str, str, str, float]:
+        if not isinstance(update, dict):
+            raise HTTPError(400, "Cada atualização deve ser um objeto")
+        try:
+            source, target = update['source'], update['target']
+        except KeyError as e:
+            raise HTTPError(400, f"Campo obrigatório ausente: {e.args[0]}")
+        for zone_id in (source, target):
+            if isinstance(zone_id, bool) or not isinstance(zone_id, (str, int)):
+                raise HTTPError(400, "'source' e 'target' devem ser IDs de zona")
+        source, target = str(source), str(target)
+        for zone_id in (source, target):
+            if zone_id not in self.zone_ids:
+                raise HTTPError(422, f"Zona desconhecida: {zone_id}")
+
+        status = update.get('status', 'slow')
+        if status not in ('closed', 'open', 'slow'):
+            raise HTTPError(422, f"Status inválido: {status}")
+        factor = update.get('factor', 1.0)
+        if status == 'slow':
+            if isinstance(factor, bool) or not isinstance(factor, (int, float)):
+                raise HTTPError(422, "'factor' deve ser numérico")
+            if not math.isfinite(factor) or factor <= 0:
+                raise HTTPError(422, "O fator de lentidão deve ser positivo")
+        return source, target, status, float(factor) if status == 'slow' else 1.0
+
+    def predict_batch(self, batches: List[List[Dict]]) -> List:
+        if not self.predictor.is_trained:
+            error = HTTPError(503, "Modelo de previsão indisponível")
+            return [error] * len(batches)
+
+        # Todas as zonas do lote são avaliadas em uma única chamada ao modelo
+        rows = [zone for batch in batches for zone in batch]
+        predictions = self.predictor.predict(rows) if rows else []
+
+        results = []
+        offset = 0
+        for batch in batches:
+            results.append({'predictions': [float(p) for p in predictions[offset:offset + len(batch)]]})
+            offset += len(batch)
+        return results
+
+
+class DispatchServer:
+    def __init__(self, service: DispatchService, max_batch_size: int = 64,
+                 max_delay: float = 0.002, workers: int = 4):
+        self.service = service
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.route_batcher = MicroBatcher(service.route_batch, max_batch_size, max_delay, self.executor)
+        self.predict_batcher = MicroBatcher(service.predict_batch, max_batch_size, max_delay, self.executor)
+
+    async def handle_allocate(self, payload: Dict) -> Dict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.service.allocate)
+
+    async def handle_route(self, payload: Dict) -> Dict:
+        try:
+            pair = (str(payload['source']), str(payload['target']))
+        except KeyError as e:
+            raise HTTPError(400, f"Campo obrigatório ausente: {e.args[0]}")
+        return await self.route_batcher.submit(pair)
+
+    async def handle_edges(self, payload: Dict) -> Dict:
+        updates = payload.get('updates')
+        if not isinstance(updates, list):
+            raise HTTPError(400, "Informe 'updates'")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.service.update_edges, updates)
+
+    async def handle_predict(self, payload: Dict) -> Dict:
+        if 'zone_ids' in payload:
+            zone_ids = payload['zone_ids']
+            if not isinstance(zone_ids, list) or not all(isinstance(z, str) for z in zone_ids):
+                raise HTTPError(400, "'zone_ids' deve ser uma lista de IDs")
+            by_id = {zone.id: zone for zone in self.service.zones}
+            unknown = [z for z in payload['zone_ids'] if z not in by_id]
+            if unknown:
+                raise HTTPError(422, f"Zona desconhecida: {unknown[0]}")
+            zones = [zone_to_features(by_id[z]) for z in payload['zone_ids']]
+        elif 'zones' in payload:
+            if not isinstance(payload['zones'], list) or not all(isinstance(z, dict) for z in payload['zones']):
+                raise HTTPError(400, "'zones' deve ser uma lista de objetos")
+            zones = [{key: zone.get(key, 0) for key in FEATURE_KEYS} for zone in payload['zones']]
+            # Um valor inválido derrubaria o lote inteiro, com requisições de outros clientes
+            for zone in zones:
+                for key, value in zone.items():
+                    if isinstance(value, bool) or not isinstance(value, (int, float)):
+                        raise HTTPError(422, f"Valor não numérico em '{key}'")
+        else:
+            raise HTTPError(400, "Informe 'zone_ids' ou 'zones'")
+        return await self.predict_batcher.submit(zones)
+
+    async def dispatch(self, method: str, path: str, payload: Dict) -> Dict:
+        if path == '/health':
+            return {'status': 'ok', 'zones': len(self.service.zones)}
+        if path == '/stats':
+            return {
+                'route_batches': self.route_batcher.batches_run,
+                'route_requests': self.route_batcher.items_processed,
+                'predict_batches': self.predict_batcher.batches_run,
+                'predict_requests': self.predict_batcher.items_processed,
+                'route_cache': self.service.route_optimizer.cache_stats()
+            }
+
+        handlers = {
+            '/allocate': self.handle_allocate,
+            '/route': self.handle_route,
+            '/edges': self.handle_edges,
+            '/predict': self.handle_predict
+        }
+        if path not in handlers:
+            raise HTTPError(404, f"Endpoint não encontrado: {path}")
+        if method != 'POST':
+            raise HTTPError(405, "Use POST")
+        return await handlers[path](payload)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                body = b''
+                length = int(headers.get('content-length', 0))
+                if length:
+                    body = await reader.readexactly(length)
+
+                status, response = await self._respond(method, path.split('?', 1)[0], body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                self._write_response(writer, status, response, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, method: str, path: str, body: bytes) -> Tuple[int, Dict]:
+        try:
+            payload = json.loads(body) if body else {}
+            if not isinstance(payload, dict):
+                raise HTTPError(400, "O corpo deve ser um objeto JSON")
+            return 200, await self.dispatch(method, path, payload)
+        except json.JSONDecodeError:
+            return 400, {'error': "JSON inválido"}
+        except HTTPError as e:
+            return e.status, {'error': e.message}
+        except Exception as e:
+            return 500, {'error': str(e)}
+
+    @staticmethod
+    def _write_response(writer: asyncio.StreamWriter, status: int, response: Dict, keep_alive: bool) -> None:
+        body = json.dumps(response).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8000) -> None:
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="API HTTP local de alocação, rotas e previsão.")
+    parser.add_argument("--scenario", help="Arquivo de cenário JSON (padrão: dados simulados)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--batch-size", type=int, default=64, help="Tamanho máximo de cada micro-lote")
+    parser.add_argument("--batch-delay", type=float, default=0.002, help="Espera máxima (s) para formar um lote")
+    args = parser.parse_args(argv)
+
+    if args.scenario:
+        from src.utils.scenario_io import load_scenario
+        zones, resources = load_scenario(args.scenario)
+    else:
+        from src.utils.data_loader import load_data
+        zones, resources = load_data()
+
+    server = DispatchServer(DispatchService(zones, resources), args.batch_size, args.batch_delay)
+    print(f"Servindo em http://{args.host}:{args.port} ({len(zones)} zonas, {len(resources)} recursos)")
+    asyncio.run(server.serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
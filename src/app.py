@@ -1,11 +1,18 @@
+import shutil
+import pandas as pd
 import streamlit as st
 import time
 from src.visualization.dashboard import Dashboard
 from src.visualization.map import DamageMap
+from src.visualization.render_cache import (DeferredOutput, deferred_map, get_render_cache, map_inputs,
+                                            render_key, snapshot_scenario)
 from src.models.zone import Zone
 from src.models.resource import Resource
 from src.utils.data_loader import load_data
+from src.utils.scenario_io import scenario_signature
+from src.utils.snapshot import DEFAULT_SNAPSHOT_DIR, apply_allocation_plan, load_snapshot, save_snapshot
 from src.utils.resource_allocator import ResourceAllocator
+from src.utils.hexgrid import DETAILED_MAP_MAX_ZONES, HexAggregation, allocate_by_cells
 from src.models.ml_models import DisasterPredictor, RouteOptimizer
 
 # Configuração da página
@@ -22,6 +29,45 @@ if 'data_loaded' not in st.session_state:
 if 'retry_count' not in st.session_state:
     st.session_state.retry_count = 0
 
+@st.cache_resource(show_spinner=False)
+def get_snapshot():
+    """
+    Cenário inicial em snapshot mapeado em memória: só o primeiro processo gera os
+    dados, o grafo de rotas e o plano de alocação; reinícios apenas abrem os arquivos.
+    """
+    snapshot = load_snapshot(DEFAULT_SNAPSHOT_DIR)
+    if snapshot is None:
+        zones, resources = load_data()
+        route_optimizer = RouteOptimizer()
+        route_optimizer.build_graph(zones, resources)
+        if len(zones) > DETAILED_MAP_MAX_ZONES:
+            # Recursos distribuídos primeiro entre as células hexagonais e depois entre as
+            # zonas de cada célula: o alocador só compara zonas e recursos da mesma célula
+            plan = allocate_by_cells(zones, resources, HexAggregation.from_zones(zones), resolution=1).plan
+        else:
+            allocation = ResourceAllocator().allocate_resources(zones, resources)
+            plan = {zone_id: [r.id for r in allocated] for zone_id, allocated in allocation.items()}
+        save_snapshot(DEFAULT_SNAPSHOT_DIR, zones, resources, route_optimizer, plan)
+        snapshot = load_snapshot(DEFAULT_SNAPSHOT_DIR)
+    return snapshot
+
+
+def load_snapshot_data():
+    # Objetos novos a cada execução: a alocação altera zonas e recursos
+    snapshot = get_snapshot()
+    return snapshot.zones(), snapshot.resources()
+
+
+def get_hex_aggregation(zones):
+    # A agregação da sessão só recalcula as zonas que mudaram desde a última execução
+    aggregation = st.session_state.get('hex_aggregation')
+    if aggregation is None:
+        aggregation = st.session_state.hex_aggregation = HexAggregation.from_zones(zones)
+    else:
+        aggregation.update(zones)
+    return aggregation
+
+
 def load_data_with_retry():
     """Tenta carregar os dados com retry em caso de erro"""
     max_retries = 3
@@ -29,7 +75,7 @@ def load_data_with_retry():
     
     while st.session_state.retry_count < max_retries:
         try:
-            zones, resources = load_data()
+            zones, resources = load_snapshot_data()
             if zones and resources:
                 st.session_state.data_loaded = True
                 st.session_state.retry_count = 0
@@ -86,12 +132,19 @@ def main():
             </div>
             """, unsafe_allow_html=True)
 
+            if st.button("Gerar Novo Cenário Simulado"):
+                shutil.rmtree(DEFAULT_SNAPSHOT_DIR, ignore_errors=True)
+                get_snapshot.clear()
+                st.session_state.pop('route_optimizer', None)
+                st.session_state.pop('route_signature', None)
+                st.rerun()
+
         # Carregar dados com retry
         if not st.session_state.data_loaded:
             with st.spinner("Carregando dados..."):
                 zones, resources = load_data_with_retry()
         else:
-            zones, resources = load_data()
+            zones, resources = load_snapshot_data()
 
         if not zones or not resources:
             st.warning("Nenhum dado disponível. Por favor, vá para a página de Entrada de Dados para configurar o cenário.")
@@ -99,10 +152,9 @@ def main():
 
         # Inicializar componentes
         dashboard = Dashboard()
-        damage_map = DamageMap()
+        # Mapas e figuras vêm do cache; falhas são renderizadas em segundo plano e exibidas no fim da página
+        output = DeferredOutput(get_render_cache())
         resource_allocator = ResourceAllocator()
-        disaster_predictor = DisasterPredictor()
-        route_optimizer = RouteOptimizer()
 
         # Atualizar métricas
         dashboard.update_metrics(zones, resources)
@@ -122,12 +174,38 @@ def main():
         with tab1:
             st.header("Mapa de Danos e Alocação de Recursos")
             try:
-                # Criar e exibir mapa
-                map_obj = damage_map.create_map(zones, resources)
-                if map_obj:
-                    st.components.v1.html(map_obj._repr_html_(), height=600)
+                # Cenários grandes começam pela visão agregada em hexágonos; uma célula
+                # escolhida é refinada nas suas zonas
+                if len(zones) > DETAILED_MAP_MAX_ZONES:
+                    aggregation = get_hex_aggregation(zones)
+                    resolution = st.select_slider(
+                        "Resolução da grade hexagonal",
+                        options=list(range(aggregation.grid.resolutions)),
+                        format_func=lambda level: f"{aggregation.grid.sizes_m[level] / 1000:g} km",
+                        key="hex_resolution"
+                    )
+                    cells = aggregation.frame(resolution)
+                    selected = st.selectbox(
+                        "Detalhar célula",
+                        options=[None] + cells['cell'].tolist(),
+                        format_func=lambda cell: "Todas as células" if cell is None else
+                            f"{aggregation.grid.label(cell, resolution)} "
+                            f"({int(cells.loc[cells['cell'] == cell, 'zones'].iloc[0])} zonas)",
+                        key="hex_cell"
+                    )
+                    if selected is None:
+                        # Cópias dos recursos: a alocação da aba seguinte os altera durante a renderização
+                        _, map_resources = snapshot_scenario([], resources)
+                        output.html(
+                            render_key('hex_map', resolution, cells.to_numpy(), map_inputs([], resources)),
+                            lambda: DamageMap().create_hex_map(aggregation, resolution, map_resources)._repr_html_(),
+                            height=600
+                        )
+                    else:
+                        cell_zone_ids = set(aggregation.zone_ids(selected, resolution))
+                        deferred_map(output, [z for z in zones if z.id in cell_zone_ids], resources, height=600)
                 else:
-                    st.error("Não foi possível criar o mapa.")
+                    deferred_map(output, zones, resources, height=600)
             except Exception as e:
                 st.error(f"Erro ao exibir o mapa: {str(e)}")
 
@@ -137,22 +215,48 @@ def main():
             
             try:
                 with col1:
-                    dashboard.display_damage_distribution(zones)
+                    dashboard.display_damage_distribution(zones, output)
                 
                 with col2:
-                    dashboard.display_resource_allocation(resources)
+                    dashboard.display_resource_allocation(resources, output)
             except Exception as e:
                 st.error(f"Erro ao exibir análises: {str(e)}")
 
         with tab3:
             st.header("Alocação de Recursos")
             try:
-                # Alocar recursos
-                allocated_resources = resource_allocator.allocate_resources(zones, resources)
+                # Plano gravado no snapshot; o alocador só roda se o snapshot não tiver um
+                plan = get_snapshot().allocation_plan()
+                if plan is not None:
+                    apply_allocation_plan(zones, resources, plan)
+                else:
+                    resource_allocator.allocate_resources(zones, resources)
                 
                 # Exibir resultados da alocação
                 st.subheader("Resultado da Alocação")
-                for zone in zones:
+                resources_by_id = {resource.id: resource for resource in resources}
+                listed_zones = zones
+                if len(zones) > DETAILED_MAP_MAX_ZONES:
+                    # Resumo por célula; as zonas só são listadas para a célula detalhada no mapa
+                    aggregation = get_hex_aggregation(zones)
+                    resolution = st.session_state.get('hex_resolution', 0)
+                    zone_ids = [zone.id for zone in zones]
+                    served = pd.DataFrame({
+                        'cell': aggregation.zone_cells(zone_ids, resolution),
+                        'resources': [len(zone.resources_allocated) for zone in zones]
+                    }).groupby('cell')['resources'].sum()
+                    cells = aggregation.frame(resolution)
+                    st.dataframe(pd.DataFrame({
+                        "Célula": cells['label'],
+                        "Zonas": cells['zones'],
+                        "População": cells['population'],
+                        "Dano Médio": cells['mean_damage'].round(2),
+                        "Recursos Alocados": served.reindex(cells['cell']).fillna(0).astype(int).to_numpy()
+                    }), hide_index=True)
+                    selected = st.session_state.get('hex_cell')
+                    cell_zone_ids = set(aggregation.zone_ids(selected, resolution)) if selected is not None else set()
+                    listed_zones = [zone for zone in zones if zone.id in cell_zone_ids]
+                for zone in listed_zones:
                     with st.expander(f"Zona: {zone.name}"):
                         st.write(f"Nível de Dano: {zone.damage_level}")
                         st.write(f"População: {zone.population}")
@@ -160,7 +264,8 @@ def main():
                         
                         if zone.resources_allocated:
                             st.write("Recursos Alocados:")
-                            for resource in zone.resources_allocated:
+                            for resource_id in zone.resources_allocated:
+                                resource = resources_by_id[resource_id]
                                 st.write(f"- {resource.type} (Capacidade: {resource.capacity})")
                         else:
                             st.write("Nenhum recurso alocado")
@@ -172,6 +277,8 @@ def main():
             try:
                 if st.button("Gerar Previsões"):
                     with st.spinner("Gerando previsões..."):
+                        disaster_predictor = DisasterPredictor()
+
                         # Converter dados para formato adequado
                         zone_data = [
                             {
@@ -232,7 +339,18 @@ def main():
         with tab5:
             st.header("Otimização de Rotas")
             try:
-                route_optimizer.build_graph(zones, resources)
+                # O otimizador (e seus caches de rotas) sobrevive às reexecuções da página
+                # enquanto o cenário não mudar
+                signature = scenario_signature(zones, resources)
+                route_optimizer = st.session_state.get('route_optimizer')
+                if route_optimizer is None or st.session_state.get('route_signature') != signature:
+                    # O grafo do snapshot é restaurado sem recalcular distâncias
+                    route_optimizer = get_snapshot().route_optimizer()
+                    if route_optimizer is None:
+                        route_optimizer = RouteOptimizer()
+                        route_optimizer.build_graph(zones, resources)
+                    st.session_state.route_optimizer = route_optimizer
+                    st.session_state.route_signature = signature
                 
                 col1, col2 = st.columns(2)
                 
@@ -283,9 +401,18 @@ def main():
                         else:
                             st.warning("Não foi possível encontrar uma rota de alocação.")
             
+                stats = route_optimizer.cache_stats()
+                st.caption(
+                    f"Cache de rotas: {stats['paths']['hits']} acertos, {stats['paths']['misses']} falhas; "
+                    f"{stats['trees']['entries']} árvores de caminhos mínimos em memória"
+                )
+            
             except Exception as e:
                 st.error(f"Erro ao calcular rotas: {str(e)}")
 
+        # Preenche os mapas e figuras que ainda estavam sendo renderizados
+        output.flush()
+
     except Exception as e:
         st.error(f"Ocorreu um erro inesperado: {str(e)}")
         st.info("Por favor, tente recarregar a página.")
@@ -1,28 +1,44 @@
-from typing import List, Dict
+import time
+from typing import List, Dict, Optional
+import numpy as np
 from .zone import Zone
 from .resource import Resource
+from .history import AllocationHistory
+from .anytime import AnytimeResult, solve_anytime
+from .priority import LazyRanking
+
+# Atribuições aplicadas (e desfeitas) para medir o custo de aplicar o plano anytime
+APPLY_SAMPLE = 256
+
+# Folga sobre o custo medido: a amostra não vê o histórico crescer nem zonas com uma
+# única atribuição depois da busca local (até 1,3x mais caro nas medições)
+APPLY_COST_MARGIN = 1.5
 
 class ResourceAllocator:
-    def __init__(self):
-        self.allocation_history = []
+    def __init__(self, history: Optional[AllocationHistory] = None):
+        self.allocation_history = history if history is not None else AllocationHistory()
 
     def allocate_resources(self, zones: List[Zone], resources: List[Resource]) -> Dict[str, List[str]]:
         allocation_plan = {}
+        self.allocation_history.start_run()
         
-        # Sort zones by priority score
-        sorted_zones = sorted(zones, key=lambda x: x.priority_score, reverse=True)
+        # Zonas por prioridade, ordenadas sob demanda: quando os recursos acabam,
+        # o restante da lista não precisa ser ordenado
+        priorities = np.fromiter((z.priority_score for z in zones), dtype=np.float64, count=len(zones))
+        zone_order = LazyRanking(priorities)
         
         # Sort resources by capacity
         sorted_resources = sorted(resources, key=lambda x: x.capacity, reverse=True)
         
-        for zone in sorted_zones:
+        for zone_index in zone_order:
+            zone = zones[zone_index]
             allocation_plan[zone.id] = []
             
             # Find available resources
             available_resources = [r for r in sorted_resources if not r.is_fully_allocated()]
             
             if not available_resources:
-                continue
+                break
                 
             # Assign resources to zone
             for resource in available_resources:
@@ -34,19 +50,84 @@ class ResourceAllocator:
                         resource.is_available = False
                     
                     # Record allocation
-                    self.allocation_history.append({
-                        'zone_id': zone.id,
-                        'resource_id': resource.id,
-                        'priority_score': zone.priority_score
-                    })
+                    self.allocation_history.append(
+                        zone_id=zone.id,
+                        resource_id=resource.id,
+                        priority_score=zone.priority_score
+                    )
                     
                     if len(allocation_plan[zone.id]) >= 3:  # Limit resources per zone
                         break
         
+        # Zonas não alcançadas ficam sem recursos
+        for zone in zones:
+            allocation_plan.setdefault(zone.id, [])
         return allocation_plan
 
+    def allocate_anytime(self, zones: List[Zone], resources: List[Resource], deadline: float) -> AnytimeResult:
+        # Plano guloso imediato melhorado por busca local. O prazo (em segundos) vale para
+        # a chamada inteira: preparação, busca e aplicação do plano
+        start = time.perf_counter()
+        self.allocation_history.start_run()
+        priorities = np.fromiter((z.priority_score for z in zones), dtype=np.float64, count=len(zones))
+        capacities = np.fromiter(
+            (max(0, int(r.get_remaining_capacity())) if r.is_available else 0 for r in resources),
+            dtype=np.int64, count=len(resources)
+        )
+        plan = {zone.id: [] for zone in zones}
+        result = solve_anytime(priorities, capacities, deadline, started_at=start,
+                               assignment_seconds=self._apply_seconds(zones, resources))
+
+        applying = time.perf_counter()
+        result.plan = plan
+        for zone_index, resource_indices in result.assignments.items():
+            zone = zones[zone_index]
+            for resource_index in resource_indices:
+                resource = resources[resource_index]
+                resource.assign_to_zone(zone.id)
+                zone.add_resource(resource.id)
+                plan[zone.id].append(resource.id)
+                self.allocation_history.append(
+                    zone_id=zone.id,
+                    resource_id=resource.id,
+                    priority_score=zone.priority_score
+                )
+
+        for resource in resources:
+            if resource.is_fully_allocated():
+                resource.is_available = False
+        result.apply_seconds = time.perf_counter() - applying
+        result.elapsed_seconds = time.perf_counter() - start
+        return result
+
+    @staticmethod
+    def _apply_seconds(zones: List[Zone], resources: List[Resource]) -> float:
+        # Custo por atribuição de aplicar o plano, medido nesta máquina: uma amostra é
+        # aplicada às zonas e recursos (e a um histórico descartável) e depois desfeita
+        count = min(APPLY_SAMPLE, len(zones), len(resources))
+        if not count:
+            return 0.0
+        # Amostra espalhada pelas listas, como as zonas em ordem de prioridade do plano
+        sample = zip(zones[::len(zones) // count][:count], resources[::len(resources) // count][:count])
+        history = AllocationHistory()
+        plan = {}
+        started = time.perf_counter()
+        for zone, resource in sample:
+            held = resource.id in zone.resources_allocated
+            assigned = resource.assign_to_zone(zone.id)
+            zone.add_resource(resource.id)
+            plan.setdefault(zone.id, []).append(resource.id)
+            history.append(zone_id=zone.id, resource_id=resource.id, priority_score=zone.priority_score)
+            if assigned:
+                resource.remove_from_zone(zone.id)
+            if not held:
+                zone.remove_resource(resource.id)
+        return (time.perf_counter() - started) / count * APPLY_COST_MARGIN
+
     def get_allocation_metrics(self) -> Dict:
-        if not self.allocation_history:
+        # Totais mantidos incrementalmente pelo histórico: O(1) por chamada
+        history = self.allocation_history
+        if not len(history):
             return {
                 'total_allocations': 0,
                 'average_priority': 0,
@@ -54,7 +135,7 @@ class ResourceAllocator:
             }
             
         return {
-            'total_allocations': len(self.allocation_history),
-            'average_priority': sum(h['priority_score'] for h in self.allocation_history) / len(self.allocation_history),
-            'zones_covered': len(set(h['zone_id'] for h in self.allocation_history))
+            'total_allocations': len(history),
+            'average_priority': history.mean('priority_score'),
+            'zones_covered': history.distinct_zones
         } 
\ No newline at end of file
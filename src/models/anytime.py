@@ -0,0 +1,204 @@
+import heapq
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .priority import LazyRanking
+
+# Limite de recursos por zona, o mesmo de ResourceAllocator.allocate_resources
+MAX_RESOURCES_PER_ZONE = 3
+
+# Retorno decrescente de cada recurso adicional: n recursos cobrem 1 - DECAY**n da zona
+COVERAGE_DECAY = 0.5
+
+# Intervalo (em iterações) entre verificações do relógio
+CLOCK_CHECK_INTERVAL = 64
+
+
+@dataclass
+class AnytimeResult:
+    # Índices dos recursos atribuídos a cada zona (índices das listas de entrada)
+    assignments: Dict[int, List[int]]
+    score: float
+    trace: List[Tuple[float, float]] = field(default_factory=list)
+    moves: int = 0
+    elapsed_seconds: float = 0.0
+    # True se a busca parou em um ótimo local antes do prazo
+    completed: bool = False
+    # Plano por IDs, preenchido por ResourceAllocator.allocate_anytime
+    plan: Dict[str, List[str]] = field(default_factory=dict)
+    deadline: float = 0.0
+    # Instante (desde o início do prazo) em que o plano guloso ficou pronto
+    greedy_seconds: float = 0.0
+    # Tempo gasto aplicando o plano às zonas, recursos e histórico (chamada completa)
+    apply_seconds: float = 0.0
+
+    @property
+    def overrun(self) -> float:
+        """
+        Atraso em relação ao prazo, em segundos (0 se o prazo foi cumprido). O plano
+        guloso e sua aplicação são sempre produzidos, então só conta o atraso além deles.
+        """
+        return max(0.0, self.elapsed_seconds - max(self.deadline, self.greedy_seconds + self.apply_seconds))
+
+
+def solve_anytime(priorities: np.ndarray, capacities: np.ndarray, deadline: float,
+                  max_per_zone: int = MAX_RESOURCES_PER_ZONE, started_at: Optional[float] = None,
+                  assignment_seconds: float = 0.0) -> AnytimeResult:
+    """
+    Alocação "anytime": plano guloso imediato, melhorado por busca local até o prazo.
+
+    A fase gulosa reproduz `ResourceAllocator.allocate_resources` (zonas por prioridade,
+    recursos por capacidade, até `max_per_zone` recursos por zona, cada recurso atende
+    até `capacity` zonas). A busca local move recursos de zonas onde contribuem pouco
+    para zonas onde contribuem mais, maximizando a cobertura ponderada por prioridade
+    sum(p * (1 - DECAY**n)) / sum(p). A fase gulosa sempre termina, mesmo que passe do
+    prazo; a busca local usa o restante, descontado o tempo reservado para o chamador
+    aplicar cada atribuição.
+
+    Args:
+        priorities: Pontuação de prioridade de cada zona
+        capacities: Número de zonas que cada recurso pode atender (0 para indisponível)
+        deadline: Tempo máximo de execução, em segundos
+        max_per_zone: Máximo de recursos por zona
+        started_at: Instante (`time.perf_counter`) em que o prazo começou a contar, se
+            o chamador já gastou parte dele preparando a entrada; padrão: agora
+        assignment_seconds: Tempo reservado, dentro do prazo, por atribuição do plano
+
+    Returns:
+        Melhor plano encontrado, sua pontuação e o traço qualidade x tempo
+    """
+    start = time.perf_counter() if started_at is None else started_at
+    deadline_at = start + deadline
+    priorities = np.asarray(priorities, dtype=np.float64)
+    total_priority = float(priorities.sum())
+    p = priorities
+
+    # Só o topo da ordenação costuma ser necessário; os blocos seguintes são ordenados sob demanda
+    zone_order = LazyRanking(priorities, initial=4096)
+    resource_order = np.argsort(-np.asarray(capacities), kind='stable').tolist()
+    remaining = [int(c) for c in capacities]
+
+    assignments: Dict[int, List[int]] = {}
+    counts = [0] * len(p)
+    score = 0.0
+    assigned = 0
+    open_resources = deque(r for r in resource_order if remaining[r] > 0)
+
+    # Fase gulosa
+    first_uncovered = len(zone_order)
+    for position in range(len(zone_order)):
+        if not open_resources:
+            first_uncovered = position
+            break
+        zone = zone_order[position]
+        taken = [open_resources.popleft() for _ in range(min(max_per_zone, len(open_resources)))]
+        for resource in reversed(taken):
+            remaining[resource] -= 1
+            if remaining[resource] > 0:
+                open_resources.appendleft(resource)
+        assignments[zone] = taken
+        counts[zone] = len(taken)
+        assigned += len(taken)
+        score += float(p[zone]) * (1.0 - COVERAGE_DECAY ** len(taken))
+    # A busca local só move recursos: o número de atribuições (e a reserva) não muda
+    deadline_at -= assigned * assignment_seconds
+    out_of_time = time.perf_counter() >= deadline_at
+
+    def normalized(value: float) -> float:
+        return value / total_priority if total_priority > 0 else 0.0
+
+    greedy_seconds = time.perf_counter() - start
+    trace = [(greedy_seconds, normalized(score))]
+
+    # Busca local: receptores (ganho ao receber um recurso) e doadores (perda ao ceder um)
+    receivers, donors = [], []
+    if not out_of_time:
+        receivers = [(-float(p[z]) * COVERAGE_DECAY ** (counts[z] + 1), z, counts[z])
+                     for z in assignments if counts[z] < max_per_zone]
+        heapq.heapify(receivers)
+        donors = [(float(p[z]) * COVERAGE_DECAY ** counts[z], z, counts[z]) for z in assignments]
+        heapq.heapify(donors)
+    # Zonas descobertas em ordem de prioridade, consumidas sob demanda
+    uncovered_position = first_uncovered
+
+    moves = 0
+    completed = False
+    iteration = 0
+    while not out_of_time:
+        if iteration % CLOCK_CHECK_INTERVAL == 0 and time.perf_counter() >= deadline_at:
+            break
+        iteration += 1
+
+        while receivers and counts[receivers[0][1]] != receivers[0][2]:
+            heapq.heappop(receivers)
+        while uncovered_position < len(zone_order) and counts[zone_order[uncovered_position]] != 0:
+            uncovered_position += 1
+
+        receiver, gain = None, 0.0
+        if receivers:
+            receiver, gain = receivers[0][1], -receivers[0][0]
+        if uncovered_position < len(zone_order):
+            zone = zone_order[uncovered_position]
+            if float(p[zone]) * COVERAGE_DECAY > gain:
+                receiver, gain = zone, float(p[zone]) * COVERAGE_DECAY
+
+        donor, loss, resource = _cheapest_donor(donors, counts, assignments, receiver)
+        if receiver is None or donor is None or gain <= loss:
+            completed = True
+            break
+
+        assignments[donor].remove(resource)
+        assignments.setdefault(receiver, []).append(resource)
+        counts[donor] -= 1
+        counts[receiver] += 1
+        score += gain - loss
+        moves += 1
+
+        for zone in (donor, receiver):
+            weight = float(p[zone])
+            if counts[zone] > 0:
+                heapq.heappush(donors, (weight * COVERAGE_DECAY ** counts[zone], zone, counts[zone]))
+            if counts[zone] < max_per_zone:
+                heapq.heappush(receivers, (-weight * COVERAGE_DECAY ** (counts[zone] + 1), zone, counts[zone]))
+
+        if moves % 256 == 0:
+            trace.append((time.perf_counter() - start, normalized(score)))
+
+    elapsed = time.perf_counter() - start
+    trace.append((elapsed, normalized(score)))
+    return AnytimeResult(
+        assignments={zone: resources for zone, resources in assignments.items() if resources},
+        score=normalized(score),
+        trace=trace,
+        moves=moves,
+        elapsed_seconds=elapsed,
+        completed=completed,
+        deadline=deadline,
+        greedy_seconds=greedy_seconds
+    )
+
+
+def _cheapest_donor(donors: List, counts: List[int], assignments: Dict[int, List[int]],
+                    receiver: int) -> Tuple:
+    # Doador de menor perda com um recurso que o receptor ainda não tem
+    skipped = []
+    found = (None, 0.0, None)
+    while donors:
+        loss, zone, count = donors[0]
+        if counts[zone] != count:
+            heapq.heappop(donors)
+            continue
+        if zone != receiver:
+            held = assignments.get(receiver, ())
+            resource = next((r for r in assignments[zone] if r not in held), None)
+            if resource is not None:
+                found = (zone, loss, resource)
+                break
+        skipped.append(heapq.heappop(donors))
+        if len(skipped) > MAX_RESOURCES_PER_ZONE + 1:
+            break
+    for entry in skipped:
+        heapq.heappush(donors, entry)
+    return found
@@ -0,0 +1,227 @@
+import heapq
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from src.models.zone import Zone, MAX_DAMAGE_LEVEL
+from src.models.resource import Resource
+from src.utils.distance import haversine_pairwise
+from src.utils.geometry import resource_coordinates, zone_geometry
+
+# Parcela da população que precisa de atendimento em uma zona com dano máximo
+ASSISTANCE_RATE = 0.01
+
+# Velocidade média e fator de desvio da malha viária em relação à linha reta
+DEFAULT_SPEED_KMH = 40.0
+ROAD_DETOUR_FACTOR = 1.3
+
+# Tempo de atendimento na zona por viagem (min)
+SERVICE_MINUTES = 20.0
+
+# Tipos de evento
+_ARRIVE, _SERVED, _RETURN = 0, 1, 2
+
+
+@dataclass
+class DispatchSimulationResult:
+    # Instantes (horas desde o início) no centro de cada intervalo das séries
+    hours: np.ndarray
+    # Fração dos recursos de cada tipo em deslocamento ou atendimento, média do intervalo
+    utilization: Dict[str, np.ndarray]
+    # Soma dos danos ainda não atendidos (dano da zona x demanda restante / demanda inicial)
+    residual_damage: np.ndarray
+    # Fração da demanda total já atendida no fim de cada intervalo
+    served_fraction: np.ndarray
+    trips: int
+    events: int
+    # Recursos fora da simulação (sem localização ou sem zona no plano)
+    skipped_resources: int
+    elapsed_seconds: float
+    # Demanda restante por zona no fim do horizonte
+    remaining_demand: Dict[str, float] = field(default_factory=dict)
+
+    def to_frame(self) -> pd.DataFrame:
+        data = {'hours': self.hours, 'residual_damage': self.residual_damage,
+                'served_fraction': self.served_fraction}
+        data.update({f'utilization_{resource_type}': values for resource_type, values in self.utilization.items()})
+        return pd.DataFrame(data)
+
+
+def simulate_dispatch(zones: List[Zone], resources: List[Resource], plan: Dict[str, List[str]],
+                      horizon_hours: float = 72.0, points: int = 200,
+                      travel_minutes: Optional[Dict[Tuple[str, str], float]] = None,
+                      speed_kmh: float = DEFAULT_SPEED_KMH, service_minutes: float = SERVICE_MINUTES,
+                      assistance_rate: float = ASSISTANCE_RATE) -> DispatchSimulationResult:
+    """
+    Simulação de eventos discretos do atendimento de um plano de alocação.
+
+    Cada recurso sai da sua base para a zona de maior prioridade entre as que lhe
+    foram atribuídas e ainda têm demanda, atende até `capacity` unidades de demanda,
+    volta à base e repete até não restar demanda nas suas zonas. Os eventos
+    (chegada, fim do atendimento, retorno) são processados em ordem por um heap.
+
+    A demanda de uma zona é população x dano / MAX_DAMAGE_LEVEL x `assistance_rate`.
+    As séries são acumuladas evento a evento e reduzidas a `points` intervalos
+    (utilização média ponderada pelo tempo; dano e atendimento no fim do intervalo).
+
+    Args:
+        zones: Lista de zonas afetadas
+        resources: Lista de recursos
+        plan: {zona: [recursos]}, como `ResourceAllocator.allocate_anytime(...).plan`
+        horizon_hours: Duração simulada
+        points: Número de intervalos das séries
+        travel_minutes: Tempo de viagem base -> zona por (recurso, zona), por exemplo de
+            `run_pipeline(...)['road_routes']`; pares ausentes usam a distância em linha
+            reta x ROAD_DETOUR_FACTOR a `speed_kmh`
+        speed_kmh: Velocidade média dos deslocamentos
+        service_minutes: Tempo de atendimento por viagem
+        assistance_rate: Parcela da população atendida em uma zona com dano máximo
+
+    Returns:
+        Séries de utilização por tipo, dano residual e demanda atendida
+    """
+    start = time.perf_counter()
+    horizon = horizon_hours * 60.0
+    zone_index = {zone.id: i for i, zone in enumerate(zones)}
+    centroids = zone_geometry(zones).centroids
+    priority = np.array([zone.priority_score for zone in zones], dtype=np.float64)
+    damage = np.array([zone.damage_level for zone in zones], dtype=np.float64)
+    initial_demand = (np.array([zone.population for zone in zones], dtype=np.float64)
+                      * np.clip(damage, 0.0, MAX_DAMAGE_LEVEL) / MAX_DAMAGE_LEVEL * assistance_rate)
+    demand = initial_demand.copy()
+    # Demanda já reservada por recursos a caminho; impede atendimentos em excesso
+    reserved = np.zeros(len(zones))
+
+    # Zonas de cada recurso, da maior para a menor prioridade
+    assigned: Dict[str, List[int]] = {}
+    for zone_id, resource_ids in plan.items():
+        z = zone_index.get(zone_id)
+        if z is None:
+            continue
+        for resource_id in resource_ids:
+            assigned.setdefault(resource_id, []).append(z)
+
+    bases = resource_coordinates(resources)
+    resource_types = sorted({r.type for r in resources})
+    type_index = {resource_type: k for k, resource_type in enumerate(resource_types)}
+    type_totals = np.zeros(len(resource_types))
+
+    active = []
+    for k, resource in enumerate(resources):
+        targets = assigned.get(resource.id)
+        if not targets or np.isnan(bases[k]).any():
+            continue
+        targets.sort(key=lambda z: -priority[z])
+        active.append((k, targets))
+        type_totals[type_index[resource.type]] += 1
+
+    # Tempo de ida (= volta) de cada par recurso-zona do plano
+    pairs = [(k, z) for k, targets in active for z in targets]
+    one_way: Dict[Tuple[int, int], float] = {}
+    if pairs:
+        pair_array = np.array(pairs, dtype=np.int64)
+        km = haversine_pairwise(bases[pair_array[:, 0]], centroids[pair_array[:, 1]]) * ROAD_DETOUR_FACTOR
+        minutes = km / speed_kmh * 60.0
+        for (k, z), value in zip(pairs, minutes.tolist()):
+            one_way[(k, z)] = value
+        if travel_minutes:
+            for (k, z) in pairs:
+                override = travel_minutes.get((resources[k].id, zones[z].id))
+                if override is not None and np.isfinite(override):
+                    one_way[(k, z)] = float(override)
+
+    capacity = [float(r.capacity) for r in resources]
+    rtype = [type_index.get(r.type, 0) for r in resources]
+    targets_of = dict(active)
+    load = {}
+    heap: List[Tuple[float, int, int, int, int]] = []
+    sequence = 0
+    # Registros das séries: (instante, tipo de recurso, variação de ocupados) e (instante, demanda atendida)
+    busy_log: List[Tuple[float, int, int]] = []
+    served_log: List[Tuple[float, int, float]] = []
+    trips = 0
+    events = 0
+
+    def dispatch(k: int, now: float) -> None:
+        nonlocal sequence, trips
+        for z in targets_of[k]:
+            available = demand[z] - reserved[z]
+            if available > 1e-9:
+                amount = min(capacity[k], available)
+                reserved[z] += amount
+                load[k] = amount
+                busy_log.append((now, rtype[k], 1))
+                heapq.heappush(heap, (now + one_way[(k, z)], sequence, _ARRIVE, k, z))
+                sequence += 1
+                trips += 1
+                return
+
+    for k, _ in active:
+        dispatch(k, 0.0)
+
+    while heap:
+        now, _, kind, k, z = heapq.heappop(heap)
+        if now > horizon:
+            break
+        events += 1
+        if kind == _ARRIVE:
+            heapq.heappush(heap, (now + service_minutes, sequence, _SERVED, k, z))
+        elif kind == _SERVED:
+            amount = load.pop(k)
+            demand[z] -= amount
+            reserved[z] -= amount
+            served_log.append((now, z, amount))
+            heapq.heappush(heap, (now + one_way[(k, z)], sequence, _RETURN, k, z))
+        else:
+            busy_log.append((now, rtype[k], -1))
+            dispatch(k, now)
+        sequence += 1
+
+    edges = np.linspace(0.0, horizon, points + 1)
+    utilization = {}
+    for resource_type, t in type_index.items():
+        entries = [(time_, delta) for time_, kind_, delta in busy_log if kind_ == t]
+        utilization[resource_type] = _time_average(entries, edges) / type_totals[t] if type_totals[t] else \
+            np.zeros(points)
+
+    total_demand = float(initial_demand.sum())
+    served_times = np.array([entry[0] for entry in served_log])
+    served_zones = np.array([entry[1] for entry in served_log], dtype=np.int64)
+    served_amounts = np.array([entry[2] for entry in served_log])
+    # Dano aliviado por unidade de demanda atendida em cada zona
+    relief_per_unit = np.divide(damage, initial_demand, out=np.zeros_like(damage), where=initial_demand > 0)
+    relief = relief_per_unit[served_zones] * served_amounts if len(served_log) else np.empty(0)
+    done = np.searchsorted(served_times, edges[1:], side='right')
+    cumulative_relief = np.concatenate([[0.0], np.cumsum(relief)])[done]
+    cumulative_served = np.concatenate([[0.0], np.cumsum(served_amounts)])[done]
+    # Zonas sem demanda não têm o que aliviar e não entram no dano residual
+    relievable = float(damage[initial_demand > 0].sum())
+
+    return DispatchSimulationResult(
+        hours=(edges[:-1] + edges[1:]) / 2 / 60.0,
+        utilization=utilization,
+        residual_damage=relievable - cumulative_relief,
+        served_fraction=cumulative_served / total_demand if total_demand > 0 else np.ones(points),
+        trips=trips,
+        events=events,
+        skipped_resources=len(resources) - len(active),
+        elapsed_seconds=time.perf_counter() - start,
+        remaining_demand={zone.id: float(value) for zone, value in zip(zones, demand)}
+    )
+
+
+def _time_average(entries: List[Tuple[float, int]], edges: np.ndarray) -> np.ndarray:
+    # Média, em cada intervalo, de uma função degrau dada por variações em instantes crescentes
+    if not entries:
+        return np.zeros(len(edges) - 1)
+    times = np.array([t for t, _ in entries])
+    values = np.cumsum([delta for _, delta in entries]).astype(np.float64)
+    # Integral acumulada até cada variação
+    integral = np.concatenate([[0.0], np.cumsum(values[:-1] * np.diff(times))])
+    position = np.searchsorted(times, edges, side='right') - 1
+    before = position < 0
+    position = np.maximum(position, 0)
+    at_edges = integral[position] + values[position] * (edges - times[position])
+    at_edges[before] = 0.0
+    return np.diff(at_edges) / np.diff(edges)
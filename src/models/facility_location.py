@@ -0,0 +1,225 @@
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import numpy as np
+from shapely.geometry import Point
+from src.models.zone import Zone
+from src.models.resource import Resource
+from src.utils.geometry import project_lonlat, zone_geometry, METERS_PER_DEGREE
+
+# Passos de Weiszfeld (mediana geométrica ponderada) por iteração de Lloyd
+WEISZFELD_STEPS = 5
+
+# Melhoria relativa mínima do custo para continuar iterando
+TOLERANCE = 1e-4
+
+
+@dataclass
+class PlacementResult:
+    # Longitude/latitude dos depósitos, forma (k, 2)
+    depots: np.ndarray
+    # Índice do depósito mais próximo de cada ponto
+    assignment: np.ndarray
+    # Distância média ponderada (km) de cada ponto ao depósito mais próximo
+    cost_km: float
+    iterations: int
+    swaps: int
+    elapsed_seconds: float
+
+
+def place_depots(lonlat: np.ndarray, weights: np.ndarray, k: int, max_iterations: int = 50,
+                 swap_attempts: int = 0, seed: Optional[int] = None) -> PlacementResult:
+    """
+    K-medianas ponderadas: posiciona `k` depósitos minimizando a distância ponderada
+    de cada ponto ao depósito mais próximo.
+
+    Iterações no estilo de Lloyd, vetorizadas: atribuição pelo índice espacial
+    (k-d tree sobre os depósitos) e atualização de cada depósito pela mediana
+    geométrica ponderada do seu grupo (Weiszfeld). Opcionalmente, trocas locais
+    movem um depósito para um ponto mal atendido quando isso reduz o custo.
+
+    Args:
+        lonlat: Array (n, 2) de longitude/latitude dos pontos de demanda
+        weights: Peso de cada ponto (por exemplo, a pontuação de prioridade)
+        k: Número de depósitos
+        max_iterations: Máximo de iterações de Lloyd
+        swap_attempts: Tentativas de troca local após a convergência (0 desativa)
+        seed: Semente do gerador aleatório
+
+    Returns:
+        Posições dos depósitos, atribuição dos pontos e custo final
+    """
+    from scipy.spatial import cKDTree
+
+    start = time.perf_counter()
+    lonlat = np.asarray(lonlat, dtype=np.float64).reshape(-1, 2)
+    weights = np.asarray(weights, dtype=np.float64)
+    valid = ~np.isnan(lonlat).any(axis=1)
+    if not valid.any() or k < 1:
+        raise ValueError("São necessários pontos com localização e pelo menos um depósito")
+    if weights[valid].sum() <= 0:
+        weights = np.ones_like(weights)
+
+    reference = (float(np.mean(lonlat[valid, 0])), float(np.mean(lonlat[valid, 1])))
+    points = project_lonlat(lonlat[valid], reference)
+    w = weights[valid]
+    k = min(k, len(points))
+    rng = np.random.default_rng(seed)
+
+    centers, iterations = _lloyd(points, w, _seed_centers(points, w, k, rng), max_iterations, cKDTree)
+
+    swaps = 0
+    if swap_attempts and 1 < k < len(points):
+        centers, swaps = _local_swaps(points, w, centers, swap_attempts, rng, cKDTree)
+        if swaps:
+            centers, more = _lloyd(points, w, centers, max_iterations, cKDTree)
+            iterations += more
+
+    distances, assignment = cKDTree(centers).query(points)
+    full_assignment = np.full(len(lonlat), -1, dtype=np.int64)
+    full_assignment[valid] = assignment
+    return PlacementResult(
+        depots=_unproject(centers, reference),
+        assignment=full_assignment,
+        cost_km=float(np.dot(w, distances) / w.sum()) / 1000.0,
+        iterations=iterations,
+        swaps=swaps,
+        elapsed_seconds=time.perf_counter() - start
+    )
+
+
+def position_resources(zones: List[Zone], resources: List[Resource], swap_attempts: int = 200,
+                       seed: Optional[int] = None) -> Dict[str, PlacementResult]:
+    """
+    Posiciona os recursos de cada tipo nas bases que minimizam a distância de resposta
+    ponderada pela prioridade das zonas, gravando a posição em `Resource.location`.
+
+    Cada unidade de um tipo recebe sua própria base (k = número de unidades do tipo,
+    limitado ao número de zonas; unidades excedentes dividem as bases).
+
+    Returns:
+        Resultado do posicionamento por tipo de recurso
+    """
+    geometry = zone_geometry(zones)
+    weights = np.array([zone.priority_score for zone in zones], dtype=np.float64)
+
+    by_type: Dict[str, List[Resource]] = {}
+    for resource in resources:
+        by_type.setdefault(resource.type, []).append(resource)
+
+    results = {}
+    for resource_type, units in by_type.items():
+        result = place_depots(geometry.centroids, weights, len(units), swap_attempts=swap_attempts, seed=seed)
+        # Bases com mais demanda atribuída recebem as unidades de maior capacidade
+        demand = np.bincount(result.assignment[result.assignment >= 0], weights=weights[result.assignment >= 0],
+                             minlength=len(result.depots))
+        order = np.argsort(-demand, kind='stable')
+        for i, resource in enumerate(sorted(units, key=lambda r: r.capacity, reverse=True)):
+            lon, lat = result.depots[order[i % len(order)]]
+            resource.location = Point(lon, lat)
+        results[resource_type] = result
+    return results
+
+
+def _lloyd(points: np.ndarray, w: np.ndarray, centers: np.ndarray, max_iterations: int, tree_class):
+    cost = np.inf
+    iterations = 0
+    for iterations in range(1, max_iterations + 1):
+        distances, assignment = tree_class(centers).query(points)
+        new_cost = float(np.dot(w, distances))
+        if cost - new_cost <= TOLERANCE * new_cost:
+            break
+        cost = new_cost
+        centers = _weiszfeld(points, w, assignment, centers)
+        _reseed_empty(points, w, distances, assignment, centers)
+    return centers, iterations
+
+
+def _seed_centers(points: np.ndarray, w: np.ndarray, k: int, rng) -> np.ndarray:
+    # k-means++ ponderado, adaptado para distâncias (não quadradas) em uma amostra dos pontos
+    # Amostra ponderada só entre os pontos com peso; zonas de prioridade zero são válidas
+    size = min(len(points), max(20 * k, 2000), int(np.count_nonzero(w)))
+    sample = rng.choice(len(points), size=size, replace=False, p=w / w.sum())
+    if len(sample) < k:
+        # Menos pontos com peso que depósitos: completa os candidatos com pontos sem peso
+        others = np.setdiff1d(np.arange(len(points)), sample)
+        sample = np.concatenate([sample, rng.choice(others, size=min(k - len(sample), len(others)), replace=False)])
+    candidates, candidate_w = points[sample], w[sample]
+    centers = [candidates[rng.choice(len(candidates), p=candidate_w / candidate_w.sum())]]
+    distances = np.linalg.norm(candidates - centers[0], axis=1)
+    for _ in range(1, k):
+        score = candidate_w * distances
+        if score.sum() <= 0:
+            # Todos os candidatos com peso já são centros: sorteio pela distância entre os demais
+            score = distances
+        if score.sum() <= 0:
+            centers.append(candidates[rng.integers(len(candidates))])
+        else:
+            centers.append(candidates[rng.choice(len(candidates), p=score / score.sum())])
+        distances = np.minimum(distances, np.linalg.norm(candidates - centers[-1], axis=1))
+    return np.array(centers)
+
+
+def _weiszfeld(points: np.ndarray, w: np.ndarray, assignment: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    k = len(centers)
+    centers = centers.copy()
+    for _ in range(WEISZFELD_STEPS):
+        distances = np.linalg.norm(points - centers[assignment], axis=1)
+        inverse = w / np.maximum(distances, 1.0)
+        total = np.bincount(assignment, weights=inverse, minlength=k)
+        x = np.bincount(assignment, weights=inverse * points[:, 0], minlength=k)
+        y = np.bincount(assignment, weights=inverse * points[:, 1], minlength=k)
+        occupied = total > 0
+        centers[occupied, 0] = x[occupied] / total[occupied]
+        centers[occupied, 1] = y[occupied] / total[occupied]
+    return centers
+
+
+def _reseed_empty(points: np.ndarray, w: np.ndarray, distances: np.ndarray,
+                  assignment: np.ndarray, centers: np.ndarray) -> None:
+    # Depósitos sem pontos vão para os pontos de maior custo ponderado
+    empty = np.flatnonzero(np.bincount(assignment, minlength=len(centers)) == 0)
+    if len(empty):
+        worst = np.argsort(-(w * distances))[:len(empty)]
+        centers[empty] = points[worst]
+
+
+def _local_swaps(points: np.ndarray, w: np.ndarray, centers: np.ndarray, attempts: int,
+                 rng, tree_class):
+    # Troca um depósito por um ponto candidato (sorteado entre os mal atendidos).
+    # Com a primeira e a segunda distância de cada ponto, o custo de trocar cada
+    # depósito j pelo candidato sai de um único bincount: O(n) por tentativa
+    centers = centers.copy()
+    k = len(centers)
+    swaps = 0
+
+    def nearest_two():
+        distances, nearest = tree_class(centers).query(points, k=2)
+        return distances[:, 0], distances[:, 1], nearest[:, 0]
+
+    d1, d2, owner = nearest_two()
+    cost = float(np.dot(w, d1))
+    for _ in range(attempts):
+        score = w * d1
+        if score.sum() <= 0:
+            break
+        candidate = points[rng.choice(len(points), p=score / score.sum())]
+        to_candidate = np.linalg.norm(points - candidate, axis=1)
+        kept = np.minimum(d1, to_candidate)
+        # Pontos do depósito removido passam ao segundo mais próximo ou ao candidato
+        delta = np.bincount(owner, weights=w * (np.minimum(d2, to_candidate) - kept), minlength=k)
+        new_costs = float(np.dot(w, kept)) + delta
+        j = int(np.argmin(new_costs))
+        if new_costs[j] < cost * (1 - TOLERANCE):
+            centers[j] = candidate
+            swaps += 1
+            d1, d2, owner = nearest_two()
+            cost = float(np.dot(w, d1))
+    return centers, swaps
+
+
+def _unproject(points: np.ndarray, reference) -> np.ndarray:
+    lon0, lat0 = reference
+    lon = points[:, 0] / (METERS_PER_DEGREE * np.cos(np.radians(lat0))) + lon0
+    lat = points[:, 1] / METERS_PER_DEGREE + lat0
+    return np.column_stack([lon, lat])
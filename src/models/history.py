@@ -0,0 +1,219 @@
+import uuid
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+STRING_COLUMNS = ('zone_id', 'zone_name', 'resource_id', 'resource_type')
+FLOAT_COLUMNS = ('priority_score', 'capacity_allocated')
+INT_COLUMNS = ('run',)
+COLUMNS = INT_COLUMNS + STRING_COLUMNS + FLOAT_COLUMNS
+
+
+class AllocationHistory:
+    """
+    Histórico de alocações em colunas, somente de acréscimo e dividido em blocos.
+
+    Textos são codificados por dicionário (códigos inteiros em `array`) e números
+    ficam em `array('d')`. Totais, contagem de linhas e o número de zonas distintas
+    são mantidos incrementalmente, então as métricas custam O(1). Com `max_rows`,
+    os blocos mais antigos são descartados (ou gravados em Parquet em `spill_dir`,
+    com nomes únicos por instância) e os dicionários de texto são reconstruídos só
+    com os valores ainda em uso.
+    """
+
+    def __init__(self, chunk_size: int = 4096, max_rows: Optional[int] = None,
+                 spill_dir: Optional[Union[str, Path]] = None):
+        self.chunk_size = chunk_size
+        self.max_rows = max_rows
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else None
+        self.spilled_files: List[Path] = []
+        # Prefixo dos arquivos desta instância: outras instâncias (ou processos) podem
+        # gravar no mesmo diretório
+        self._spill_prefix = f"allocation_history_{datetime.now():%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:8]}"
+        self.clear()
+
+    def clear(self) -> None:
+        self._codes: Dict[str, Dict[str, int]] = {name: {} for name in STRING_COLUMNS}
+        self._values: Dict[str, List[str]] = {name: [] for name in STRING_COLUMNS}
+        self._chunks: List[Dict[str, array]] = []
+        self._current = self._new_chunk()
+        self._rows = 0
+        self._run = 0
+        self._totals = {name: 0.0 for name in FLOAT_COLUMNS}
+        self._zone_counts: Dict[int, int] = {}
+
+    def start_run(self) -> int:
+        """Inicia uma nova rodada de alocação; as linhas seguintes recebem o novo número."""
+        self._run += 1
+        return self._run
+
+    def append(self, zone_id: str, resource_id: str, priority_score: float = 0.0,
+               zone_name: str = '', resource_type: str = '', capacity_allocated: float = 0.0) -> None:
+        chunk = self._current
+        chunk['run'].append(self._run)
+        zone_code = self._encode('zone_id', zone_id)
+        chunk['zone_id'].append(zone_code)
+        chunk['zone_name'].append(self._encode('zone_name', zone_name))
+        chunk['resource_id'].append(self._encode('resource_id', resource_id))
+        chunk['resource_type'].append(self._encode('resource_type', resource_type))
+        chunk['priority_score'].append(priority_score)
+        chunk['capacity_allocated'].append(capacity_allocated)
+
+        self._rows += 1
+        self._totals['priority_score'] += priority_score
+        self._totals['capacity_allocated'] += capacity_allocated
+        self._zone_counts[zone_code] = self._zone_counts.get(zone_code, 0) + 1
+
+        if len(chunk['run']) >= self.chunk_size:
+            self._chunks.append(chunk)
+            self._current = self._new_chunk()
+            self._enforce_retention()
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __iter__(self) -> Iterator[Dict]:
+        for chunk in self._chunks + [self._current]:
+            for i in range(len(chunk['run'])):
+                yield self._row(chunk, i)
+
+    def total(self, column: str) -> float:
+        return self._totals[column]
+
+    def mean(self, column: str) -> float:
+        return self._totals[column] / self._rows if self._rows else 0.0
+
+    @property
+    def distinct_zones(self) -> int:
+        return len(self._zone_counts)
+
+    def to_arrow(self, include_spilled: bool = False):
+        """
+        Exporta o histórico como `pyarrow.Table`, com colunas de texto codificadas por dicionário.
+
+        Args:
+            include_spilled: Inclui os blocos já gravados em disco
+
+        Returns:
+            Tabela Arrow com uma linha por alocação
+        """
+        import numpy as np
+        import pyarrow as pa
+
+        chunks = self._chunks + [self._current]
+        arrays = []
+        for name in COLUMNS:
+            data = np.concatenate([np.frombuffer(c[name], dtype=c[name].typecode) for c in chunks])
+            if name in STRING_COLUMNS:
+                arrays.append(pa.DictionaryArray.from_arrays(
+                    pa.array(data.astype(np.int32)), pa.array(self._values[name], type=pa.string())))
+            else:
+                arrays.append(pa.array(data))
+        table = pa.Table.from_arrays(arrays, names=list(COLUMNS))
+
+        if include_spilled and self.spilled_files:
+            import pyarrow.parquet as pq
+            # Dicionários diferem entre blocos; unifica como texto simples
+            tables = [pq.read_table(path) for path in self.spilled_files] + [table]
+            tables = [self._decode_dictionaries(t) for t in tables]
+            table = pa.concat_tables(tables)
+        return table
+
+    def to_parquet(self, path: Union[str, Path], include_spilled: bool = False) -> None:
+        import pyarrow.parquet as pq
+
+        pq.write_table(self.to_arrow(include_spilled), path)
+
+    def _encode(self, column: str, value: str) -> int:
+        codes = self._codes[column]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+            self._values[column].append(value)
+        return code
+
+    def _row(self, chunk: Dict[str, array], i: int) -> Dict:
+        row = {'run': chunk['run'][i]}
+        for name in STRING_COLUMNS:
+            row[name] = self._values[name][chunk[name][i]]
+        for name in FLOAT_COLUMNS:
+            row[name] = chunk[name][i]
+        return row
+
+    def _enforce_retention(self) -> None:
+        if self.max_rows is None:
+            return
+        dropped = False
+        while self._chunks and self._rows - len(self._chunks[0]['run']) >= self.max_rows:
+            chunk = self._chunks.pop(0)
+            if self.spill_dir is not None:
+                self._spill(chunk)
+
+            self._rows -= len(chunk['run'])
+            for name in FLOAT_COLUMNS:
+                self._totals[name] -= sum(chunk[name])
+            for zone_code in chunk['zone_id']:
+                remaining = self._zone_counts[zone_code] - 1
+                if remaining:
+                    self._zone_counts[zone_code] = remaining
+                else:
+                    del self._zone_counts[zone_code]
+            dropped = True
+
+        # Textos dos blocos descartados continuam nos dicionários; reconstruídos quando
+        # passam do dobro das linhas retidas, o custo fica amortizado entre os acréscimos
+        if dropped and max(len(values) for values in self._values.values()) > 2 * self._rows:
+            self._compact_dictionaries()
+
+    def _compact_dictionaries(self) -> None:
+        chunks = self._chunks + [self._current]
+        for name in STRING_COLUMNS:
+            values = self._values[name]
+            remap: Dict[int, int] = {}
+            kept: List[str] = []
+            for chunk in chunks:
+                column = chunk[name]
+                for i, code in enumerate(column):
+                    new_code = remap.get(code)
+                    if new_code is None:
+                        new_code = remap[code] = len(kept)
+                        kept.append(values[code])
+                    column[i] = new_code
+            self._values[name] = kept
+            self._codes[name] = {value: code for code, value in enumerate(kept)}
+            if name == 'zone_id':
+                self._zone_counts = {remap[code]: count for code, count in self._zone_counts.items()}
+
+    def _spill(self, chunk: Dict[str, array]) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        columns = {}
+        for name in COLUMNS:
+            if name in STRING_COLUMNS:
+                values = self._values[name]
+                columns[name] = pa.array([values[code] for code in chunk[name]], type=pa.string())
+            else:
+                columns[name] = pa.array(chunk[name].tolist())
+
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        path = self.spill_dir / f"{self._spill_prefix}_{len(self.spilled_files):05d}.parquet"
+        pq.write_table(pa.table(columns), path)
+        self.spilled_files.append(path)
+
+    @staticmethod
+    def _decode_dictionaries(table):
+        import pyarrow as pa
+
+        for i, field in enumerate(table.schema):
+            if pa.types.is_dictionary(field.type):
+                table = table.set_column(i, field.name, table.column(i).cast(pa.string()))
+        return table
+
+    @staticmethod
+    def _new_chunk() -> Dict[str, array]:
+        chunk = {name: array('q') for name in INT_COLUMNS}
+        chunk.update({name: array('i') for name in STRING_COLUMNS})
+        chunk.update({name: array('d') for name in FLOAT_COLUMNS})
+        return chunk
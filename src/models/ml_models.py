@@ -1,13 +1,38 @@
+import threading
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-import networkx as nx
 from typing import List, Dict, Tuple
 from shapely.geometry import Point
+from src.utils.geometry import resource_coordinates, zone_geometry
+from src.utils.distance import haversine_matrix, haversine_pairwise, nearest
+from src.models.shortest_paths import ShortestPathTree
+from src.utils.cache import LRUCache
+
+# sklearn e networkx são importados sob demanda para não pesar na inicialização
+# das páginas que só importam este módulo
+
+# Fator de custo de travessia de uma zona:
+# 1 + DAMAGE_PENALTY * danos na infraestrutura + ACCESSIBILITY_PENALTY * (1 - acessibilidade)
+INFRASTRUCTURE_DAMAGE_PENALTY = 2.0
+LOW_ACCESSIBILITY_PENALTY = 1.0
+
+# Consultas a partir da mesma origem antes de manter a árvore completa em cache
+HOT_SOURCE_QUERIES = 3
+
+def zone_to_features(zone) -> Dict:
+    return {
+        'population': zone.population,
+        'infrastructure_damage': zone.infrastructure_damage,
+        'accessibility': zone.accessibility,
+        'critical_facilities': zone.critical_facilities,
+        'historical_risk': zone.historical_risk,
+        'damage_level': zone.damage_level
+    }
 
 class DisasterPredictor:
     def __init__(self):
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.preprocessing import StandardScaler
+
         self.model = RandomForestRegressor(n_estimators=100, random_state=42)
         self.scaler = StandardScaler()
         self.is_trained = False
@@ -26,6 +51,8 @@ class DisasterPredictor:
         return np.array(features)
 
     def train(self, historical_data: List[Dict]):
+        from sklearn.model_selection import train_test_split
+
         X = self.prepare_features(historical_data)
         y = np.array([zone.get('damage_level', 0) for zone in historical_data])
         
@@ -46,44 +73,319 @@ class DisasterPredictor:
         return self.model.predict(X_scaled)
 
 class RouteOptimizer:
-    def __init__(self):
-        self.graph = nx.Graph()
+    def __init__(self, damage_aware: bool = True, max_cached_paths: int = 4096,
+                 max_cached_trees: int = 32):
+        import networkx as nx
+
+        self._graph = nx.Graph()
+        # Arrays de um grafo restaurado de snapshot, montado só no primeiro acesso a `graph`
+        self._pending_graph = None
+        self.damage_aware = damage_aware
+        self.resource_positions: Dict[str, np.ndarray] = {}
+        self._zone_ids: List[str] = []
+        self._zone_centers = np.empty((0, 2))
+        # Fator de custo de travessia de cada zona e lentidões/bloqueios informados por aresta
+        self._zone_factors: Dict[str, float] = {}
+        self._slowdowns: Dict[Tuple[str, str], float] = {}
+        self._closed: Dict[Tuple[str, str], float] = {}
+        # Caminhos por (versão do grafo, origem, destino) e árvores completas das origens
+        # mais consultadas (depósitos, por exemplo); as árvores são corrigidas a cada
+        # atualização de aresta e descartadas quando o grafo é reconstruído
+        self.graph_version = 0
+        self._paths = LRUCache(max_cached_paths)
+        self._trees = LRUCache(max_cached_trees)
+        self._source_queries: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self.nodes_recomputed = 0
+
+    @property
+    def graph(self):
+        if self._pending_graph is not None:
+            with self._lock:
+                if self._pending_graph is not None:
+                    self._materialize(*self._pending_graph)
+                    self._pending_graph = None
+        return self._graph
 
     def build_graph(self, zones: List[Dict], resources: List[Dict]):
-        self.graph.clear()
-        
-        for zone in zones:
-            # Extrair coordenadas do centro do polígono
-            center = zone.geometry.centroid
-            self.graph.add_node(zone.id, 
-                              pos=(center.x, center.y),
-                              demand=zone.population,
-                              damage=zone.damage_level)
-        
-        for i, zone1 in enumerate(zones):
-            for zone2 in zones[i+1:]:
-                center1 = zone1.geometry.centroid
-                center2 = zone2.geometry.centroid
-                distance = self._calculate_distance(
-                    (center1.x, center1.y),
-                    (center2.x, center2.y)
-                )
-                self.graph.add_edge(zone1.id, zone2.id, weight=distance)
+        with self._lock:
+            self._pending_graph = None
+            self.graph.clear()
+            self._trees.clear()
+            self._source_queries.clear()
+            self._bump_version()
+            self._slowdowns.clear()
+            self._closed.clear()
+
+            # Centroides de todas as zonas vêm do cache de geometria (uma chamada vetorizada)
+            geometry = zone_geometry(zones)
+            centers = geometry.centroids.tolist()
+            
+            for zone, center in zip(zones, centers):
+                self.graph.add_node(zone.id, 
+                                  pos=tuple(center),
+                                  demand=zone.population,
+                                  damage=zone.damage_level)
+            self._zone_factors = {zone.id: self._zone_factor(zone.infrastructure_damage, zone.accessibility)
+                                  for zone in zones}
+            
+            # Distâncias em km (haversine), calculadas de uma vez para todos os pares;
+            # o peso é a distância multiplicada pelo custo médio de travessia das duas zonas
+            distances = haversine_matrix(geometry.centroids, geometry.centroids)
+            rows, cols = np.triu_indices(len(zones), k=1)
+            factors = np.array([self._zone_factors[zone_id] for zone_id in geometry.ids])
+            edge_distances = distances[rows, cols]
+            weights = edge_distances * (factors[rows] + factors[cols]) / 2
+            self.graph.add_edges_from(
+                (geometry.ids[i], geometry.ids[j], {'distance': d, 'weight': w})
+                for i, j, d, w in zip(rows.tolist(), cols.tolist(), edge_distances.tolist(), weights.tolist())
+            )
+
+            # Posições dos recursos, usadas para ligar um recurso à zona mais próxima
+            self._zone_ids = geometry.ids
+            self._zone_centers = geometry.centroids
+            self.resource_positions = dict(zip([r.id for r in resources], resource_coordinates(resources)))
+
+    def export_graph(self) -> Tuple[List[str], List[str], Dict[str, np.ndarray]]:
+        """
+        Grafo em arrays, para snapshots: arestas em CSR (cada ligação uma vez, da zona
+        de menor índice para a de maior), atributos das zonas, ligações fechadas e lentidões.
+
+        Returns:
+            Tupla com os IDs das zonas, os IDs dos recursos e os arrays
+        """
+        with self._lock:
+            zone_ids = list(self._zone_ids)
+            index = {zone_id: i for i, zone_id in enumerate(zone_ids)}
+            rows, cols, distances, weights = [], [], [], []
+            for u, v, attrs in self.graph.edges(data=True):
+                i, j = sorted((index[u], index[v]))
+                rows.append(i)
+                cols.append(j)
+                distances.append(attrs['distance'])
+                weights.append(attrs['weight'])
+            rows = np.asarray(rows, dtype=np.int64)
+            order = np.lexsort((cols, rows))
+            indptr = np.zeros(len(zone_ids) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(rows, minlength=len(zone_ids)), out=indptr[1:])
+
+            def pairs(keys):
+                return np.array([(index[u], index[v]) for u, v in keys], dtype=np.int64).reshape(-1, 2)
+
+            nodes = self.graph.nodes
+            resource_ids = list(self.resource_positions)
+            arrays = {
+                'indptr': indptr,
+                'indices': np.asarray(cols, dtype=np.int32)[order],
+                'distances': np.asarray(distances, dtype=np.float64)[order],
+                'weights': np.asarray(weights, dtype=np.float64)[order],
+                'centers': np.asarray(self._zone_centers, dtype=np.float64).reshape(-1, 2),
+                'demand': np.array([nodes[z]['demand'] for z in zone_ids], dtype=np.int64),
+                'damage': np.array([nodes[z]['damage'] for z in zone_ids], dtype=np.float64),
+                'factors': np.array([self._zone_factors.get(z, 1.0) for z in zone_ids], dtype=np.float64),
+                'closed_pairs': pairs(self._closed),
+                'closed_distances': np.array(list(self._closed.values()), dtype=np.float64),
+                'slowdown_pairs': pairs(self._slowdowns),
+                'slowdown_factors': np.array(list(self._slowdowns.values()), dtype=np.float64),
+                'resource_positions': np.array([self.resource_positions[r] for r in resource_ids],
+                                               dtype=np.float64).reshape(-1, 2),
+            }
+            return zone_ids, resource_ids, arrays
+
+    def restore_graph(self, zone_ids: List[str], resource_ids: List[str], arrays: Dict[str, np.ndarray]) -> None:
+        """
+        Restaura o grafo de `export_graph` sem recalcular distâncias nem pesos.
+
+        Posições de zonas e recursos ficam disponíveis na hora; os nós e arestas do
+        networkx só são montados no primeiro acesso a `graph`.
+        """
+        with self._lock:
+            self._pending_graph = None
+            self.graph.clear()
+            self._trees.clear()
+            self._source_queries.clear()
+            self._bump_version()
+
+            self._zone_factors = dict(zip(zone_ids, arrays['factors'].tolist()))
+            self._closed = {_edge_key(zone_ids[i], zone_ids[j]): d
+                            for (i, j), d in zip(arrays['closed_pairs'].tolist(), arrays['closed_distances'].tolist())}
+            self._slowdowns = {_edge_key(zone_ids[i], zone_ids[j]): f
+                               for (i, j), f in zip(arrays['slowdown_pairs'].tolist(),
+                                                    arrays['slowdown_factors'].tolist())}
+            self._zone_ids = list(zone_ids)
+            self._zone_centers = np.array(arrays['centers'])
+            self.resource_positions = dict(zip(resource_ids, np.array(arrays['resource_positions'])))
+            self._pending_graph = (self._zone_ids, arrays)
+
+    def _materialize(self, zone_ids: List[str], arrays: Dict[str, np.ndarray]) -> None:
+        self._graph.add_nodes_from(
+            (zone_id, {'pos': tuple(center), 'demand': demand, 'damage': damage})
+            for zone_id, center, demand, damage
+            in zip(zone_ids, self._zone_centers.tolist(), arrays['demand'].tolist(), arrays['damage'].tolist())
+        )
+        indptr = np.asarray(arrays['indptr'])
+        rows = np.repeat(np.arange(len(zone_ids)), np.diff(indptr))
+        self._graph.add_edges_from(
+            (zone_ids[i], zone_ids[j], {'distance': d, 'weight': w})
+            for i, j, d, w in zip(rows.tolist(), arrays['indices'].tolist(),
+                                  arrays['distances'].tolist(), arrays['weights'].tolist())
+        )
+
+    def _zone_factor(self, infrastructure_damage: float, accessibility: float) -> float:
+        if not self.damage_aware:
+            return 1.0
+        damage = min(max(infrastructure_damage, 0.0), 1.0)
+        access = min(max(accessibility, 0.0), 1.0)
+        return 1.0 + INFRASTRUCTURE_DAMAGE_PENALTY * damage + LOW_ACCESSIBILITY_PENALTY * (1.0 - access)
+
+    def _edge_weight(self, u: str, v: str, distance: float) -> float:
+        factor = (self._zone_factors.get(u, 1.0) + self._zone_factors.get(v, 1.0)) / 2
+        return distance * factor * self._slowdowns.get(_edge_key(u, v), 1.0)
 
     def _calculate_distance(self, point1: Tuple[float, float], point2: Tuple[float, float]) -> float:
-        x1, y1 = point1
-        x2, y2 = point2
-        return np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
+        # Distância de grande círculo em km entre dois pontos (lon, lat)
+        return float(haversine_pairwise([point1], [point2])[0])
+
+    def close_edge(self, zone_a: str, zone_b: str) -> int:
+        """Fecha a ligação entre duas zonas (via bloqueada). Retorna os nós recalculados."""
+        with self._lock:
+            key = _edge_key(zone_a, zone_b)
+            if not self.graph.has_edge(*key):
+                return 0
+            attrs = self.graph.edges[key]
+            self._closed[key] = attrs['distance']
+            old = attrs['weight']
+            self.graph.remove_edge(*key)
+            return self._apply_changes([(key[0], key[1], old, None)])
+
+    def reopen_edge(self, zone_a: str, zone_b: str) -> int:
+        """Reabre uma ligação fechada, com o peso atual (incluindo lentidão informada)."""
+        with self._lock:
+            key = _edge_key(zone_a, zone_b)
+            if key not in self._closed:
+                return 0
+            distance = self._closed.pop(key)
+            weight = self._edge_weight(key[0], key[1], distance)
+            self.graph.add_edge(key[0], key[1], distance=distance, weight=weight)
+            return self._apply_changes([(key[0], key[1], None, weight)])
+
+    def set_edge_slowdown(self, zone_a: str, zone_b: str, factor: float) -> int:
+        """Multiplica o custo da ligação por `factor` (1.0 remove a lentidão)."""
+        if factor <= 0:
+            raise ValueError("O fator de lentidão deve ser positivo")
+        with self._lock:
+            key = _edge_key(zone_a, zone_b)
+            if factor == 1.0:
+                self._slowdowns.pop(key, None)
+            else:
+                self._slowdowns[key] = factor
+            if not self.graph.has_edge(*key):
+                return 0
+            return self._reweight([key])
+
+    def update_zone_condition(self, zone_id: str, infrastructure_damage: float,
+                              accessibility: float) -> int:
+        """Atualiza o custo de travessia de uma zona e de todas as suas ligações."""
+        with self._lock:
+            if zone_id not in self.graph:
+                raise KeyError(f"Zona desconhecida: {zone_id}")
+            self._zone_factors[zone_id] = self._zone_factor(infrastructure_damage, accessibility)
+            return self._reweight([_edge_key(zone_id, neighbor) for neighbor in self.graph.adj[zone_id]])
+
+    def _reweight(self, keys: List[Tuple[str, str]]) -> int:
+        changes = []
+        for u, v in keys:
+            attrs = self.graph.edges[u, v]
+            old = attrs['weight']
+            attrs['weight'] = self._edge_weight(u, v, attrs['distance'])
+            if attrs['weight'] != old:
+                changes.append((u, v, old, attrs['weight']))
+        return self._apply_changes(changes)
+
+    def _apply_changes(self, changes: List) -> int:
+        # Só as árvores em cache são corrigidas, e apenas nas partes afetadas
+        recomputed = 0
+        if changes:
+            self._bump_version()
+            for tree in self._trees.values():
+                recomputed += tree.update(self.graph, changes)
+        self.nodes_recomputed += recomputed
+        return recomputed
+
+    def _bump_version(self) -> None:
+        # Caminhos de versões anteriores nunca mais seriam consultados
+        self.graph_version += 1
+        self._paths.clear()
+
+    def _tree(self, source: str) -> ShortestPathTree:
+        import networkx as nx
+
+        with self._lock:
+            tree = self._trees.get(source)
+            if tree is None:
+                if source not in self.graph:
+                    raise nx.NodeNotFound(f"Source {source} is not in G")
+                tree = ShortestPathTree(self.graph, source)
+                self._trees.put(source, tree)
+            return tree
+
+    def _cached_path(self, source: str, target: str, use_tree: bool) -> List[str]:
+        import networkx as nx
+
+        key = (self.graph_version, source, target)
+        path = self._paths.get(key)
+        if path is None:
+            queries = self._source_queries[source] = self._source_queries.get(source, 0) + 1
+            if use_tree or queries >= HOT_SOURCE_QUERIES or source in self._trees:
+                path = self._tree(source).path(target)
+            else:
+                try:
+                    path = nx.shortest_path(self.graph, source=source, target=target, weight='weight')
+                except nx.NetworkXNoPath:
+                    path = []
+            self._paths.put(key, path)
+        return list(path)
+
+    def cache_stats(self) -> Dict:
+        """Contadores dos caches de caminhos e de árvores, para ajuste dos tamanhos."""
+        with self._lock:
+            return {
+                'graph_version': self.graph_version,
+                'paths': self._paths.stats(),
+                'trees': self._trees.stats(),
+                'nodes_recomputed': self.nodes_recomputed
+            }
+
+    def nearest_zone(self, resource_id: str) -> str:
+        """Zona do grafo mais próxima da posição do recurso, ou None se não houver."""
+        position = self.resource_positions.get(resource_id)
+        if position is None:
+            return None
+        zone_ids, _ = self.nearest_zones(position)
+        return zone_ids[0]
+
+    def nearest_zones(self, lonlat: np.ndarray) -> Tuple[List[str], np.ndarray]:
+        """
+        Zona do grafo mais próxima de cada ponto (lon, lat).
+
+        Returns:
+            Tupla com os IDs das zonas (None para pontos sem localização) e as distâncias em km
+        """
+        if not self._zone_ids:
+            points = np.asarray(lonlat, dtype=np.float64).reshape(-1, 2)
+            return [None] * len(points), np.full(len(points), np.inf)
+        indices, distances = nearest(lonlat, self._zone_centers)
+        return [self._zone_ids[i] if i >= 0 else None for i in indices], distances
 
     def find_optimal_route(self, start_zone_id: str, target_zone_id: str) -> List[str]:
-        try:
-            path = nx.shortest_path(self.graph, 
-                                  source=start_zone_id,
-                                  target=target_zone_id,
-                                  weight='weight')
-            return path
-        except nx.NetworkXNoPath:
-            return []
+        with self._lock:
+            return self._cached_path(start_zone_id, target_zone_id, use_tree=False)
+
+    def find_optimal_routes(self, pairs: List[Tuple[str, str]]) -> List[List[str]]:
+        # Uma única árvore de caminhos mínimos por origem atende todos os destinos do lote
+        with self._lock:
+            return [self._cached_path(start_zone_id, target_zone_id, use_tree=True)
+                    for start_zone_id, target_zone_id in pairs]
 
     def get_resource_allocation_route(self, 
                                     resource_location: str,
@@ -91,15 +393,32 @@ class RouteOptimizer:
         if not target_zones:
             return []
             
-        current = resource_location
-        route = [current]
+        # A partida pode ser uma zona ou um recurso; o recurso entra pela zona mais próxima
+        if resource_location in self.graph:
+            current = resource_location
+            route = [current]
+        else:
+            current = self.nearest_zone(resource_location)
+            if current is None:
+                raise KeyError(f"Origem desconhecida: {resource_location}")
+            route = [resource_location, current]
         remaining = set(target_zones)
+        remaining.discard(current)
         
-        while remaining:
-            next_zone = min(remaining,
-                          key=lambda x: self.graph[current][x]['weight'])
-            route.append(next_zone)
-            current = next_zone
-            remaining.remove(next_zone)
+        with self._lock:
+            while remaining:
+                # Próxima zona pelo custo do caminho mínimo; ligações fechadas são contornadas
+                tree = self._tree(current)
+                next_zone = min(remaining, key=lambda x: tree.dist.get(x, float('inf')))
+                path = tree.path(next_zone)
+                if not path:
+                    break
+                route.extend(path[1:])
+                current = next_zone
+                remaining.remove(next_zone)
             
-        return route 
\ No newline at end of file
+        return route
+
+
+def _edge_key(zone_a: str, zone_b: str) -> Tuple[str, str]:
+    return (zone_a, zone_b) if zone_a <= zone_b else (zone_b, zone_a)
@@ -0,0 +1,251 @@
+import heapq
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterator, List, Mapping, Sequence, Tuple
+import numpy as np
+from src.models.zone import Zone, MAX_DAMAGE_LEVEL, POPULATION_SCALE
+
+# Normalizadores: levam o atributo bruto a [0, 1], em que 1 é o mais urgente
+NORMALIZERS = ('linear', 'log', 'inverse', 'minmax')
+
+# Maior bloco ordenado de uma vez por LazyRanking; limita o trabalho entre duas verificações
+# do relógio na alocação anytime
+MAX_RANKING_BLOCK = 1 << 17
+
+
+@dataclass(frozen=True)
+class Criterion:
+    # Atributo de Zone (ou coluna de um DataFrame de zonas)
+    attribute: str
+    weight: float
+    normalizer: str = 'linear'
+    # Valor que corresponde a 1 em 'linear', 'log' e 'inverse'
+    scale: float = 1.0
+
+
+# Pontuação original de Zone.calculate_priority: dano e população
+DEFAULT_CRITERIA = (
+    Criterion('damage_level', 0.6, 'linear', MAX_DAMAGE_LEVEL),
+    Criterion('population', 0.4, 'linear', POPULATION_SCALE),
+)
+
+# Todos os atributos da zona; zonas de difícil acesso ficam mais tempo sem atendimento
+MULTI_CRITERIA = (
+    Criterion('damage_level', 0.35, 'linear', MAX_DAMAGE_LEVEL),
+    Criterion('population', 0.25, 'log', POPULATION_SCALE * 10),
+    Criterion('infrastructure_damage', 0.15, 'linear', 1.0),
+    Criterion('accessibility', 0.10, 'inverse', 1.0),
+    Criterion('critical_facilities', 0.10, 'linear', 5.0),
+    Criterion('historical_risk', 0.05, 'linear', 1.0),
+)
+
+
+class PriorityScorer:
+    """
+    Pontuação de prioridade por múltiplos critérios, vetorizada sobre todas as zonas.
+
+    A pontuação é a soma ponderada dos atributos normalizados:
+    'linear' (x / scale, limitado a [0, 1]), 'log' (log1p(x) / log1p(scale)),
+    'inverse' (1 - x / scale) e 'minmax' (relativo ao menor e maior valor do lote).
+    Com DEFAULT_CRITERIA o resultado é igual ao de `Zone.calculate_priority`.
+    """
+
+    def __init__(self, criteria: Sequence[Criterion] = DEFAULT_CRITERIA):
+        unknown = [c.normalizer for c in criteria if c.normalizer not in NORMALIZERS]
+        if unknown:
+            raise ValueError(f"Normalizador desconhecido: {unknown[0]}")
+        self.criteria = tuple(criteria)
+
+    @property
+    def attributes(self) -> List[str]:
+        return [criterion.attribute for criterion in self.criteria]
+
+    def scores(self, columns: Mapping[str, np.ndarray]) -> np.ndarray:
+        """
+        Pontuação de cada linha a partir de colunas de atributos (dict de arrays ou DataFrame).
+        """
+        total = None
+        for criterion in self.criteria:
+            values = np.asarray(columns[criterion.attribute], dtype=np.float64)
+            term = criterion.weight * _normalize(values, criterion)
+            total = term if total is None else total + term
+        return total if total is not None else np.zeros(0)
+
+    def zone_columns(self, zones: List[Zone]) -> Dict[str, np.ndarray]:
+        return {attribute: np.fromiter((getattr(zone, attribute) for zone in zones), dtype=np.float64,
+                                       count=len(zones))
+                for attribute in dict.fromkeys(self.attributes)}
+
+    def score_zones(self, zones: List[Zone]) -> np.ndarray:
+        """Calcula e grava `priority_score` de todas as zonas; devolve as pontuações."""
+        scores = self.scores(self.zone_columns(zones))
+        for zone, score in zip(zones, scores.tolist()):
+            zone.priority_score = score
+        return scores
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Índices das `k` maiores pontuações, em ordem decrescente, sem ordenar o array inteiro.
+
+    Empates seguem a ordem original, como em `sorted(..., reverse=True)`; pontuações
+    NaN ficam por último.
+    """
+    scores = _ranking_scores(scores)
+    chunk, _ = _split_top(np.arange(len(scores)), scores, k)
+    return chunk[np.argsort(-scores[chunk], kind='stable')]
+
+
+def top_zones(zones: List[Zone], k: int) -> List[Zone]:
+    """As `k` zonas de maior `priority_score`, da maior para a menor."""
+    scores = np.fromiter((zone.priority_score for zone in zones), dtype=np.float64, count=len(zones))
+    return [zones[i] for i in top_k(scores, k).tolist()]
+
+
+class LazyRanking:
+    """
+    Índices em ordem decrescente de pontuação, ordenados por blocos sob demanda (argpartition).
+
+    Percorrer só o início custa O(n) em vez de O(n log n); empates seguem a ordem original
+    e pontuações NaN ficam por último.
+    """
+
+    def __init__(self, scores: np.ndarray, initial: int = 1024):
+        self._scores = _ranking_scores(scores)
+        self._order: List[int] = []
+        self._rest = np.arange(len(self._scores))
+        self._extend(max(1, initial))
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def __getitem__(self, position: int) -> int:
+        if not 0 <= position < len(self._scores):
+            raise IndexError(position)
+        while position >= len(self._order):
+            # Blocos crescentes: poucas passadas sobre o restante
+            self._extend(min(3 * len(self._order), MAX_RANKING_BLOCK))
+        return self._order[position]
+
+    def __iter__(self) -> Iterator[int]:
+        for position in range(len(self._scores)):
+            yield self[position]
+
+    def _extend(self, size: int) -> None:
+        chunk, self._rest = _split_top(self._rest, self._scores, size)
+        chunk = chunk[np.argsort(-self._scores[chunk], kind='stable')]
+        self._order.extend(chunk.tolist())
+
+
+class StreamingTopK:
+    """
+    As `k` chaves de maior pontuação sob atualizações contínuas (relatórios de campo).
+
+    Um heap mínimo limitado a `k` membros decide cada atualização em O(log k). Quando
+    a pontuação de um membro cai, outra chave de fora pode passar à frente; a próxima
+    leitura reconstrói o heap com `top_k` sobre as pontuações atuais.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self._scores: Dict[Hashable, float] = {}
+        self._members: Dict[Hashable, float] = {}
+        # (pontuação, sequência, chave); entradas cuja pontuação difere de _members são obsoletas
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._sequence = 0
+        self._stale = False
+        self.rebuilds = 0
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def update(self, key: Hashable, score: float) -> None:
+        self._scores[key] = score
+        if self._stale or self.k <= 0:
+            return
+        member = self._members.get(key)
+        if member is not None:
+            if score < member:
+                self._stale = True
+            else:
+                self._push(key, score)
+        elif len(self._members) < self.k:
+            self._push(key, score)
+        elif score > self._minimum()[0]:
+            _, _, evicted = heapq.heappop(self._heap)
+            del self._members[evicted]
+            self._push(key, score)
+
+    def update_many(self, keys: Sequence[Hashable], scores: Sequence[float]) -> None:
+        for key, score in zip(keys, scores):
+            self.update(key, score)
+
+    def remove(self, key: Hashable) -> None:
+        self._scores.pop(key, None)
+        if self._members.pop(key, None) is not None:
+            self._stale = True
+
+    def top(self) -> List[Tuple[Hashable, float]]:
+        """Pares (chave, pontuação) em ordem decrescente."""
+        if self._stale:
+            self._rebuild()
+        return sorted(self._members.items(), key=lambda item: item[1], reverse=True)
+
+    def _minimum(self) -> Tuple[float, int, Hashable]:
+        heap = self._heap
+        while self._members.get(heap[0][2]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0]
+
+    def _push(self, key: Hashable, score: float) -> None:
+        self._members[key] = score
+        heapq.heappush(self._heap, (score, self._sequence, key))
+        self._sequence += 1
+        # Entradas obsoletas de membros que só subiram; o heap não passa de 4k entradas
+        if len(self._heap) > 4 * max(self.k, 16):
+            self._heap = [(s, i, key) for s, i, key in self._heap if self._members.get(key) == s]
+            heapq.heapify(self._heap)
+
+    def _rebuild(self) -> None:
+        keys = list(self._scores)
+        scores = np.fromiter(self._scores.values(), dtype=np.float64, count=len(keys))
+        chosen = top_k(scores, self.k).tolist()
+        self._members = {keys[i]: float(scores[i]) for i in chosen}
+        self._heap = [(score, i, key) for i, (key, score) in enumerate(self._members.items())]
+        heapq.heapify(self._heap)
+        self._sequence = len(self._heap)
+        self._stale = False
+        self.rebuilds += 1
+
+
+def _normalize(values: np.ndarray, criterion: Criterion) -> np.ndarray:
+    if criterion.normalizer == 'minmax':
+        low, high = np.nanmin(values, initial=np.inf), np.nanmax(values, initial=-np.inf)
+        if not np.isfinite(high - low) or high == low:
+            return np.zeros_like(values)
+        return (values - low) / (high - low)
+    if criterion.normalizer == 'log':
+        return np.clip(np.log1p(np.maximum(values, 0.0)) / np.log1p(criterion.scale), 0.0, 1.0)
+    normalized = np.clip(values / criterion.scale, 0.0, 1.0)
+    return 1.0 - normalized if criterion.normalizer == 'inverse' else normalized
+
+
+def _ranking_scores(scores: np.ndarray) -> np.ndarray:
+    # NaN não é maior nem igual a nenhum limiar: vira -inf para entrar no fim da ordem
+    scores = np.asarray(scores, dtype=np.float64)
+    nan = np.isnan(scores)
+    return np.where(nan, -np.inf, scores) if nan.any() else scores
+
+
+def _split_top(indices: np.ndarray, scores: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Os `size` índices de maior pontuação e o restante, ambos na ordem original;
+    # `scores` não pode ter NaN (ver _ranking_scores)
+    if size <= 0:
+        return indices[:0], indices
+    if size >= len(indices):
+        return indices, indices[:0]
+    values = scores[indices]
+    threshold = np.partition(values, len(values) - size)[len(values) - size]
+    take = values > threshold
+    ties = np.flatnonzero(values == threshold)[:size - int(take.sum())]
+    take[ties] = True
+    return indices[take], indices[~take]
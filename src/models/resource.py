@@ -1,30 +1,30 @@
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional
 from shapely.geometry import Point
 
-@dataclass
+@dataclass(slots=True)
 class Resource:
     id: str
     name: str
     type: str
     capacity: int
     location: Point
-    assigned_zones: List[str] = None
+    # IDs das zonas atendidas; dict como conjunto ordenado por inserção (pertinência e remoção O(1))
+    assigned_zones: Dict[str, None] = None
     is_available: bool = True
 
     def __post_init__(self):
-        if self.assigned_zones is None:
-            self.assigned_zones = []
+        self.assigned_zones = dict.fromkeys(self.assigned_zones or ())
 
     def assign_to_zone(self, zone_id: str) -> bool:
         if self.is_available and zone_id not in self.assigned_zones:
-            self.assigned_zones.append(zone_id)
+            self.assigned_zones[zone_id] = None
             return True
         return False
 
     def remove_from_zone(self, zone_id: str) -> bool:
         if zone_id in self.assigned_zones:
-            self.assigned_zones.remove(zone_id)
+            del self.assigned_zones[zone_id]
             return True
         return False
 
@@ -32,4 +32,4 @@ class Resource:
         return self.capacity - len(self.assigned_zones)
 
     def is_fully_allocated(self) -> bool:
-        return len(self.assigned_zones) >= self.capacity 
\ No newline at end of file
+        return len(self.assigned_zones) >= self.capacity
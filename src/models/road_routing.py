@@ -0,0 +1,287 @@
+import heapq
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+import numpy as np
+from src.models.zone import Zone
+from src.models.resource import Resource
+from src.utils.road_network import RoadNetwork
+
+INFINITY = float('inf')
+
+# Nós assentados por busca de testemunha; limites menores aceleram o pré-processamento
+# ao custo de alguns atalhos desnecessários (que não afetam a correção)
+WITNESS_SETTLE_LIMIT = 60
+
+
+class ContractionHierarchy:
+    """
+    Hierarquia de contração sobre uma `RoadNetwork`.
+
+    O pré-processamento contrai os nós em ordem de importância (diferença de arestas),
+    acrescentando atalhos que preservam as distâncias. Uma consulta é uma busca
+    bidirecional que só sobe na hierarquia, visitando poucas centenas de nós mesmo
+    em malhas com milhões de arestas.
+    """
+
+    def __init__(self, rank: np.ndarray, up: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                 down: Tuple[np.ndarray, np.ndarray, np.ndarray], shortcuts: np.ndarray):
+        self.rank = rank
+        # up: arestas v -> w com rank[w] > rank[v]; down: arestas u -> v com rank[u] > rank[v],
+        # guardadas em v (as duas buscas sobem na hierarquia)
+        self.up = up
+        self.down = down
+        # (origem, destino, nó contraído) de cada atalho
+        self.shortcuts = shortcuts
+        self._middle = {(int(a), int(b)): int(m) for a, b, m in shortcuts}
+        self._up_lists = tuple(array.tolist() for array in up)
+        self._down_lists = tuple(array.tolist() for array in down)
+
+    @property
+    def n_shortcuts(self) -> int:
+        return len(self.shortcuts)
+
+    @classmethod
+    def build(cls, network: RoadNetwork, witness_settle_limit: int = WITNESS_SETTLE_LIMIT) -> 'ContractionHierarchy':
+        n = network.n_nodes
+        out_adj: List[Dict[int, float]] = [{} for _ in range(n)]
+        in_adj: List[Dict[int, float]] = [{} for _ in range(n)]
+        indptr, indices, weights = network.indptr.tolist(), network.indices.tolist(), network.weights.tolist()
+        for u in range(n):
+            for position in range(indptr[u], indptr[u + 1]):
+                w, cost = indices[position], weights[position]
+                out_adj[u][w] = cost
+                in_adj[w][u] = cost
+
+        middle: Dict[Tuple[int, int], int] = {}
+        deleted_neighbors = [0] * n
+        contracted = [False] * n
+        rank = np.zeros(n, dtype=np.int64)
+        up_edges: List[List[Tuple[int, float]]] = [[] for _ in range(n)]
+        down_edges: List[List[Tuple[int, float]]] = [[] for _ in range(n)]
+
+        def simulate(v: int) -> Tuple[int, List[Tuple[int, int, float]]]:
+            shortcuts = _required_shortcuts(v, out_adj, in_adj, witness_settle_limit)
+            edge_difference = len(shortcuts) - len(in_adj[v]) - len(out_adj[v])
+            return edge_difference + deleted_neighbors[v], shortcuts
+
+        heap = [(simulate(v)[0], v) for v in range(n)]
+        heapq.heapify(heap)
+        order = 0
+        while heap:
+            _, v = heapq.heappop(heap)
+            if contracted[v]:
+                continue
+            # Atualização preguiçosa: a prioridade pode ter mudado desde que entrou no heap
+            priority, shortcuts = simulate(v)
+            if heap and priority > heap[0][0]:
+                heapq.heappush(heap, (priority, v))
+                continue
+
+            for u, w, cost in shortcuts:
+                if cost < out_adj[u].get(w, INFINITY):
+                    out_adj[u][w] = cost
+                    in_adj[w][u] = cost
+                    middle[(u, w)] = v
+
+            up_edges[v] = list(out_adj[v].items())
+            down_edges[v] = list(in_adj[v].items())
+            for w in out_adj[v]:
+                del in_adj[w][v]
+                deleted_neighbors[w] += 1
+            for u in in_adj[v]:
+                del out_adj[u][v]
+                deleted_neighbors[u] += 1
+            out_adj[v], in_adj[v] = {}, {}
+            contracted[v] = True
+            rank[v] = order
+            order += 1
+
+        shortcuts = np.array([(u, w, m) for (u, w), m in middle.items()], dtype=np.int64).reshape(-1, 3)
+        return cls(rank, _to_csr(up_edges), _to_csr(down_edges), shortcuts)
+
+    def query(self, source: int, target: int) -> Tuple[float, List[int]]:
+        """
+        Caminho mínimo entre dois nós da malha.
+
+        Returns:
+            Tupla com o custo (minutos) e a sequência de nós; custo infinito e lista
+            vazia quando não há caminho
+        """
+        if source == target:
+            return 0.0, [source]
+
+        up_indptr, up_indices, up_weights = self._up_lists
+        down_indptr, down_indices, down_weights = self._down_lists
+        searches = (
+            # (distâncias, pais, heap, arestas percorridas, arestas usadas para "stall")
+            ({source: 0.0}, {source: -1}, [(0.0, source)],
+             (up_indptr, up_indices, up_weights), (down_indptr, down_indices, down_weights)),
+            ({target: 0.0}, {target: -1}, [(0.0, target)],
+             (down_indptr, down_indices, down_weights), (up_indptr, up_indices, up_weights)),
+        )
+
+        best, meeting = INFINITY, -1
+        active = True
+        while active:
+            active = False
+            for side, (dist, parent, heap, (indptr, indices, weights), (s_indptr, s_indices, s_weights)) in enumerate(searches):
+                if not heap or heap[0][0] >= best:
+                    continue
+                active = True
+                d, v = heapq.heappop(heap)
+                if d > dist[v]:
+                    continue
+                other = searches[1 - side][0]
+                if v in other and d + other[v] < best:
+                    best, meeting = d + other[v], v
+
+                # Stall-on-demand: um vizinho mais alto já alcança v por um caminho melhor
+                stalled = False
+                for position in range(s_indptr[v], s_indptr[v + 1]):
+                    u = s_indices[position]
+                    if u in dist and dist[u] + s_weights[position] < d:
+                        stalled = True
+                        break
+                if stalled:
+                    continue
+
+                for position in range(indptr[v], indptr[v + 1]):
+                    w = indices[position]
+                    candidate = d + weights[position]
+                    if candidate < dist.get(w, INFINITY):
+                        dist[w] = candidate
+                        parent[w] = v
+                        heapq.heappush(heap, (candidate, w))
+
+        if meeting < 0:
+            return INFINITY, []
+
+        forward_parent, backward_parent = searches[0][1], searches[1][1]
+        upward = [meeting]
+        while forward_parent[upward[-1]] >= 0:
+            upward.append(forward_parent[upward[-1]])
+        upward.reverse()
+        downward = [meeting]
+        while backward_parent[downward[-1]] >= 0:
+            downward.append(backward_parent[downward[-1]])
+        return best, self._unpack(upward + downward[1:])
+
+    def _unpack(self, nodes: List[int]) -> List[int]:
+        # Substitui cada atalho pelos dois trechos que ele resume
+        path = [nodes[0]]
+        stack = [(a, b) for a, b in zip(nodes[::-1][1:], nodes[::-1])]
+        while stack:
+            a, b = stack.pop()
+            m = self._middle.get((a, b))
+            if m is None:
+                path.append(b)
+            else:
+                stack.append((m, b))
+                stack.append((a, m))
+        return path
+
+    def save(self, path: Union[str, Path]) -> None:
+        np.savez(path, rank=self.rank, up_indptr=self.up[0], up_indices=self.up[1], up_weights=self.up[2],
+                 down_indptr=self.down[0], down_indices=self.down[1], down_weights=self.down[2],
+                 shortcuts=self.shortcuts)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'ContractionHierarchy':
+        with np.load(path) as data:
+            return cls(data['rank'],
+                       (data['up_indptr'], data['up_indices'], data['up_weights']),
+                       (data['down_indptr'], data['down_indices'], data['down_weights']),
+                       data['shortcuts'])
+
+
+@dataclass
+class RoadRoute:
+    nodes: List[int]
+    minutes: float
+    length_km: float
+    # Longitude/latitude dos nós da rota, forma (k, 2)
+    coordinates: np.ndarray
+
+
+class RoadRouter:
+    """Rotas sobre a malha viária entre zonas e recursos, ligados aos nós mais próximos."""
+
+    def __init__(self, network: RoadNetwork, hierarchy: ContractionHierarchy = None):
+        self.network = network
+        self.hierarchy = hierarchy if hierarchy is not None else ContractionHierarchy.build(network)
+
+    def save(self, directory: Union[str, Path]) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.network.save(directory / 'network.npz')
+        self.hierarchy.save(directory / 'hierarchy.npz')
+
+    @classmethod
+    def load(cls, directory: Union[str, Path]) -> 'RoadRouter':
+        directory = Path(directory)
+        return cls(RoadNetwork.load(directory / 'network.npz'),
+                   ContractionHierarchy.load(directory / 'hierarchy.npz'))
+
+    def route_nodes(self, source: int, target: int) -> RoadRoute:
+        minutes, nodes = self.hierarchy.query(source, target)
+        length = sum(self.network.edge_length(a, b) for a, b in zip(nodes, nodes[1:]))
+        return RoadRoute(nodes=nodes, minutes=minutes, length_km=length,
+                         coordinates=self.network.lonlat[nodes] if nodes else np.empty((0, 2)))
+
+    def route(self, source_lonlat: Tuple[float, float], target_lonlat: Tuple[float, float]) -> RoadRoute:
+        nodes, _ = self.network.snap(np.array([source_lonlat, target_lonlat], dtype=np.float64))
+        return self.route_nodes(int(nodes[0]), int(nodes[1]))
+
+    def resource_to_zone(self, resource: Resource, zone: Zone) -> RoadRoute:
+        source = self.network.snap_resources([resource])
+        target = self.network.snap_zones([zone])
+        if resource.id not in source or zone.id not in target:
+            raise ValueError(f"Sem localização para ligar {resource.id} ou {zone.id} à malha viária")
+        return self.route_nodes(source[resource.id], target[zone.id])
+
+
+def _required_shortcuts(v: int, out_adj: List[Dict[int, float]], in_adj: List[Dict[int, float]],
+                        settle_limit: int) -> List[Tuple[int, int, float]]:
+    # Atalhos u -> w necessários ao contrair v: quando não há caminho testemunha sem v
+    # que seja tão curto quanto u -> v -> w
+    outgoing = out_adj[v]
+    if not outgoing or not in_adj[v]:
+        return []
+    max_out = max(outgoing.values())
+    shortcuts = []
+    for u, cost_in in in_adj[v].items():
+        limit = cost_in + max_out
+        dist = {u: 0.0}
+        heap = [(0.0, u)]
+        settled = 0
+        # A busca para quando todos os destinos de v foram assentados
+        pending = len(outgoing) - (u in outgoing)
+        while heap and settled < settle_limit and pending:
+            d, x = heapq.heappop(heap)
+            if d > limit:
+                break
+            if d > dist[x]:
+                continue
+            settled += 1
+            if x in outgoing and x != u:
+                pending -= 1
+            for y, cost in out_adj[x].items():
+                if y == v:
+                    continue
+                candidate = d + cost
+                if candidate < dist.get(y, INFINITY):
+                    dist[y] = candidate
+                    heapq.heappush(heap, (candidate, y))
+        for w, cost_out in outgoing.items():
+            if w != u and dist.get(w, INFINITY) > cost_in + cost_out:
+                shortcuts.append((u, w, cost_in + cost_out))
+    return shortcuts
+
+
+def _to_csr(edges: List[List[Tuple[int, float]]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    indptr = np.zeros(len(edges) + 1, dtype=np.int64)
+    np.cumsum([len(row) for row in edges], out=indptr[1:])
+    indices = np.fromiter((w for row in edges for w, _ in row), dtype=np.int32, count=int(indptr[-1]))
+    weights = np.fromiter((c for row in edges for _, c in row), dtype=np.float64, count=int(indptr[-1]))
+    return indptr, indices, weights
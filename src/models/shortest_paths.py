@@ -0,0 +1,149 @@
+import heapq
+from collections import defaultdict
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+INFINITY = float('inf')
+
+# Alteração de aresta: (u, v, peso anterior, peso novo); None indica aresta ausente
+EdgeChange = Tuple[Hashable, Hashable, Optional[float], Optional[float]]
+
+
+def multi_source_dijkstra(graph, sources: Dict[Hashable, Tuple[float, Hashable]],
+                          weight: str = 'weight') -> Tuple[Dict[Hashable, float], Dict[Hashable, Hashable]]:
+    """
+    Custo de cada nó até a origem mais próxima, em uma única busca a partir de todas as origens.
+
+    Args:
+        graph: Grafo networkx
+        sources: {nó: (custo inicial, rótulo da origem)}
+        weight: Atributo de peso das arestas
+
+    Returns:
+        Tupla com o custo de cada nó alcançado e o rótulo da origem que o alcança
+    """
+    dist = {node: cost for node, (cost, _) in sources.items()}
+    label = {node: origin for node, (_, origin) in sources.items()}
+    heap = [(cost, node) for node, cost in dist.items()]
+    heapq.heapify(heap)
+    adj = graph.adj
+    while heap:
+        d, node = heapq.heappop(heap)
+        if d > dist[node]:
+            continue
+        for neighbor, attrs in adj[node].items():
+            candidate = d + attrs[weight]
+            if candidate < dist.get(neighbor, INFINITY):
+                dist[neighbor] = candidate
+                label[neighbor] = label[node]
+                heapq.heappush(heap, (candidate, neighbor))
+    return dist, label
+
+
+class ShortestPathTree:
+    """
+    Árvore de caminhos mínimos de uma origem, atualizada incrementalmente.
+
+    Quando pesos aumentam (ou arestas são fechadas), apenas as subárvores penduradas
+    em arestas da árvore são recalculadas; quando diminuem (ou arestas reabrem), as
+    melhorias são propagadas a partir das extremidades da aresta. Arestas fora da
+    árvore que ficam mais caras não exigem trabalho algum.
+    """
+
+    def __init__(self, graph, source: Hashable, weight: str = 'weight'):
+        self.source = source
+        self.weight = weight
+        self.dist: Dict[Hashable, float] = {source: 0.0}
+        self.parent: Dict[Hashable, Optional[Hashable]] = {source: None}
+        self._propagate(graph, [(0.0, source)])
+
+    def path(self, target: Hashable) -> List[Hashable]:
+        if target not in self.dist:
+            return []
+        path = [target]
+        while path[-1] != self.source:
+            path.append(self.parent[path[-1]])
+        path.reverse()
+        return path
+
+    def update(self, graph, changes: Sequence[EdgeChange]) -> int:
+        """
+        Ajusta a árvore às alterações de peso já aplicadas ao grafo.
+
+        Returns:
+            Número de nós cuja distância foi recalculada
+        """
+        roots = []
+        improvements = []
+        for u, v, old, new in changes:
+            if old is not None and (new is None or new > old):
+                # Só importa se a aresta pertence à árvore
+                if self.parent.get(v) == u:
+                    roots.append(v)
+                elif self.parent.get(u) == v:
+                    roots.append(u)
+            elif new is not None and (old is None or new < old):
+                improvements.append((u, v, new))
+
+        heap = []
+        affected = self._detach(roots)
+        for node in affected:
+            # Melhor entrada na subárvore a partir de nós que não foram afetados
+            best, via = INFINITY, None
+            for neighbor, attrs in graph.adj[node].items():
+                if neighbor in self.dist:
+                    candidate = self.dist[neighbor] + attrs[self.weight]
+                    if candidate < best:
+                        best, via = candidate, neighbor
+            if via is not None:
+                self.dist[node] = best
+                self.parent[node] = via
+                heap.append((best, node))
+
+        for u, v, weight in improvements:
+            for a, b in ((u, v), (v, u)):
+                if a in self.dist and self.dist[a] + weight < self.dist.get(b, INFINITY):
+                    self.dist[b] = self.dist[a] + weight
+                    self.parent[b] = a
+                    heap.append((self.dist[b], b))
+
+        heapq.heapify(heap)
+        return len(affected) + self._propagate(graph, heap)
+
+    def _detach(self, roots: List[Hashable]) -> set:
+        if not roots:
+            return set()
+        children = defaultdict(list)
+        for node, parent in self.parent.items():
+            if parent is not None:
+                children[parent].append(node)
+        affected = set()
+        stack = list(roots)
+        while stack:
+            node = stack.pop()
+            if node in affected:
+                continue
+            affected.add(node)
+            stack.extend(children.get(node, ()))
+        for node in affected:
+            del self.dist[node]
+            del self.parent[node]
+        return affected
+
+    def _propagate(self, graph, heap: List[Tuple[float, Hashable]]) -> int:
+        # Dijkstra com rótulos corrigíveis: as distâncias de partida são limites superiores
+        relaxed = 0
+        adj = graph.adj
+        weight = self.weight
+        dist = self.dist
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d > dist.get(node, INFINITY):
+                continue
+            for neighbor, attrs in adj[node].items():
+                candidate = d + attrs[weight]
+                if candidate < dist.get(neighbor, INFINITY):
+                    dist[neighbor] = candidate
+                    self.parent[neighbor] = node
+                    heapq.heappush(heap, (candidate, neighbor))
+                    relaxed += 1
+        return relaxed
@@ -1,8 +1,21 @@
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional
+import numpy as np
 from shapely.geometry import Polygon
 
-@dataclass
+# Escalas de normalização da pontuação de prioridade
+MAX_DAMAGE_LEVEL = 4.0
+POPULATION_SCALE = 10000
+
+
+def calculate_priorities(damage_levels: np.ndarray, populations: np.ndarray,
+                         damage_weight: float = 0.6, population_weight: float = 0.4) -> np.ndarray:
+    """Versão vetorizada de `Zone.calculate_priority` para muitas zonas de uma vez."""
+    normalized_damage = np.asarray(damage_levels, dtype=np.float64) / MAX_DAMAGE_LEVEL
+    normalized_population = np.minimum(np.asarray(populations, dtype=np.float64) / POPULATION_SCALE, 1.0)
+    return damage_weight * normalized_damage + population_weight * normalized_population
+
+@dataclass(slots=True)
 class Zone:
     id: str
     name: str
@@ -14,15 +27,15 @@ class Zone:
     critical_facilities: int = 0
     historical_risk: float = 0.0
     priority_score: float = 0.0
-    resources_allocated: List[str] = None
+    # IDs dos recursos alocados; dict como conjunto ordenado por inserção (pertinência e remoção O(1))
+    resources_allocated: Dict[str, None] = None
 
     def __post_init__(self):
-        if self.resources_allocated is None:
-            self.resources_allocated = []
+        self.resources_allocated = dict.fromkeys(self.resources_allocated or ())
 
     def calculate_priority(self, damage_weight: float = 0.6, population_weight: float = 0.4) -> float:
-        normalized_damage = self.damage_level / 4.0
-        normalized_population = min(self.population / 10000, 1.0)
+        normalized_damage = self.damage_level / MAX_DAMAGE_LEVEL
+        normalized_population = min(self.population / POPULATION_SCALE, 1.0)
         
         self.priority_score = (
             damage_weight * normalized_damage +
@@ -31,9 +44,7 @@ class Zone:
         return self.priority_score
 
     def add_resource(self, resource_id: str) -> None:
-        if resource_id not in self.resources_allocated:
-            self.resources_allocated.append(resource_id)
+        self.resources_allocated[resource_id] = None
 
     def remove_resource(self, resource_id: str) -> None:
-        if resource_id in self.resources_allocated:
-            self.resources_allocated.remove(resource_id) 
\ No newline at end of file
+        self.resources_allocated.pop(resource_id, None)
@@ -2,6 +2,11 @@ import streamlit as st
 from shapely.geometry import Point
 from src.models.zone import Zone
 from src.models.resource import Resource
+from src.models.facility_location import position_resources
+from src.utils.bulk_import import (build_resources, build_zones, read_table, validate_resources,
+                                   validate_zones)
+from src.utils.scenario_store import ScenarioStore
+from src.utils.scenario_cache import scenario_cache
 
 st.set_page_config(page_title="Entrada de Dados - Salvus", layout="wide")
 
@@ -26,6 +31,149 @@ RESOURCE_TYPES = {
     "Equipe de Defesa Civil": {"capacity": 15, "count": 4}
 }
 
+DISASTER_TYPES = ["Enchente", "Terremoto", "Furacão", "Incêndio Florestal", "Outro"]
+
+# Linhas por página na pré-visualização da importação em lote
+PREVIEW_PAGE_SIZE = 50
+
+# Estado do painel que pertence ao cenário anterior: plano, critérios de prioridade e
+# zonas pendentes de gravação (as zonas de um cenário novo chegam com a pontuação padrão)
+SCENARIO_STATE_KEYS = ("allocation_plan", "allocation_trace", "priority_criteria", "priority_criteria_applied",
+                       "store_stale")
+
+
+@st.cache_data(show_spinner="Validando zonas...")
+def load_zone_file(content: bytes, name: str):
+    return validate_zones(read_table(content, name))
+
+
+@st.cache_data(show_spinner="Validando recursos...")
+def load_resource_file(content: bytes, name: str):
+    return validate_resources(read_table(content, name))
+
+
+@st.cache_resource
+def get_store() -> ScenarioStore:
+    return ScenarioStore()
+
+
+def share_scenario(zones, resources) -> None:
+    # Sessões com o mesmo cenário recebem a mesma cópia, somente leitura, do cache do processo
+    lease = st.session_state.scenario_lease = scenario_cache.acquire(zones, resources)
+    st.session_state.zones = lease.zones
+    st.session_state.resources = lease.resources
+
+
+def submit_scenario(name: str, zones, resources, disaster_info) -> None:
+    # O cenário fica na sessão para uso imediato e no armazenamento para sobreviver a reinícios
+    share_scenario(zones, resources)
+    st.session_state.disaster_info = disaster_info
+    st.session_state.scenario_id = get_store().save_scenario(name, zones, resources, disaster_info)
+    for key in SCENARIO_STATE_KEYS:
+        st.session_state.pop(key, None)
+
+
+def show_import_summary(label: str, result, key: str):
+    st.write(f"**{label}:** {result.valid_rows} válidas de {result.total_rows} linhas lidas")
+    if len(result.errors):
+        st.warning(f"{len(result.errors)} problemas encontrados; as linhas com problemas serão ignoradas.")
+        st.dataframe(result.errors, use_container_width=True, hide_index=True)
+
+    # Pré-visualização paginada: só a página atual vai para o navegador
+    table = result.table.drop(columns=["geometry"], errors="ignore")
+    pages = max(1, -(-len(table) // PREVIEW_PAGE_SIZE))
+    page = st.number_input(f"Página ({pages} no total)", min_value=1, max_value=pages, value=1, key=f"page_{key}")
+    start = (page - 1) * PREVIEW_PAGE_SIZE
+    st.dataframe(table.iloc[start:start + PREVIEW_PAGE_SIZE], use_container_width=True)
+
+
+mode = st.radio("Modo de Entrada", ["Manual", "Importação em lote", "Cenário salvo"], horizontal=True,
+                key="input_mode")
+
+if mode == "Cenário salvo":
+    saved = get_store().list_scenarios()
+    if saved.empty:
+        st.info("Nenhum cenário salvo ainda.")
+        st.stop()
+    st.dataframe(saved.rename(columns={"name": "Cenário", "created_at": "Criado em",
+                                       "zones": "Zonas", "resources": "Recursos"}).drop(columns=["id"]),
+                 use_container_width=True, hide_index=True)
+    scenario_name = st.selectbox("Cenário", saved["name"].tolist(), key="saved_scenario")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Carregar Cenário"):
+            store = get_store()
+            scenario_id = store.scenario_id(scenario_name)
+            with st.spinner("Carregando cenário..."):
+                share_scenario(store.load_zones(scenario_id), store.load_resources(scenario_id))
+            st.session_state.disaster_info = store.disaster_info(scenario_id)
+            st.session_state.scenario_id = scenario_id
+            for key in SCENARIO_STATE_KEYS:
+                st.session_state.pop(key, None)
+            st.success("Cenário carregado! Navegue até a página do Painel para visualizar a análise.")
+    with col2:
+        if st.button("Excluir Cenário"):
+            get_store().delete_scenario(get_store().scenario_id(scenario_name))
+            st.rerun()
+    st.stop()
+
+if mode == "Importação em lote":
+    st.header("Informações do Desastre")
+    col1, col2 = st.columns(2)
+    with col1:
+        disaster_type = st.selectbox("Tipo de Desastre", DISASTER_TYPES, key="bulk_disaster_type")
+        disaster_date = st.date_input("Data do Desastre", format="DD/MM/YYYY", key="bulk_disaster_date")
+    with col2:
+        affected_area = st.number_input("Área Total Afetada (km²)", min_value=0.0, value=50.0,
+                                        key="bulk_affected_area")
+        scenario_name = st.text_input("Nome do Cenário", value="Importação", key="bulk_scenario_name")
+
+    st.header("Arquivos do Cenário")
+    st.caption(
+        "Zonas: colunas id, name, wkt ou lon/lat (com radius opcional), population, damage_level, "
+        "infrastructure_damage, accessibility, critical_facilities e historical_risk. "
+        "Recursos: id, name, type, capacity, lon, lat e count opcional (unidades idênticas). "
+        "Recursos sem localização são posicionados automaticamente."
+    )
+    col1, col2 = st.columns(2)
+    with col1:
+        zone_file = st.file_uploader("Zonas (CSV, Parquet ou GeoJSON)", type=["csv", "parquet", "geojson", "json"])
+    with col2:
+        resource_file = st.file_uploader("Recursos (CSV, Parquet ou GeoJSON)", type=["csv", "parquet", "geojson", "json"])
+
+    zone_result = resource_result = None
+    try:
+        if zone_file is not None:
+            zone_result = load_zone_file(zone_file.getvalue(), zone_file.name)
+        if resource_file is not None:
+            resource_result = load_resource_file(resource_file.getvalue(), resource_file.name)
+    except Exception as e:
+        st.error(f"Não foi possível ler o arquivo: {e}")
+
+    if zone_result is not None:
+        show_import_summary("Zonas", zone_result, "zones")
+    if resource_result is not None:
+        show_import_summary("Recursos", resource_result, "resources")
+
+    ready = (zone_result is not None and resource_result is not None
+             and zone_result.valid_rows > 0 and resource_result.valid_rows > 0)
+    if st.button("Enviar Dados", disabled=not ready):
+        with st.spinner("Criando cenário..."):
+            zones = build_zones(zone_result)
+            resources = build_resources(resource_result)
+            unlocated = [r for r in resources if r.location is None]
+            if unlocated:
+                position_resources(zones, unlocated, seed=0)
+        submit_scenario(scenario_name, zones, resources, {
+            "type": disaster_type,
+            "date": disaster_date,
+            "affected_area": affected_area,
+            "estimated_population": int(zone_result.table["population"].sum())
+        })
+        st.success(f"{len(zones)} zonas e {len(resources)} recursos carregados! "
+                   "Navegue até a página do Painel para visualizar a análise.")
+    st.stop()
+
 with st.form("disaster_data_form"):
     st.header("Informações do Desastre")
     
@@ -33,7 +181,7 @@ with st.form("disaster_data_form"):
     with col1:
         disaster_type = st.selectbox(
             "Tipo de Desastre",
-            ["Enchente", "Terremoto", "Furacão", "Incêndio Florestal", "Outro"],
+            DISASTER_TYPES,
             key="disaster_type"
         )
         disaster_date = st.date_input("Data do Desastre", format="DD/MM/YYYY", key="disaster_date")
@@ -51,6 +199,7 @@ with st.form("disaster_data_form"):
             value=180000,
             key="estimated_population"
         )
+        scenario_name = st.text_input("Nome do Cenário", value="Manual", key="scenario_name")
 
     st.header("Informações das Zonas")
     
@@ -135,6 +284,7 @@ with st.form("disaster_data_form"):
             
             resource = Resource(
                 id=f"R{i+1}",
+                name=f"{selected_resource_type} {i+1}",
                 type=selected_resource_type,
                 capacity=capacity,
                 location=Point(lon, lat)
@@ -145,14 +295,12 @@ with st.form("disaster_data_form"):
     
     if submitted:
         if zones and resources:
-            st.session_state.zones = zones
-            st.session_state.resources = resources
-            st.session_state.disaster_info = {
+            submit_scenario(scenario_name, zones, resources, {
                 "type": disaster_type,
                 "date": disaster_date,
                 "affected_area": affected_area,
                 "estimated_population": estimated_population
-            }
+            })
             st.success("Dados enviados com sucesso! Navegue até a página do Painel para visualizar a análise.")
         else:
             st.error("Por favor, preencha todos os campos obrigatórios.") 
\ No newline at end of file
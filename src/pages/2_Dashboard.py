@@ -1,14 +1,92 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
 from src.visualization.dashboard import Dashboard
-from src.visualization.map import DamageMap
 from src.models.allocation import ResourceAllocator
+from src.models.ml_models import RouteOptimizer
+from src.utils.strategies import compare_strategies
+from src.utils.coverage import analyze_coverage
+from src.models.facility_location import position_resources
+from src.utils.scenario_io import scenario_signature
+from src.utils.scenario_store import ScenarioStore
+from src.utils.scenario_cache import scenario_cache
+from src.utils.report_stream import DAMAGE_BINS, URGENT_ZONES, LiveDamageState, ReportIngestor
+from src.models.priority import DEFAULT_CRITERIA, MULTI_CRITERIA, PriorityScorer, top_zones
+from src.models.dispatch_simulation import DEFAULT_SPEED_KMH, simulate_dispatch
+from src.visualization.render_cache import DeferredOutput, deferred_map, get_render_cache, render_key
 
 st.set_page_config(page_title="Painel - Avaliação de Danos", layout="wide")
 
+# Zonas por página no plano de alocação
+PLAN_PAGE_SIZE = 50
+
+# Intervalo de atualização do painel de relatórios de campo (s)
+REPORT_REFRESH_SECONDS = 1.0
+
+# Critérios de prioridade oferecidos na análise de prioridades; o primeiro é o padrão das zonas
+PRIORITY_CRITERIA = {"Dano e população": DEFAULT_CRITERIA, "Todos os critérios": MULTI_CRITERIA}
+
+
+@st.cache_resource
+def get_store() -> ScenarioStore:
+    return ScenarioStore()
+
+
+def polling_fragment(run_every: float):
+    # st.fragment nas versões novas, st.experimental_fragment nas anteriores;
+    # sem nenhum dos dois, a seção só é atualizada quando a página reexecuta
+    decorator = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+    if decorator is None:
+        return lambda function: function
+    return decorator(run_every=run_every)
+
+
+def edit_scenario():
+    """
+    Copy-on-write: antes de alterar zonas, recursos ou plano, a sessão troca a visão
+    compartilhada do cache por cópias próprias.
+    """
+    lease = st.session_state.pop('scenario_lease', None)
+    if lease is not None:
+        zones, resources, plan = lease.edit()
+        st.session_state.zones, st.session_state.resources = zones, resources
+        if plan is not None:
+            st.session_state.allocation_plan = plan
+    return st.session_state.zones, st.session_state.resources
+
+
+def share_scenario():
+    # Cenário alterado volta ao cache: sessões com o mesmo conteúdo passam a compartilhá-lo
+    ingestor = st.session_state.get('report_ingestor')
+    if ingestor is not None and ingestor.running:
+        # Os relatórios de campo continuam alterando as zonas desta sessão
+        return st.session_state.zones, st.session_state.resources
+    lease = st.session_state.scenario_lease = scenario_cache.acquire(
+        st.session_state.zones, st.session_state.resources, st.session_state.get('allocation_plan')
+    )
+    st.session_state.zones, st.session_state.resources = lease.zones, lease.resources
+    if lease.plan is not None:
+        st.session_state.allocation_plan = lease.plan
+    return lease.zones, lease.resources
+
+
+def sync_store(store: ScenarioStore, scenario_id: int) -> None:
+    """
+    Grava no armazenamento as zonas alteradas nesta sessão (novos critérios de
+    prioridade, relatórios de campo), antes de páginas do plano serem lidas dele.
+    """
+    ingestor = st.session_state.get('report_ingestor')
+    if ingestor is not None:
+        # Versão lida antes das zonas: alterações no meio da leitura entram de novo na próxima
+        version = ingestor.state.aggregates()['version']
+        changed = ingestor.state.changed_since(st.session_state.get('report_version_stored', 0), limit=None)
+        if changed:
+            store.upsert_zones(scenario_id, changed)
+        st.session_state.report_version_stored = version
+    if st.session_state.pop('store_stale', False):
+        store.upsert_zones(scenario_id, list(st.session_state.zones))
+
+
 if 'zones' not in st.session_state or 'resources' not in st.session_state:
     st.warning("Por favor, vá para a página de Entrada de Dados e envie as informações primeiro.")
     st.stop()
@@ -21,7 +99,8 @@ st.title("Painel de Avaliação de Danos")
 
 # Initialize components
 dashboard = Dashboard()
-damage_map = DamageMap()
+# Mapas e figuras vêm do cache; falhas são renderizadas em segundo plano e exibidas no fim da página
+output = DeferredOutput(get_render_cache())
 resource_allocator = ResourceAllocator()
 
 # Update metrics
@@ -43,96 +122,324 @@ with col4:
 st.header("Métricas Principais")
 dashboard.display_metrics()
 
+# Field Reports Section
+st.header("Relatórios de Campo em Tempo Real")
+ingestor = st.session_state.get('report_ingestor')
+if ingestor is not None and ingestor.state.zones is not zones:
+    # Cenário trocado na página de entrada: os relatórios seriam aplicados às zonas antigas
+    ingestor.stop()
+    ingestor = st.session_state.report_ingestor = None
+
+col1, col2, col3 = st.columns([2, 1, 1])
+with col1:
+    report_path = st.text_input("Arquivo JSONL de relatórios (vazio desativa)", value="data/relatorios.jsonl",
+                                key="report_path")
+with col2:
+    report_port = st.number_input("Porta TCP (0 desativa)", min_value=0, max_value=65535, value=0,
+                                  key="report_port")
+with col3:
+    if ingestor is None or not ingestor.running:
+        if st.button("Iniciar Ingestão", disabled=not report_path and not report_port):
+            zones, resources = edit_scenario()
+            # Os relatórios recalculam a prioridade com os critérios escolhidos no painel
+            criteria = PRIORITY_CRITERIA[st.session_state.get('priority_criteria_applied', "Dano e população")]
+            st.session_state.report_ingestor = ReportIngestor(
+                LiveDamageState(zones, scorer=PriorityScorer(criteria)),
+                path=report_path or None,
+                port=int(report_port) or None
+            ).start()
+            st.session_state.report_version_seen = 0
+            st.session_state.report_version_stored = 0
+            st.rerun()
+    elif st.button("Parar Ingestão"):
+        ingestor.stop()
+        share_scenario()
+        st.rerun()
+
+
+@polling_fragment(REPORT_REFRESH_SECONDS)
+def live_reports():
+    # Só esta seção é reexecutada a cada intervalo; os agregados são incrementais
+    ingestor = st.session_state.get('report_ingestor')
+    if ingestor is None:
+        st.caption("Ingestão parada. Cada linha do arquivo ou do socket é um JSON como "
+                   '{"zone_id": "z1", "damage_level": 3.5, "infrastructure_damage": 0.7}.')
+        return
+    aggregates = ingestor.state.aggregates()
+    stats = ingestor.stats()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Zonas Afetadas", f"{aggregates['affected_zones']} de {aggregates['total_zones']}")
+    with col2:
+        st.metric("Dano Médio", f"{aggregates['average_damage']:.2f}")
+    with col3:
+        st.metric("Relatórios Aplicados", f"{stats['applied']:,}")
+    with col4:
+        st.metric("Relatórios por Segundo", f"{stats['reports_per_second']:,.0f}")
+    if stats['malformed'] or aggregates['unknown_zones']:
+        st.caption(f"{stats['malformed']} linhas malformadas, {aggregates['unknown_zones']} relatórios "
+                   "de zonas desconhecidas ignorados")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.bar_chart(pd.DataFrame({"Zonas": aggregates['damage_distribution']},
+                                  index=pd.Index(range(DAMAGE_BINS), name="Nível de Dano")))
+    with col2:
+        changed = ingestor.state.changed_since(st.session_state.get('report_version_seen', 0))
+        st.session_state.report_version_seen = aggregates['version']
+        st.write("Zonas atualizadas desde a última leitura")
+        st.dataframe(pd.DataFrame({
+            "Zona": [zone.name for zone in changed],
+            "Nível de Dano": [zone.damage_level for zone in changed],
+            "Pontuação de Prioridade": [zone.priority_score for zone in changed]
+        }), hide_index=True)
+    urgent = ingestor.state.most_urgent()
+    st.write("Zonas mais urgentes")
+    st.dataframe(pd.DataFrame({
+        "Zona": [zone.name for zone in urgent],
+        "Nível de Dano": [zone.damage_level for zone in urgent],
+        "Pontuação de Prioridade": [zone.priority_score for zone in urgent]
+    }), hide_index=True)
+
+
+live_reports()
+
 # Map and Charts Section
 col1, col2 = st.columns([2, 1])
 
 with col1:
     st.subheader("Mapa de Danos")
-    m = damage_map.create_map(zones, resources)
-    if m:
-        st.components.v1.html(m._repr_html_(), height=600)
+    deferred_map(output, zones, resources, height=600)
 
 with col2:
     st.subheader("Distribuição de Danos")
-    dashboard.display_damage_distribution(zones)
+    dashboard.display_damage_distribution(zones, output)
     
     st.subheader("Alocação de Recursos")
-    dashboard.display_resource_allocation(resources)
+    dashboard.display_resource_allocation(resources, output)
 
 # Resource Allocation Section
 st.header("Alocação de Recursos")
+response_deadline = st.number_input(
+    "Prazo de resposta (s)",
+    min_value=0.05,
+    max_value=30.0,
+    value=1.0,
+    step=0.05,
+    key="response_deadline"
+)
 if st.button("Otimizar Alocação de Recursos"):
-    allocation_plan = resource_allocator.allocate_resources(zones, resources)
-    st.session_state.allocation_plan = allocation_plan
+    # Plano guloso imediato, melhorado por busca local até o prazo
+    zones, resources = edit_scenario()
+    result = resource_allocator.allocate_anytime(zones, resources, response_deadline)
+    st.session_state.allocation_plan = result.plan
+    st.session_state.allocation_trace = result.trace
+    share_scenario()
+    if st.session_state.get('scenario_id') is not None:
+        get_store().save_allocations(st.session_state.scenario_id, result.plan)
     st.success("Recursos alocados com sucesso!")
     st.rerun()
 
 if 'allocation_plan' in st.session_state:
     st.subheader("Plano de Alocação")
     
-    # Create allocation matrix
-    allocation_data = []
-    for zone in zones:
-        allocated_resources = st.session_state.allocation_plan.get(zone.id, [])
-        resource_types = [r.type for r in resources if r.id in allocated_resources]
-        allocation_data.append({
-            "Zona": zone.name,
-            "Nível de Dano": zone.damage_level,
-            "Pontuação de Prioridade": zone.priority_score,
-            "Recursos Alocados": ", ".join(resource_types) if resource_types else "Nenhum"
+    scenario_id = st.session_state.get('scenario_id')
+    if scenario_id is not None:
+        # Só a página exibida é lida do armazenamento, em ordem de prioridade
+        store = get_store()
+        sync_store(store, scenario_id)
+        pages = max(1, -(-store.count_zones(scenario_id) // PLAN_PAGE_SIZE))
+        page = st.number_input(f"Página ({pages} no total)", min_value=1, max_value=pages, value=1, key="plan_page")
+        plan_zones = store.zone_frame(scenario_id, order_by='priority_score', limit=PLAN_PAGE_SIZE,
+                                      offset=(page - 1) * PLAN_PAGE_SIZE)
+        plan = store.load_allocations(scenario_id, zone_ids=plan_zones['zone_id'].tolist())
+    else:
+        plan_zones = pd.DataFrame({
+            "zone_id": [zone.id for zone in zones],
+            "name": [zone.name for zone in zones],
+            "damage_level": [zone.damage_level for zone in zones],
+            "priority_score": [zone.priority_score for zone in zones]
         })
-    
-    df = pd.DataFrame(allocation_data)
-    st.dataframe(df)
+        plan = st.session_state.allocation_plan
 
-# Time Series Analysis
-st.header("Análise Temporal")
-col1, col2 = st.columns(2)
+    resource_types = {r.id: r.type for r in resources}
+    allocated_types = [
+        ", ".join(resource_types[r] for r in plan.get(zone_id, []) if r in resource_types) or "Nenhum"
+        for zone_id in plan_zones['zone_id']
+    ]
+    df = pd.DataFrame({
+        "Zona": plan_zones['name'],
+        "Nível de Dano": plan_zones['damage_level'],
+        "Pontuação de Prioridade": plan_zones['priority_score'],
+        "Recursos Alocados": allocated_types
+    })
+    st.dataframe(df, hide_index=True)
 
-with col1:
-    # Simulated damage progression
-    dates = pd.date_range(start=disaster_info["date"], periods=7, freq='D')
-    damage_progression = [sum(z.damage_level for z in zones) * (1 - i/7) for i in range(7)]
-    
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=dates,
-        y=damage_progression,
-        mode='lines+markers',
-        name='Nível de Dano'
+    if 'allocation_trace' in st.session_state:
+        st.subheader("Qualidade do Plano ao Longo do Tempo")
+        trace = pd.DataFrame(st.session_state.allocation_trace, columns=["Tempo (s)", "Cobertura Ponderada"])
+        st.line_chart(trace.set_index("Tempo (s)"))
+
+# Strategy Comparison
+st.header("Comparação de Estratégias de Alocação")
+strategy_deadline = st.slider("Prazo por estratégia (s)", 0.5, 10.0, 2.0, 0.5, key="strategy_deadline")
+if st.button("Comparar Estratégias"):
+    with st.spinner("Executando estratégias em paralelo..."):
+        comparison = compare_strategies(zones, resources, deadline=strategy_deadline)
+    st.dataframe(comparison.rename(columns={
+        "strategy": "Estratégia",
+        "status": "Situação",
+        "runtime_s": "Tempo (s)",
+        "coverage_rate": "Taxa de Cobertura",
+        "weighted_priority_served": "Prioridade Atendida",
+        "error": "Erro"
+    }))
+
+# Coverage Analysis
+st.header("Cobertura e Tempo de Resposta")
+coverage_threshold = st.slider(
+    "Custo máximo de resposta (km ponderados por danos)",
+    1.0, 100.0, 20.0, 1.0,
+    key="coverage_threshold"
+)
+if st.button("Reposicionar Bases dos Recursos"):
+    # K-medianas ponderadas pela prioridade: grava a nova posição em Resource.location
+    zones, resources = edit_scenario()
+    placements = position_resources(zones, resources)
+    zones, resources = share_scenario()
+    st.success("Bases reposicionadas: " + ", ".join(
+        f"{resource_type} ({result.cost_km:.1f} km em média)" for resource_type, result in placements.items()
     ))
-    fig.update_layout(
-        title='Progressão do Nível de Dano',
-        xaxis_title='Data',
-        yaxis_title='Nível Total de Dano'
-    )
-    st.plotly_chart(fig)
+# O grafo de zonas só é reconstruído quando o cenário muda
+signature = scenario_signature(zones, resources)
+if st.session_state.get('coverage_signature') != signature:
+    coverage_optimizer = RouteOptimizer()
+    coverage_optimizer.build_graph(zones, resources)
+    st.session_state.coverage_optimizer = coverage_optimizer
+    st.session_state.coverage_signature = signature
+coverage = analyze_coverage(zones, resources, coverage_threshold, st.session_state.coverage_optimizer)
 
+uncovered = coverage.uncovered_zones()
+uncovered_ids = set(uncovered)
+col1, col2 = st.columns(2)
+with col1:
+    st.metric("Zonas Fora do Limite", f"{len(uncovered)} de {len(zones)}")
 with col2:
-    # Simulated resource utilization
-    resource_utilization = {
-        'Ambulância': [0.3, 0.5, 0.7, 0.8, 0.9, 0.95, 1.0],
-        'Equipe de Resgate': [0.2, 0.4, 0.6, 0.75, 0.85, 0.9, 0.95],
-        'Hospitais de Campanha': [0.1, 0.3, 0.5, 0.6, 0.7, 0.8, 0.85]
-    }
-    
-    fig = go.Figure()
-    for resource_type, utilization in resource_utilization.items():
-        fig.add_trace(go.Scatter(
-            x=dates,
-            y=utilization,
-            mode='lines+markers',
-            name=resource_type
-        ))
-    fig.update_layout(
-        title='Utilização de Recursos ao Longo do Tempo',
-        xaxis_title='Data',
-        yaxis_title='Taxa de Utilização'
-    )
-    st.plotly_chart(fig)
+    covered_population = sum(z.population for z in zones if z.id not in uncovered_ids)
+    st.metric("População Coberta", f"{covered_population:,}")
+
+zone_names = {zone.id: zone.name for zone in zones}
+coverage_table = pd.DataFrame({"Zona": [zone_names[zone_id] for zone_id in coverage.zone_ids]})
+for column, resource_type in enumerate(coverage.resource_types):
+    coverage_table[f"{resource_type} (custo)"] = coverage.costs[:, column].round(2)
+coverage_table["Dentro do Limite"] = coverage.best_costs <= coverage_threshold
+st.dataframe(coverage_table)
+if uncovered:
+    st.warning("Zonas fora do limite: " + ", ".join(zone_names[zone_id] for zone_id in uncovered))
+
+# Time Series Analysis
+st.header("Análise Temporal")
+if 'allocation_plan' not in st.session_state:
+    st.info("Otimize a alocação de recursos para simular o atendimento ao longo do tempo.")
+else:
+    col1, col2 = st.columns(2)
+    with col1:
+        horizon_days = st.number_input("Horizonte da simulação (dias)", min_value=1, max_value=30, value=3,
+                                       key="dispatch_horizon")
+    with col2:
+        speed_kmh = st.number_input("Velocidade média (km/h)", min_value=5.0, max_value=120.0,
+                                    value=DEFAULT_SPEED_KMH, step=5.0, key="dispatch_speed")
+    # A simulação só é refeita quando o plano, o cenário ou os parâmetros mudam; o plano
+    # entra pelo conteúdo (o id de um plano descartado pode ser reutilizado por outro)
+    plan_hash = hash(tuple(sorted(
+        (zone_id, tuple(resource_ids)) for zone_id, resource_ids in st.session_state.allocation_plan.items()
+    )))
+    dispatch_key = (plan_hash, signature, horizon_days, speed_kmh)
+    if st.session_state.get('dispatch_key') != dispatch_key:
+        st.session_state.dispatch_result = simulate_dispatch(
+            zones, resources, st.session_state.allocation_plan,
+            horizon_hours=horizon_days * 24, speed_kmh=speed_kmh
+        )
+        st.session_state.dispatch_key = dispatch_key
+    dispatch = st.session_state.dispatch_result
+    if disaster_info["date"]:
+        x_values = pd.Timestamp(disaster_info["date"]) + pd.to_timedelta(dispatch.hours, unit='h')
+        x_title = 'Data'
+    else:
+        # Sem data do desastre, o eixo mostra as horas desde o início da simulação
+        x_values, x_title = dispatch.hours, 'Horas desde o início'
+    st.caption(f"{dispatch.trips:,} viagens e {dispatch.events:,} eventos simulados em "
+               f"{dispatch.elapsed_seconds:.2f}s")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        def damage_figure():
+            # plotly só é carregado pelas threads de renderização, e só em uma falha do cache
+            import plotly.graph_objects as go
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(
+                x=x_values,
+                y=dispatch.residual_damage,
+                mode='lines',
+                name='Nível de Dano'
+            ))
+            fig.update_layout(
+                title='Progressão do Nível de Dano',
+                xaxis_title=x_title,
+                yaxis_title='Nível Total de Dano Não Atendido'
+            )
+            return fig.to_json()
+        output.plotly(render_key('residual_damage', disaster_info["date"], dispatch.hours, dispatch.residual_damage),
+                      damage_figure)
+
+    with col2:
+        def utilization_figure():
+            import plotly.graph_objects as go
+            fig = go.Figure()
+            for resource_type, utilization in dispatch.utilization.items():
+                fig.add_trace(go.Scatter(
+                    x=x_values,
+                    y=utilization,
+                    mode='lines',
+                    name=resource_type
+                ))
+            fig.update_layout(
+                title='Utilização de Recursos ao Longo do Tempo',
+                xaxis_title=x_title,
+                yaxis_title='Taxa de Utilização'
+            )
+            return fig.to_json()
+        output.plotly(render_key('utilization', disaster_info["date"], dispatch.hours, dispatch.utilization),
+                      utilization_figure)
 
 # Priority Analysis
 st.header("Análise de Prioridades")
+criteria_name = st.radio("Critérios de prioridade", list(PRIORITY_CRITERIA), horizontal=True,
+                         key="priority_criteria")
+if st.session_state.get('priority_criteria_applied', "Dano e população") != criteria_name:
+    # Pontuação vetorizada de todas as zonas; alocações seguintes usam a nova prioridade
+    zones, resources = edit_scenario()
+    scorer = PriorityScorer(PRIORITY_CRITERIA[criteria_name])
+    ingestor = st.session_state.get('report_ingestor')
+    if ingestor is not None and ingestor.running:
+        # A ingestão em andamento passa a usar os novos critérios nos próximos relatórios
+        ingestor.state.rescore(scorer)
+    else:
+        scorer.score_zones(zones)
+        st.session_state.store_stale = True
+    share_scenario()
+    st.session_state.priority_criteria_applied = criteria_name
+    st.rerun()
+
+st.subheader("Zonas Mais Urgentes")
+urgent = top_zones(zones, URGENT_ZONES)
+st.dataframe(pd.DataFrame({
+    "Zona": [zone.name for zone in urgent],
+    "Nível de Dano": [zone.damage_level for zone in urgent],
+    "População": [zone.population for zone in urgent],
+    "Pontuação de Prioridade": [zone.priority_score for zone in urgent]
+}), hide_index=True)
+
 priority_data = [{
     "Zona": zone.name,
     "Nível de Dano": zone.damage_level,
@@ -141,12 +448,29 @@ priority_data = [{
 } for zone in zones]
 
 df_priority = pd.DataFrame(priority_data)
-fig = px.scatter(
-    df_priority,
-    x="Nível de Dano",
-    y="População",
-    size="Pontuação de Prioridade",
-    hover_data=["Zona"],
-    title="Análise de Prioridade por Zona"
-)
-st.plotly_chart(fig) 
\ No newline at end of file
+
+
+def priority_figure():
+    import plotly.express as px
+    return px.scatter(
+        df_priority,
+        x="Nível de Dano",
+        y="População",
+        size="Pontuação de Prioridade",
+        hover_data=["Zona"],
+        title="Análise de Prioridade por Zona"
+    ).to_json()
+
+
+output.plotly(render_key('priority_scatter', pd.util.hash_pandas_object(df_priority, index=False).to_numpy()),
+              priority_figure)
+
+# Preenche os mapas e figuras que ainda estavam sendo renderizados
+output.flush()
+stats = output.cache.stats()
+st.caption(f"Cache de renderização: {stats['entries']} itens, taxa de acerto {stats['hit_rate']:.0%}")
+stats = scenario_cache.stats()
+st.caption(
+    f"Cenários compartilhados: {stats['entries']} em cache ({stats['bytes_held'] / 2**20:.1f} MB), "
+    f"{stats['leases']} sessões, taxa de acerto {stats['hit_rate']:.0%}"
+) 
\ No newline at end of file
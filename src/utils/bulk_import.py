@@ -0,0 +1,248 @@
+import io
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, List, Union
+import numpy as np
+import pandas as pd
+import shapely
+from src.models.zone import Zone, MAX_DAMAGE_LEVEL, calculate_priorities
+from src.models.resource import Resource
+
+BULK_SUFFIXES = (".csv", ".parquet", ".geojson", ".json")
+
+# Raio (graus) das zonas informadas apenas por um ponto, como em load_scenario
+DEFAULT_ZONE_RADIUS = 0.01
+
+DEFAULT_RESOURCE_TYPE = "Ambulância"
+
+# Colunas numéricas das zonas: (valor padrão, mínimo, máximo)
+ZONE_NUMERIC_COLUMNS = {
+    "population": (0, 0, None),
+    "damage_level": (0.0, 0.0, MAX_DAMAGE_LEVEL),
+    "infrastructure_damage": (0.0, 0.0, 1.0),
+    "accessibility": (0.0, 0.0, 1.0),
+    "critical_facilities": (0, 0, None),
+    "historical_risk": (0.0, 0.0, 1.0),
+}
+
+
+@dataclass
+class ImportResult:
+    # Linhas válidas, já normalizadas (tipos numéricos, ids e nomes preenchidos)
+    table: pd.DataFrame
+    # Problemas encontrados: linha (na tabela original), coluna e mensagem
+    errors: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=["row", "column", "message"]))
+    # Número de linhas lidas do arquivo
+    total_rows: int = 0
+
+    @property
+    def valid_rows(self) -> int:
+        return len(self.table)
+
+
+def read_table(source: Union[str, Path, IO[bytes], bytes], name: str = None) -> pd.DataFrame:
+    """
+    Lê uma tabela de zonas ou recursos em CSV, Parquet ou GeoJSON.
+
+    Em GeoJSON, as propriedades de cada feição viram colunas e a geometria vira a
+    coluna "wkt" (pontos também preenchem "lon" e "lat").
+
+    Args:
+        source: Caminho, arquivo aberto ou conteúdo em bytes
+        name: Nome do arquivo, usado para identificar o formato quando `source` não é um caminho
+    """
+    if isinstance(source, (str, Path)):
+        name = name or str(source)
+    suffix = Path(name or "").suffix.lower()
+    if suffix not in BULK_SUFFIXES:
+        raise ValueError(f"Formato não suportado: {name} (use CSV, Parquet ou GeoJSON)")
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+
+    if suffix == ".csv":
+        return pd.read_csv(source)
+    if suffix == ".parquet":
+        return pd.read_parquet(source)
+
+    if isinstance(source, (str, Path)):
+        with open(source, encoding="utf-8") as f:
+            data = json.load(f)
+    else:
+        data = json.load(source)
+    features = data.get("features", [])
+    table = pd.DataFrame([feature.get("properties") or {} for feature in features])
+    geometries = shapely.from_geojson([json.dumps(feature.get("geometry")) for feature in features],
+                                      on_invalid="ignore")
+    table["wkt"] = shapely.to_wkt(geometries)
+    points = shapely.get_type_id(geometries) == 0
+    if points.any():
+        table["lon"] = np.where(points, shapely.get_x(geometries), np.nan)
+        table["lat"] = np.where(points, shapely.get_y(geometries), np.nan)
+        # Pontos viram zonas circulares; a geometria em WKT fica só para os demais tipos
+        table.loc[points, "wkt"] = None
+    return table
+
+
+def validate_zones(table: pd.DataFrame) -> ImportResult:
+    """
+    Valida e normaliza uma tabela de zonas com operações vetorizadas.
+
+    Colunas aceitas, como nos cenários JSON: "id", "name", "wkt" ou "lon"/"lat" com
+    "radius" opcional, "population", "damage_level", "infrastructure_damage",
+    "accessibility", "critical_facilities" e "historical_risk". A pontuação de
+    prioridade é calculada para todas as linhas válidas de uma vez.
+    """
+    table = table.reset_index(drop=True)
+    frame = pd.DataFrame(index=table.index)
+    problems: List[pd.DataFrame] = []
+
+    frame["id"] = _ids(table, "zone")
+    frame["name"] = _text(table, "name", frame["id"])
+    problems.append(_duplicated(frame["id"]))
+
+    for column, (default, minimum, maximum) in ZONE_NUMERIC_COLUMNS.items():
+        frame[column], issues = _numeric(table, column, default, minimum, maximum)
+        problems.append(issues)
+
+    # Geometria: WKT quando presente, senão um círculo ao redor de lon/lat
+    wkt = np.full(len(table), None, dtype=object)
+    if "wkt" in table:
+        text = table["wkt"].astype("string").str.strip()
+        has_wkt = (text.notna() & (text != "")).to_numpy()
+        wkt[has_wkt] = text[has_wkt].to_numpy(dtype=object)
+    else:
+        has_wkt = np.zeros(len(table), dtype=bool)
+    geometries = shapely.from_wkt(wkt, on_invalid="ignore")
+    problems.append(_issues(has_wkt & shapely.is_missing(geometries), "wkt", "WKT inválido"))
+
+    lon, lon_issues = _numeric(table, "lon", np.nan, -180.0, 180.0)
+    lat, lat_issues = _numeric(table, "lat", np.nan, -90.0, 90.0)
+    radius, radius_issues = _numeric(table, "radius", DEFAULT_ZONE_RADIUS, 0.0, None)
+    problems.extend([lon_issues, lat_issues, radius_issues])
+    use_point = ~has_wkt & lon.notna().to_numpy() & lat.notna().to_numpy()
+    if use_point.any():
+        geometries[use_point] = shapely.buffer(shapely.points(lon[use_point], lat[use_point]),
+                                               radius[use_point].to_numpy())
+    problems.append(_issues(~has_wkt & ~use_point, "lon/lat", "sem geometria: informe wkt ou lon e lat"))
+
+    frame["geometry"] = geometries
+    frame["priority_score"] = calculate_priorities(frame["damage_level"], frame["population"])
+    return _result(frame, problems, len(table))
+
+
+def validate_resources(table: pd.DataFrame) -> ImportResult:
+    """
+    Valida e normaliza um quadro de recursos de vários tipos.
+
+    Colunas aceitas: "id", "name", "type", "capacity", "lon", "lat" e "count"
+    opcional, que expande a linha em várias unidades idênticas (ids com sufixo).
+    Recursos sem localização são aceitos e podem ser posicionados depois.
+    """
+    table = table.reset_index(drop=True)
+    frame = pd.DataFrame(index=table.index)
+    problems: List[pd.DataFrame] = []
+
+    frame["id"] = _ids(table, "resource")
+    frame["type"] = _text(table, "type", pd.Series(DEFAULT_RESOURCE_TYPE, index=table.index))
+    frame["capacity"], issues = _numeric(table, "capacity", 1, 1, None)
+    problems.append(issues)
+    frame["lon"], issues = _numeric(table, "lon", np.nan, -180.0, 180.0)
+    problems.append(issues)
+    frame["lat"], issues = _numeric(table, "lat", np.nan, -90.0, 90.0)
+    problems.append(issues)
+    problems.append(_issues(frame["lon"].isna().to_numpy() != frame["lat"].isna().to_numpy(),
+                            "lon/lat", "informe longitude e latitude juntas"))
+    counts, issues = _numeric(table, "count", 1, 1, None)
+    problems.append(issues)
+    frame["name"] = _text(table, "name", frame["type"] + " " + frame["id"])
+
+    result = _result(frame, problems, len(table))
+    counts = counts[result.table.index].astype(np.int64).to_numpy()
+    if (counts > 1).any():
+        expanded = result.table.loc[result.table.index.repeat(counts)]
+        unit = expanded.groupby(level=0).cumcount().add(1).astype(str).to_numpy()
+        repeated = np.repeat(counts > 1, counts)
+        expanded["id"] = np.where(repeated, expanded["id"] + "-" + unit, expanded["id"])
+        expanded["name"] = np.where(repeated, expanded["name"] + " " + unit, expanded["name"])
+        result.table = expanded.reset_index(drop=True)
+        duplicated = result.table["id"].duplicated(keep=False)
+        if duplicated.any():
+            result.errors = pd.concat([result.errors, pd.DataFrame({
+                "row": -1, "column": "id",
+                "message": "id repetido após expandir count: " + result.table.loc[duplicated, "id"]
+            })], ignore_index=True)
+            result.table = result.table[~duplicated]
+    return result
+
+
+def build_zones(result: ImportResult) -> List[Zone]:
+    """Cria as zonas válidas, com a pontuação de prioridade já preenchida."""
+    columns = ["id", "name", "geometry", *ZONE_NUMERIC_COLUMNS, "priority_score"]
+    return [
+        Zone(id=zone_id, name=name, geometry=geometry, population=int(population),
+             damage_level=float(damage), infrastructure_damage=float(infrastructure),
+             accessibility=float(accessibility), critical_facilities=int(facilities),
+             historical_risk=float(risk), priority_score=float(priority))
+        for zone_id, name, geometry, population, damage, infrastructure, accessibility, facilities, risk, priority
+        in result.table[columns].itertuples(index=False, name=None)
+    ]
+
+
+def build_resources(result: ImportResult) -> List[Resource]:
+    table = result.table
+    located = table["lon"].notna().to_numpy()
+    points = np.full(len(table), None, dtype=object)
+    points[located] = shapely.points(table["lon"].to_numpy()[located], table["lat"].to_numpy()[located])
+    return [
+        Resource(id=resource_id, name=name, type=resource_type, capacity=int(capacity), location=point)
+        for (resource_id, name, resource_type, capacity), point
+        in zip(table[["id", "name", "type", "capacity"]].itertuples(index=False, name=None), points)
+    ]
+
+
+def _ids(table: pd.DataFrame, prefix: str) -> pd.Series:
+    generated = pd.Series([f"{prefix}_{i + 1}" for i in range(len(table))], index=table.index)
+    if "id" not in table:
+        return generated
+    ids = table["id"].astype("string").str.strip()
+    return ids.where(ids.notna() & (ids != ""), generated).astype(object)
+
+
+def _text(table: pd.DataFrame, column: str, default: pd.Series) -> pd.Series:
+    if column not in table:
+        return default.astype(object)
+    values = table[column].astype("string").str.strip()
+    return values.where(values.notna() & (values != ""), default).astype(object)
+
+
+def _numeric(table: pd.DataFrame, column: str, default, minimum, maximum):
+    if column not in table:
+        return pd.Series(default, index=table.index, dtype=np.float64), _issues(np.zeros(len(table), bool), column, "")
+    raw = table[column]
+    values = pd.to_numeric(raw, errors="coerce")
+    invalid = (raw.notna() & values.isna()).to_numpy()
+    out_of_range = np.zeros(len(table), dtype=bool)
+    if minimum is not None:
+        out_of_range |= (values < minimum).to_numpy()
+    if maximum is not None:
+        out_of_range |= (values > maximum).to_numpy()
+    bounds = f"entre {minimum} e {maximum}" if maximum is not None else f"maior ou igual a {minimum}"
+    issues = pd.concat([_issues(invalid, column, "valor não numérico"),
+                        _issues(out_of_range, column, f"valor deve ser {bounds}")])
+    return values.fillna(default).astype(np.float64), issues
+
+
+def _duplicated(ids: pd.Series) -> pd.DataFrame:
+    return _issues(ids.duplicated(keep="first").to_numpy(), "id", "id repetido")
+
+
+def _issues(mask: np.ndarray, column: str, message: str) -> pd.DataFrame:
+    rows = np.flatnonzero(mask)
+    return pd.DataFrame({"row": rows, "column": column, "message": message})
+
+
+def _result(frame: pd.DataFrame, problems: List[pd.DataFrame], total_rows: int) -> ImportResult:
+    errors = pd.concat(problems, ignore_index=True).sort_values("row", kind="stable").reset_index(drop=True)
+    valid = ~frame.index.isin(errors["row"])
+    return ImportResult(table=frame[valid], errors=errors, total_rows=total_rows)
@@ -0,0 +1,64 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterator
+
+
+class LRUCache:
+    """
+    Dicionário com número máximo de entradas que descarta o item usado há mais tempo.
+
+    Conta acertos, falhas e descartes para ajuste do tamanho. Não é thread-safe;
+    quem compartilha a instância entre threads deve protegê-la com um lock.
+    """
+
+    def __init__(self, max_entries: int):
+        if max_entries < 1:
+            raise ValueError("max_entries deve ser pelo menos 1")
+        self.max_entries = max_entries
+        self._items: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        # Consulta sem efeito sobre a ordem nem sobre os contadores
+        return key in self._items
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        return self._items.pop(key, default)
+
+    def values(self) -> Iterator[Any]:
+        return iter(list(self._items.values()))
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._items),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
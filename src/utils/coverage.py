@@ -0,0 +1,161 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Union
+import numpy as np
+import pandas as pd
+from src.models.zone import Zone
+from src.models.resource import Resource
+from src.models.ml_models import RouteOptimizer
+from src.models.road_routing import RoadRouter
+from src.models.shortest_paths import multi_source_dijkstra
+from src.utils.distance import nearest
+from src.utils.geometry import resource_coordinates, zone_geometry
+
+
+@dataclass
+class CoverageResult:
+    zone_ids: List[str]
+    resource_types: List[str]
+    # Custo de resposta até o recurso disponível mais próximo de cada tipo, forma (zonas, tipos);
+    # infinito quando nenhum recurso do tipo alcança a zona
+    costs: np.ndarray
+    # ID desse recurso, forma (zonas, tipos); vazio quando não há
+    nearest_resources: np.ndarray
+    threshold: float
+    # "km" (linha reta), "km ponderados" (grafo de zonas com danos) ou "min" (malha viária)
+    unit: str
+
+    @property
+    def best_costs(self) -> np.ndarray:
+        """Custo até o recurso mais próximo de qualquer tipo."""
+        if not self.resource_types:
+            return np.full(len(self.zone_ids), np.inf)
+        return self.costs.min(axis=1)
+
+    def uncovered_zones(self, resource_type: Optional[str] = None) -> List[str]:
+        """
+        Zonas fora do limite de resposta.
+
+        Args:
+            resource_type: Tipo de recurso considerado; sem tipo, a zona está descoberta
+                quando nenhum recurso de qualquer tipo a alcança dentro do limite
+        """
+        if resource_type is None:
+            costs = self.best_costs
+        elif resource_type in self.resource_types:
+            costs = self.costs[:, self.resource_types.index(resource_type)]
+        else:
+            costs = np.full(len(self.zone_ids), np.inf)
+        return [zone_id for zone_id, cost in zip(self.zone_ids, costs) if cost > self.threshold]
+
+    def to_frame(self) -> pd.DataFrame:
+        data = {'zone_id': self.zone_ids}
+        for column, resource_type in enumerate(self.resource_types):
+            data[f'cost_{resource_type}'] = self.costs[:, column]
+            data[f'resource_{resource_type}'] = self.nearest_resources[:, column]
+        data['best_cost'] = self.best_costs
+        data['covered'] = self.best_costs <= self.threshold
+        return pd.DataFrame(data)
+
+
+def analyze_coverage(zones: List[Zone], resources: List[Resource], threshold: float,
+                     network: Optional[Union[RouteOptimizer, RoadRouter]] = None) -> CoverageResult:
+    """
+    Custo de resposta de todas as zonas até o recurso disponível mais próximo de cada tipo.
+
+    Cada tipo de recurso exige uma única busca, a partir de todos os recursos do tipo
+    ao mesmo tempo, em vez de uma consulta por par zona-recurso:
+
+    - `RouteOptimizer`: Dijkstra de múltiplas origens no grafo de zonas (custos ponderados
+      por danos, respeitando bloqueios); cada recurso parte da zona mais próxima
+    - `RoadRouter`: Dijkstra de múltiplas origens na malha viária, em minutos
+    - sem rede: distância em linha reta (haversine) ao recurso mais próximo
+
+    Args:
+        zones: Lista de zonas afetadas
+        resources: Lista de recursos; só entram os disponíveis e com localização
+        threshold: Custo máximo de resposta, na unidade da rede usada
+        network: Rede de rotas opcional
+
+    Returns:
+        Custos por zona e tipo, recurso mais próximo e limite usado
+    """
+    available = [r for r in resources if r.is_available and r.location is not None]
+    by_type: Dict[str, List[Resource]] = {}
+    for resource in available:
+        by_type.setdefault(resource.type, []).append(resource)
+    resource_types = sorted(by_type)
+    zone_ids = [zone.id for zone in zones]
+
+    costs = np.full((len(zones), len(resource_types)), np.inf)
+    nearest_resources = np.full((len(zones), len(resource_types)), '', dtype=object)
+    if isinstance(network, RoadRouter):
+        unit = 'min'
+        search = _road_search(network, zones)
+    elif isinstance(network, RouteOptimizer):
+        unit = 'km ponderados'
+        search = _graph_search(network, zone_ids)
+    else:
+        unit = 'km'
+        search = _straight_line_search(zones)
+
+    for column, resource_type in enumerate(resource_types):
+        costs[:, column], nearest_resources[:, column] = search(by_type[resource_type])
+
+    return CoverageResult(zone_ids, resource_types, costs, nearest_resources, threshold, unit)
+
+
+def _straight_line_search(zones: List[Zone]):
+    centroids = zone_geometry(zones).centroids
+
+    def search(resources: List[Resource]):
+        indices, distances = nearest(centroids, resource_coordinates(resources))
+        ids = np.array([resources[i].id if i >= 0 else '' for i in indices], dtype=object)
+        return distances, ids
+
+    return search
+
+
+def _graph_search(optimizer: RouteOptimizer, zone_ids: List[str]):
+    def search(resources: List[Resource]):
+        # Cada recurso entra no grafo pela zona mais próxima, com a distância até ela como custo inicial
+        entry_zones, access = optimizer.nearest_zones(resource_coordinates(resources))
+        sources = {}
+        for resource, zone_id, cost in zip(resources, entry_zones, access.tolist()):
+            if zone_id is not None and cost < sources.get(zone_id, (np.inf, None))[0]:
+                sources[zone_id] = (cost, resource.id)
+        dist, label = multi_source_dijkstra(optimizer.graph, sources)
+        costs = np.array([dist.get(zone_id, np.inf) for zone_id in zone_ids])
+        ids = np.array([label.get(zone_id, '') for zone_id in zone_ids], dtype=object)
+        return costs, ids
+
+    return search
+
+
+def _road_search(router: RoadRouter, zones: List[Zone]):
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import dijkstra
+
+    network = router.network
+    graph = csr_matrix((network.weights, network.indices, network.indptr),
+                       shape=(network.n_nodes, network.n_nodes))
+    zone_nodes, _ = network.snap(zone_geometry(zones).centroids)
+    reachable = zone_nodes >= 0
+
+    def search(resources: List[Resource]):
+        resource_nodes, _ = network.snap(resource_coordinates(resources))
+        node_resource = {}
+        for resource, node in zip(resources, resource_nodes.tolist()):
+            if node >= 0:
+                node_resource.setdefault(node, resource.id)
+        costs = np.full(len(zones), np.inf)
+        ids = np.full(len(zones), '', dtype=object)
+        if not node_resource or not reachable.any():
+            return costs, ids
+        # Uma única busca com todas as origens (min_only): custo e origem mais próxima de cada nó
+        dist, _, origin = dijkstra(graph, directed=True, indices=list(node_resource),
+                                   min_only=True, return_predecessors=True)
+        costs[reachable] = dist[zone_nodes[reachable]]
+        ids[reachable] = [node_resource.get(int(node), '') for node in origin[zone_nodes[reachable]]]
+        return costs, ids
+
+    return search
@@ -1,10 +1,9 @@
-import geopandas as gpd
-import fiona
 import random
-from typing import Tuple, List
+from typing import Tuple, List, Optional
 from shapely.geometry import Point, Polygon
 from src.models.zone import Zone
 from src.models.resource import Resource
+from src.models.facility_location import position_resources
 
 def load_data() -> Tuple[List[Zone], List[Resource]]:
     """
@@ -55,10 +54,14 @@ def load_data() -> Tuple[List[Zone], List[Resource]]:
 
     return zones, resources
 
-def create_sample_resources() -> List[Resource]:
+def create_sample_resources(zones: Optional[List[Zone]] = None) -> List[Resource]:
     """
     Cria recursos simulados otimizados para o sistema.
     
+    Args:
+        zones: Zonas afetadas; quando informadas, cada recurso é posicionado na base que
+            minimiza a distância de resposta ponderada pela prioridade das zonas
+    
     Returns:
         Lista de recursos simulados
     """
@@ -115,6 +118,7 @@ def create_sample_resources() -> List[Resource]:
         for i in range(definition["count"]):
             resource = Resource(
                 id=f"R{resource_id}",
+                name=f"{definition['type']} {i + 1}",
                 type=definition["type"],
                 capacity=definition["capacity"],
                 location=definition["location"]
@@ -122,4 +126,7 @@ def create_sample_resources() -> List[Resource]:
             resources.append(resource)
             resource_id += 1
     
+    if zones:
+        position_resources(zones, resources, seed=0)
+    
     return resources 
\ No newline at end of file
@@ -0,0 +1,136 @@
+from typing import Optional, Tuple
+import numpy as np
+from src.utils.geometry import EARTH_RADIUS_M
+
+EARTH_RADIUS_KM = EARTH_RADIUS_M / 1000.0
+
+# Memória máxima dos temporários de cada bloco (o array de saída não entra na conta)
+DEFAULT_BLOCK_BYTES = 64 * 1024 * 1024
+
+# Arrays float64 temporários, do tamanho do bloco, usados no cálculo de um bloco
+_TEMPORARIES_PER_BLOCK = 4
+
+
+def haversine_matrix(a_lonlat: np.ndarray, b_lonlat: np.ndarray, dtype=np.float64,
+                     max_block_bytes: int = DEFAULT_BLOCK_BYTES, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Matriz de distâncias de grande círculo (km) entre dois conjuntos de pontos.
+
+    O cálculo é feito em blocos de linhas para que os temporários não passem de
+    `max_block_bytes`; `out` pode ser um `np.memmap` para matrizes maiores que a memória.
+
+    Args:
+        a_lonlat: Array (n, 2) de longitude/latitude em graus
+        b_lonlat: Array (m, 2) de longitude/latitude em graus
+        dtype: Tipo da saída (float32 reduz a memória pela metade)
+        max_block_bytes: Limite de memória dos temporários por bloco
+        out: Array (n, m) de saída opcional
+
+    Returns:
+        Matriz (n, m) de distâncias em quilômetros
+    """
+    a = np.radians(np.asarray(a_lonlat, dtype=np.float64).reshape(-1, 2))
+    b = np.radians(np.asarray(b_lonlat, dtype=np.float64).reshape(-1, 2))
+    out = _output(out, len(a), len(b), dtype)
+    cos_b = np.cos(b[:, 1])
+
+    for start, stop in _blocks(len(a), len(b), max_block_bytes):
+        block = a[start:stop]
+        dlat = np.subtract.outer(block[:, 1], b[:, 1])
+        np.multiply(dlat, 0.5, out=dlat)
+        h = np.sin(dlat, out=dlat)
+        np.square(h, out=h)
+
+        dlon = np.subtract.outer(block[:, 0], b[:, 0])
+        np.multiply(dlon, 0.5, out=dlon)
+        s = np.sin(dlon, out=dlon)
+        np.square(s, out=s)
+        s *= np.cos(block[:, 1])[:, None]
+        s *= cos_b[None, :]
+        h += s
+
+        np.clip(h, 0.0, 1.0, out=h)
+        np.sqrt(h, out=h)
+        np.arcsin(h, out=h)
+        h *= 2.0 * EARTH_RADIUS_KM
+        out[start:stop] = h
+    return out
+
+
+def projected_distance_matrix(a_xy: np.ndarray, b_xy: np.ndarray, dtype=np.float64,
+                              max_block_bytes: int = DEFAULT_BLOCK_BYTES,
+                              out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Matriz de distâncias euclidianas entre coordenadas projetadas (métricas).
+
+    Args:
+        a_xy: Array (n, 2) de coordenadas projetadas
+        b_xy: Array (m, 2) de coordenadas projetadas
+        dtype: Tipo da saída
+        max_block_bytes: Limite de memória dos temporários por bloco
+        out: Array (n, m) de saída opcional
+
+    Returns:
+        Matriz (n, m) de distâncias na unidade das coordenadas
+    """
+    a = np.asarray(a_xy, dtype=np.float64).reshape(-1, 2)
+    b = np.asarray(b_xy, dtype=np.float64).reshape(-1, 2)
+    out = _output(out, len(a), len(b), dtype)
+
+    for start, stop in _blocks(len(a), len(b), max_block_bytes):
+        dx = np.subtract.outer(a[start:stop, 0], b[:, 0])
+        dy = np.subtract.outer(a[start:stop, 1], b[:, 1])
+        out[start:stop] = np.hypot(dx, dy, out=dx)
+    return out
+
+
+def haversine_pairwise(a_lonlat: np.ndarray, b_lonlat: np.ndarray) -> np.ndarray:
+    """Distância (km) entre cada ponto de `a_lonlat` e o ponto correspondente de `b_lonlat`."""
+    a = np.radians(np.asarray(a_lonlat, dtype=np.float64).reshape(-1, 2))
+    b = np.radians(np.asarray(b_lonlat, dtype=np.float64).reshape(-1, 2))
+    h = (np.sin((b[:, 1] - a[:, 1]) / 2) ** 2
+         + np.cos(a[:, 1]) * np.cos(b[:, 1]) * np.sin((b[:, 0] - a[:, 0]) / 2) ** 2)
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+def nearest(a_lonlat: np.ndarray, b_lonlat: np.ndarray,
+            max_block_bytes: int = DEFAULT_BLOCK_BYTES) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ponto mais próximo de `b_lonlat` para cada ponto de `a_lonlat`, sem materializar a matriz completa.
+
+    Pontos com coordenadas NaN são ignorados; linhas sem candidato válido recebem índice -1
+    e distância infinita.
+
+    Returns:
+        Tupla com os índices em `b_lonlat` e as distâncias em km
+    """
+    a = np.asarray(a_lonlat, dtype=np.float64).reshape(-1, 2)
+    b = np.asarray(b_lonlat, dtype=np.float64).reshape(-1, 2)
+    indices = np.full(len(a), -1, dtype=np.int64)
+    distances = np.full(len(a), np.inf)
+    if not len(a) or not len(b):
+        return indices, distances
+
+    # O bloco de distâncias e sua máscara de NaN somam-se aos temporários do cálculo
+    for start, stop in _blocks(len(a), len(b), max_block_bytes, arrays=_TEMPORARIES_PER_BLOCK + 2):
+        block = haversine_matrix(a[start:stop], b, max_block_bytes=max_block_bytes)
+        block[np.isnan(block)] = np.inf
+        best = block.argmin(axis=1)
+        indices[start:stop] = best
+        distances[start:stop] = block[np.arange(len(best)), best]
+    indices[np.isinf(distances)] = -1
+    return indices, distances
+
+
+def _output(out: Optional[np.ndarray], rows: int, cols: int, dtype) -> np.ndarray:
+    if out is None:
+        return np.empty((rows, cols), dtype=dtype)
+    if out.shape != (rows, cols):
+        raise ValueError(f"Saída com forma {out.shape}; esperado {(rows, cols)}")
+    return out
+
+
+def _blocks(rows: int, cols: int, max_block_bytes: int, arrays: int = _TEMPORARIES_PER_BLOCK):
+    block_rows = max(1, int(max_block_bytes // (max(cols, 1) * 8 * arrays)))
+    for start in range(0, rows, block_rows):
+        yield start, min(start + block_rows, rows)
@@ -0,0 +1,187 @@
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+import numpy as np
+import shapely
+from src.models.zone import Zone
+from src.models.resource import Resource
+
+EARTH_RADIUS_M = 6_371_008.8
+METERS_PER_DEGREE = EARTH_RADIUS_M * np.pi / 180.0
+
+# Zonas mantidas pelo cache de geometria; acima disso, só as da consulta atual são mantidas
+GEOMETRY_CACHE_ROWS = 200_000
+
+
+@dataclass
+class ZoneGeometry:
+    ids: List[str]
+    index: Dict[str, int]
+    # Longitude/latitude do centroide de cada zona, forma (n, 2)
+    centroids: np.ndarray
+    # minx, miny, maxx, maxy em graus, forma (n, 4)
+    bounds: np.ndarray
+    areas_km2: np.ndarray
+    # Coordenadas métricas (equirretangular local centrada em `reference`), forma (n, 2)
+    projected: np.ndarray
+    # Longitude e latitude de referência da projeção
+    reference: Tuple[float, float]
+
+    def project(self, lonlat: np.ndarray) -> np.ndarray:
+        """Projeta pontos (lon, lat) no mesmo sistema métrico de `projected`."""
+        return project_lonlat(lonlat, self.reference)
+
+
+class GeometryCache:
+    """
+    Centroides, limites e áreas das zonas, calculados em uma única chamada vetorizada
+    do shapely 2 e reaproveitados enquanto a geometria da zona não mudar.
+
+    Uma zona só é recalculada quando seu objeto de geometria é substituído; consultas
+    com as mesmas zonas e geometrias devolvem o resultado anterior sem novo cálculo.
+    Quando uma consulta levaria o cache além de `max_rows` zonas, as linhas de outros
+    cenários são descartadas e as geometrias deixam de ser referenciadas.
+    """
+
+    def __init__(self, max_rows: int = GEOMETRY_CACHE_ROWS):
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        self._rows: Dict[str, int] = {}
+        self._geometries: List = []
+        self._centroids = np.empty((0, 2))
+        self._bounds = np.empty((0, 4))
+        self._areas_km2 = np.empty(0)
+        self._last = None
+        self.computed = 0
+        self.compactions = 0
+
+    def get(self, zones: List[Zone]) -> ZoneGeometry:
+        ids = [zone.id for zone in zones]
+        geometries = [zone.geometry for zone in zones]
+
+        with self._lock:
+            last = self._last
+            if (last is not None and last[0] == ids
+                    and all(a is b for a, b in zip(last[1], geometries))):
+                return last[2]
+
+            rows = []
+            stale = []
+            for position, (zone_id, geometry) in enumerate(zip(ids, geometries)):
+                row = self._rows.get(zone_id)
+                if row is None or self._geometries[row] is not geometry:
+                    stale.append(position)
+                rows.append(row)
+            if stale:
+                added = sum(1 for i in stale if rows[i] is None)
+                if added and len(self._geometries) + added > self.max_rows:
+                    rows = self._compact(ids, rows)
+                self._compute(ids, geometries, rows, stale)
+
+            result = self._assemble(ids, np.asarray(rows, dtype=np.int64))
+            self._last = (ids, geometries, result)
+            return result
+
+    def _compute(self, ids: List[str], geometries: List, rows: List, stale: List[int]) -> None:
+        array = np.empty(len(stale), dtype=object)
+        array[:] = [geometries[i] for i in stale]
+        centroids = shapely.centroid(array)
+        centroid_xy = np.column_stack([shapely.get_x(centroids), shapely.get_y(centroids)])
+        bounds = shapely.bounds(array)
+        # Área em graus² convertida para km² na latitude do centroide
+        areas = shapely.area(array) * METERS_PER_DEGREE ** 2 * np.cos(np.radians(centroid_xy[:, 1])) / 1e6
+
+        new_rows = [i for i in stale if rows[i] is None]
+        if new_rows:
+            start = len(self._geometries)
+            grow = len(new_rows)
+            self._centroids = np.concatenate([self._centroids, np.empty((grow, 2))])
+            self._bounds = np.concatenate([self._bounds, np.empty((grow, 4))])
+            self._areas_km2 = np.concatenate([self._areas_km2, np.empty(grow)])
+            self._geometries.extend([None] * grow)
+            for offset, position in enumerate(new_rows):
+                rows[position] = start + offset
+                self._rows[ids[position]] = start + offset
+
+        target = np.asarray([rows[i] for i in stale], dtype=np.int64)
+        self._centroids[target] = centroid_xy
+        self._bounds[target] = bounds
+        self._areas_km2[target] = areas
+        for position in stale:
+            self._geometries[rows[position]] = geometries[position]
+        self.computed += len(stale)
+
+    def _compact(self, ids: List[str], rows: List) -> List:
+        # Mantém só as linhas da consulta atual, renumeradas na ordem em que aparecem
+        kept = [row for row in rows if row is not None]
+        self._centroids = self._centroids[kept]
+        self._bounds = self._bounds[kept]
+        self._areas_km2 = self._areas_km2[kept]
+        self._geometries = [self._geometries[row] for row in kept]
+        self._rows = {}
+        compacted = []
+        next_row = 0
+        for zone_id, row in zip(ids, rows):
+            if row is not None:
+                row = self._rows[zone_id] = next_row
+                next_row += 1
+            compacted.append(row)
+        self._last = None
+        self.compactions += 1
+        return compacted
+
+    def _assemble(self, ids: List[str], rows: np.ndarray) -> ZoneGeometry:
+        centroids = self._centroids[rows]
+        # Zonas sem geometria têm centroide NaN e ficam fora da referência
+        located = centroids[~np.isnan(centroids).any(axis=1)]
+        reference = (float(located[:, 0].mean()), float(located[:, 1].mean())) if len(located) else (0.0, 0.0)
+        return ZoneGeometry(
+            ids=ids,
+            index={zone_id: i for i, zone_id in enumerate(ids)},
+            centroids=centroids,
+            bounds=self._bounds[rows],
+            areas_km2=self._areas_km2[rows],
+            projected=project_lonlat(centroids, reference),
+            reference=reference
+        )
+
+
+def project_lonlat(lonlat: np.ndarray, reference: Tuple[float, float]) -> np.ndarray:
+    """
+    Projeção equirretangular local: (lon, lat) em graus para (x, y) em metros.
+
+    Args:
+        lonlat: Array de forma (n, 2) com longitude e latitude
+        reference: Longitude e latitude do ponto de origem
+
+    Returns:
+        Array de forma (n, 2) com coordenadas em metros
+    """
+    lonlat = np.asarray(lonlat, dtype=np.float64).reshape(-1, 2)
+    lon0, lat0 = reference
+    x = (lonlat[:, 0] - lon0) * METERS_PER_DEGREE * np.cos(np.radians(lat0))
+    y = (lonlat[:, 1] - lat0) * METERS_PER_DEGREE
+    return np.column_stack([x, y])
+
+
+def resource_coordinates(resources: List[Resource]) -> np.ndarray:
+    """
+    Longitude/latitude de todos os recursos em uma chamada vetorizada.
+
+    Returns:
+        Array de forma (n, 2); recursos sem localização recebem NaN
+    """
+    points = np.empty(len(resources), dtype=object)
+    points[:] = [resource.location for resource in resources]
+    return np.column_stack([shapely.get_x(points), shapely.get_y(points)]) if len(resources) else np.empty((0, 2))
+
+
+# Cache compartilhado por mapa, rotas e alocação
+geometry_cache = GeometryCache()
+
+
+def zone_geometry(zones: List[Zone]) -> ZoneGeometry:
+    return geometry_cache.get(zones)
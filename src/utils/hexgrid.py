@@ -0,0 +1,352 @@
+import dataclasses
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from shapely.geometry import Point
+from src.models.zone import Zone
+from src.models.resource import Resource
+from src.utils.geometry import METERS_PER_DEGREE, project_lonlat, zone_geometry
+
+# Raio (centro ao vértice, km) dos hexágonos de cada resolução, da mais grossa para a mais fina
+DEFAULT_HEX_SIZES_KM = (40.0, 12.0, 4.0, 1.2)
+
+# Acima deste número de zonas o mapa começa pela visão agregada em hexágonos
+DETAILED_MAP_MAX_ZONES = 500
+
+_SQRT3 = math.sqrt(3.0)
+# Deslocamento que torna q e r não negativos; empacotadas, as células ficam abaixo de 2**62
+_OFFSET = 1 << 30
+
+
+class HexGrid:
+    """
+    Grade hexagonal (vértice para cima, coordenadas axiais q, r) em várias resoluções,
+    sobre a projeção equirretangular local de `reference`.
+
+    Cada célula é um int64 com q e r empacotados; `label` dá um nome legível. A grade
+    não depende de serviço externo, e a referência fica fixa depois de criada para que
+    as células de uma zona não mudem quando outras zonas entram ou saem.
+    """
+
+    def __init__(self, reference: Tuple[float, float], sizes_km: Sequence[float] = DEFAULT_HEX_SIZES_KM):
+        self.reference = (float(reference[0]), float(reference[1]))
+        self.sizes_m = np.asarray(sizes_km, dtype=np.float64) * 1000.0
+
+    @property
+    def resolutions(self) -> int:
+        return len(self.sizes_m)
+
+    def cells(self, lonlat: np.ndarray, resolution: int) -> np.ndarray:
+        """Célula de cada ponto (lon, lat) na resolução dada; pontos NaN recebem -1."""
+        xy = project_lonlat(lonlat, self.reference)
+        size = self.sizes_m[resolution]
+        q = (_SQRT3 / 3 * xy[:, 0] - xy[:, 1] / 3) / size
+        r = (2 / 3 * xy[:, 1]) / size
+        q, r = _cube_round(q, r)
+        cells = _pack(q, r)
+        cells[np.isnan(xy).any(axis=1)] = -1
+        return cells
+
+    def centers(self, cells: np.ndarray, resolution: int) -> np.ndarray:
+        """Longitude/latitude do centro de cada célula, forma (n, 2)."""
+        q, r = _unpack(np.asarray(cells, dtype=np.int64))
+        size = self.sizes_m[resolution]
+        return self._to_lonlat(size * (_SQRT3 * q + _SQRT3 / 2 * r), size * 1.5 * r)
+
+    def polygons(self, cells: np.ndarray, resolution: int) -> List[List[Tuple[float, float]]]:
+        """Vértices (lon, lat) do hexágono de cada célula, em ordem anti-horária e fechados."""
+        q, r = _unpack(np.asarray(cells, dtype=np.int64))
+        size = self.sizes_m[resolution]
+        x = size * (_SQRT3 * q + _SQRT3 / 2 * r)
+        y = size * 1.5 * r
+        angles = np.radians(np.arange(7) * 60.0 - 30.0)
+        corners = self._to_lonlat((x[:, None] + size * np.cos(angles)).ravel(),
+                                  (y[:, None] + size * np.sin(angles)).ravel())
+        return [list(map(tuple, ring)) for ring in corners.reshape(len(x), 7, 2).tolist()]
+
+    def label(self, cell: int, resolution: int) -> str:
+        q, r = _unpack(np.array([cell], dtype=np.int64))
+        return f"h{resolution}:{int(q[0])}:{int(r[0])}"
+
+    def _to_lonlat(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        lon0, lat0 = self.reference
+        return np.column_stack([lon0 + x / (METERS_PER_DEGREE * np.cos(np.radians(lat0))),
+                                lat0 + y / METERS_PER_DEGREE])
+
+
+class _LevelTotals:
+    # Somas por célula de uma resolução; as posições das células nunca são reaproveitadas
+    def __init__(self):
+        self.slots: Dict[int, int] = {}
+        self.cells = np.empty(0, dtype=np.int64)
+        self.count = np.zeros(0, dtype=np.int64)
+        self.population = np.zeros(0)
+        self.damage = np.zeros(0)
+        self.priority = np.zeros(0)
+
+    def add(self, cells: np.ndarray, sign: int, population: np.ndarray, damage: np.ndarray,
+            priority: np.ndarray) -> None:
+        slots = self._slots(cells)
+        np.add.at(self.count, slots, sign)
+        np.add.at(self.population, slots, sign * population)
+        np.add.at(self.damage, slots, sign * damage)
+        np.add.at(self.priority, slots, sign * priority)
+
+    def _slots(self, cells: np.ndarray) -> np.ndarray:
+        unknown = [cell for cell in dict.fromkeys(cells.tolist()) if cell not in self.slots]
+        if unknown:
+            start = len(self.cells)
+            self.slots.update((cell, start + i) for i, cell in enumerate(unknown))
+            grow = len(unknown)
+            self.cells = np.concatenate([self.cells, np.array(unknown, dtype=np.int64)])
+            self.count = np.concatenate([self.count, np.zeros(grow, dtype=np.int64)])
+            self.population = np.concatenate([self.population, np.zeros(grow)])
+            self.damage = np.concatenate([self.damage, np.zeros(grow)])
+            self.priority = np.concatenate([self.priority, np.zeros(grow)])
+        return np.fromiter((self.slots[cell] for cell in cells.tolist()), dtype=np.int64, count=len(cells))
+
+
+class HexAggregation:
+    """
+    População, dano e prioridade das zonas somados por célula hexagonal em todas as
+    resoluções de uma `HexGrid`.
+
+    `update` só recalcula as zonas novas ou cujo centroide, população, dano ou
+    prioridade mudaram: a contribuição antiga é subtraída das células e a nova somada,
+    sem reagregar as demais zonas.
+    """
+
+    def __init__(self, grid: HexGrid):
+        self.grid = grid
+        self._rows: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._active = np.zeros(0, dtype=bool)
+        self._cells = np.empty((0, grid.resolutions), dtype=np.int64)
+        self._centroids = np.empty((0, 2))
+        self._values = np.empty((0, 3))
+        self._levels = [_LevelTotals() for _ in range(grid.resolutions)]
+        # Zonas recalculadas desde a criação (todas as resoluções de uma vez)
+        self.updated = 0
+
+    @classmethod
+    def from_zones(cls, zones: List[Zone], sizes_km: Sequence[float] = DEFAULT_HEX_SIZES_KM) -> 'HexAggregation':
+        centroids = zone_geometry(zones).centroids
+        reference = (float(np.nanmean(centroids[:, 0])), float(np.nanmean(centroids[:, 1]))) if zones else (0.0, 0.0)
+        aggregation = cls(HexGrid(reference, sizes_km))
+        aggregation.update(zones)
+        return aggregation
+
+    def update(self, zones: List[Zone]) -> int:
+        """
+        Insere ou atualiza zonas (as ausentes da lista permanecem; use `remove`).
+
+        Returns:
+            Número de zonas recalculadas
+        """
+        if not zones:
+            return 0
+        centroids = zone_geometry(zones).centroids
+        values = np.array([(zone.population, zone.damage_level, zone.priority_score) for zone in zones],
+                          dtype=np.float64)
+        rows = np.array([self._rows.get(zone.id, -1) for zone in zones], dtype=np.int64)
+
+        known = rows >= 0
+        changed = ~known
+        if known.any():
+            old_rows = rows[known]
+            differs = ((self._values[old_rows] != values[known]).any(axis=1)
+                       | ~_same_points(self._centroids[old_rows], centroids[known]))
+            changed[np.flatnonzero(known)[differs]] = True
+            self._apply(old_rows[differs], -1)
+
+        new = np.flatnonzero(~known)
+        if len(new):
+            rows[new] = self._grow([zones[i].id for i in new.tolist()])
+
+        targets = rows[changed]
+        self._centroids[targets] = centroids[changed]
+        self._values[targets] = values[changed]
+        for level in range(self.grid.resolutions):
+            self._cells[targets, level] = self.grid.cells(centroids[changed], level)
+        self._apply(targets, 1)
+        self.updated += len(targets)
+        return len(targets)
+
+    def remove(self, zone_ids: Iterable[str]) -> None:
+        rows = np.array([self._rows.pop(zone_id) for zone_id in zone_ids if zone_id in self._rows], dtype=np.int64)
+        self._apply(rows, -1)
+        self._active[rows] = False
+        for row in rows.tolist():
+            self._ids[row] = None
+
+    def frame(self, resolution: int) -> pd.DataFrame:
+        """Células não vazias da resolução, da maior para a menor prioridade total."""
+        totals = self._levels[resolution]
+        keep = (totals.count > 0) & (totals.cells >= 0)
+        cells = totals.cells[keep]
+        count = totals.count[keep]
+        centers = self.grid.centers(cells, resolution)
+        frame = pd.DataFrame({
+            'cell': cells,
+            'label': [self.grid.label(cell, resolution) for cell in cells.tolist()],
+            'zones': count,
+            'population': np.rint(totals.population[keep]).astype(np.int64),
+            'mean_damage': totals.damage[keep] / count,
+            'mean_priority': totals.priority[keep] / count,
+            'priority_total': totals.priority[keep],
+            'lon': centers[:, 0],
+            'lat': centers[:, 1]
+        })
+        return frame.sort_values('priority_total', ascending=False, ignore_index=True)
+
+    def zone_ids(self, cell: int, resolution: int) -> List[str]:
+        rows = np.flatnonzero(self._active & (self._cells[:, resolution] == cell))
+        return [self._ids[row] for row in rows.tolist()]
+
+    def zone_cells(self, zone_ids: Sequence[str], resolution: int) -> np.ndarray:
+        rows = np.array([self._rows.get(zone_id, -1) for zone_id in zone_ids], dtype=np.int64)
+        cells = self._cells[np.maximum(rows, 0), resolution] if len(self._cells) else np.full(len(rows), -1)
+        return np.where(rows >= 0, cells, -1)
+
+    def children(self, cell: int, resolution: int) -> np.ndarray:
+        """Células da resolução seguinte que contêm zonas da célula dada."""
+        rows = self._active & (self._cells[:, resolution] == cell)
+        return np.unique(self._cells[rows, resolution + 1])
+
+    def _grow(self, zone_ids: List[str]) -> np.ndarray:
+        start = len(self._ids)
+        grow = len(zone_ids)
+        self._ids.extend(zone_ids)
+        self._rows.update((zone_id, start + i) for i, zone_id in enumerate(zone_ids))
+        self._active = np.concatenate([self._active, np.ones(grow, dtype=bool)])
+        self._cells = np.concatenate([self._cells, np.full((grow, self.grid.resolutions), -1, dtype=np.int64)])
+        self._centroids = np.concatenate([self._centroids, np.full((grow, 2), np.nan)])
+        self._values = np.concatenate([self._values, np.zeros((grow, 3))])
+        return np.arange(start, start + grow)
+
+    def _apply(self, rows: np.ndarray, sign: int) -> None:
+        if not len(rows):
+            return
+        values = self._values[rows]
+        for level, totals in enumerate(self._levels):
+            totals.add(self._cells[rows, level], sign, values[:, 0], values[:, 1], values[:, 2])
+
+
+@dataclass
+class HierarchicalAllocation:
+    resolution: int
+    # Recursos reservados a cada célula na etapa agregada
+    cell_plan: Dict[int, List[str]]
+    # Plano por zona das células refinadas
+    plan: Dict[str, List[str]] = field(default_factory=dict)
+    refined_cells: List[int] = field(default_factory=list)
+    # Zonas sem célula na resolução (centroide ausente ou fora da agregação)
+    unlocated: List[str] = field(default_factory=list)
+
+
+def allocate_by_cells(zones: List[Zone], resources: List[Resource], aggregation: HexAggregation,
+                      resolution: int = 0, refine: Optional[Iterable[int]] = None,
+                      allocator=None) -> HierarchicalAllocation:
+    """
+    Alocação do agregado para o detalhe: primeiro o alocador distribui os recursos entre
+    as células da resolução como se cada uma fosse uma zona (população somada, dano e
+    prioridade médios, com a demanda reduzida à capacidade disponível); depois, só nas
+    células em `refine` (todas, se None), aloca os recursos reservados à célula entre
+    as suas zonas. Zonas sem célula (centroide ausente) ficam em `unlocated` e recebem,
+    numa última passada, os recursos que não foram reservados a células não refinadas
+    nem usados no refinamento.
+
+    A etapa agregada trabalha sobre cópias dos recursos; só o refinamento altera
+    zonas e recursos, como uma chamada direta ao alocador.
+
+    Args:
+        zones: Zonas do cenário, já agregadas em `aggregation`
+        resources: Recursos disponíveis
+        aggregation: Agregação hexagonal das zonas
+        resolution: Resolução da etapa agregada
+        refine: Células a refinar
+        allocator: Objeto com `allocate_resources(zones, resources)`; padrão
+            `src.utils.resource_allocator.ResourceAllocator`
+
+    Returns:
+        Plano por célula e, nas células refinadas, plano por zona
+    """
+    if allocator is None:
+        from src.utils.resource_allocator import ResourceAllocator
+        allocator = ResourceAllocator()
+
+    cells = aggregation.frame(resolution)
+    unlocated = [zone for zone, cell in zip(zones, aggregation.zone_cells([zone.id for zone in zones], resolution).tolist())
+                 if cell < 0]
+    # A população somada de uma célula costuma superar a capacidade de todos os recursos;
+    # reduzida na proporção da capacidade total, cada célula recebe a sua parte em vez de
+    # a primeira célula absorver todos os recursos
+    # A população das zonas sem célula entra na conta para sobrar capacidade para elas
+    total_population = float(cells['population'].sum()) + sum(zone.population for zone in unlocated)
+    total_capacity = float(sum(resource.capacity for resource in resources if resource.is_available))
+    scale = min(1.0, total_capacity / total_population) if total_population > 0 else 1.0
+    # Cada célula vira uma zona no centro do hexágono, para o desempate por distância dos alocadores
+    cell_zones = [
+        Zone(id=str(cell), name=label, geometry=Point(lon, lat), population=int(math.ceil(population * scale)),
+             damage_level=float(damage), priority_score=float(priority))
+        for cell, label, population, damage, priority, lon, lat in zip(
+            cells['cell'].tolist(), cells['label'], cells['population'].tolist(), cells['mean_damage'].tolist(),
+            cells['mean_priority'].tolist(), cells['lon'].tolist(), cells['lat'].tolist()
+        )
+    ]
+    proxies = [dataclasses.replace(resource, assigned_zones=None) for resource in resources]
+    coarse = allocator.allocate_resources(cell_zones, proxies)
+    cell_plan = {int(cell_id): _resource_ids(allocated) for cell_id, allocated in coarse.items()}
+
+    result = HierarchicalAllocation(resolution=resolution, cell_plan=cell_plan,
+                                    unlocated=[zone.id for zone in unlocated])
+    resources_by_id = {resource.id: resource for resource in resources}
+    zones_by_id = {zone.id: zone for zone in zones}
+    for cell in (cell_plan if refine is None else refine):
+        cell_resources = [resources_by_id[r] for r in cell_plan.get(cell, []) if r in resources_by_id]
+        members = [zones_by_id[z] for z in aggregation.zone_ids(cell, resolution) if z in zones_by_id]
+        if not members:
+            continue
+        fine = allocator.allocate_resources(members, cell_resources)
+        result.plan.update((zone_id, _resource_ids(allocated)) for zone_id, allocated in fine.items())
+        result.refined_cells.append(cell)
+    if unlocated:
+        # Recursos reservados a células ainda não refinadas continuam com elas
+        pending = set(cell_plan) - set(result.refined_cells)
+        reserved = {r for cell in pending for r in cell_plan[cell]}
+        leftover = [resource for resource in resources
+                    if resource.is_available and not resource.assigned_zones and resource.id not in reserved]
+        fine = allocator.allocate_resources(unlocated, leftover)
+        result.plan.update((zone_id, _resource_ids(allocated)) for zone_id, allocated in fine.items())
+    return result
+
+
+def _resource_ids(allocated: List) -> List[str]:
+    # Os alocadores devolvem objetos Resource ou apenas IDs
+    return [r if isinstance(r, str) else r.id for r in allocated]
+
+
+def _same_points(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return ((a == b) | (np.isnan(a) & np.isnan(b))).all(axis=1)
+
+
+def _cube_round(q: np.ndarray, r: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Arredondamento em coordenadas cúbicas (q + r + s = 0) para o hexágono mais próximo
+    s = -q - r
+    rq, rr, rs = np.rint(q), np.rint(r), np.rint(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+    return np.nan_to_num(rq).astype(np.int64), np.nan_to_num(rr).astype(np.int64)
+
+
+def _pack(q: np.ndarray, r: np.ndarray) -> np.ndarray:
+    return ((q + _OFFSET) << 32) | (r + _OFFSET)
+
+
+def _unpack(cells: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    return (cells >> 32) - _OFFSET, (cells & 0xFFFFFFFF) - _OFFSET
@@ -0,0 +1,289 @@
+import dataclasses
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from shapely.geometry import Point
+from src.models.zone import Zone
+from src.models.resource import Resource
+from src.models.facility_location import place_depots
+from src.utils.distance import haversine_matrix, haversine_pairwise, nearest
+from src.utils.geometry import resource_coordinates, zone_geometry
+from src.utils.resource_allocator import ResourceAllocator
+from src.utils.shared_scenario import SharedScenario, init_worker_scenario, release_worker_scenario, worker_scenario
+
+# Zonas por região quando o número de regiões não é informado
+ZONES_PER_REGION = 2000
+
+PARTITION_METHODS = ('kmedians', 'grid')
+
+# Alocador executado em cada processo de trabalho
+_worker_state: Dict = {}
+
+
+@dataclass
+class PartitionedAllocation:
+    # {zone_id: [resource_id, ...]} para todas as zonas
+    plan: Dict[str, List[str]]
+    # Região de cada zona e de cada recurso (-1: sem localização, tratados na reconciliação)
+    zone_regions: np.ndarray
+    resource_regions: np.ndarray
+    # Tempo de alocação de cada região dentro do seu processo
+    region_seconds: Dict[int, float]
+    # Recursos levados pela reconciliação a zonas ainda não cobertas
+    reconciled: int
+    elapsed_seconds: float
+    # Etapas: particionamento, regiões em paralelo e reconciliação
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+def partition_scenario(zones: List[Zone], resources: List[Resource], regions: int, method: str = 'grid',
+                       balance: bool = True, seed: Optional[int] = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Divide zonas e recursos em regiões espaciais contíguas.
+
+    'kmedians' agrupa os centroides das zonas com `place_depots` (cada região é o
+    grupo de um depósito); 'grid' corta o plano em faixas de longitude com o mesmo
+    número de zonas e cada faixa em células de latitude também equilibradas. Cada
+    recurso fica na região do centro mais próximo da sua base.
+
+    Com `balance`, a capacidade é redistribuída antes da alocação: as zonas que o
+    alocador sequencial cobriria (as de maior prioridade, até esgotar a capacidade
+    total) definem a demanda de cada região, e os recursos excedentes de uma região,
+    os mais distantes do seu centro primeiro, passam à região carente mais próxima.
+
+    Returns:
+        Região de cada zona e de cada recurso; -1 para os que não têm localização
+    """
+    if method not in PARTITION_METHODS:
+        raise ValueError(f"Método de particionamento desconhecido: {method}")
+    centroids = zone_geometry(zones).centroids
+    zone_regions = np.full(len(zones), -1, dtype=np.int64)
+    resource_regions = np.full(len(resources), -1, dtype=np.int64)
+    valid = ~np.isnan(centroids).any(axis=1)
+    regions = max(1, min(regions, int(valid.sum())))
+    if not valid.any():
+        return zone_regions, resource_regions
+
+    if method == 'kmedians':
+        placement = place_depots(centroids, np.ones(len(zones)), regions, max_iterations=20, seed=seed)
+        zone_regions = placement.assignment
+        centers = placement.depots
+    else:
+        zone_regions[valid] = _grid_regions(centroids[valid], regions)
+        labels = zone_regions[valid]
+        counts = np.bincount(labels, minlength=regions)
+        centers = np.column_stack([np.bincount(labels, weights=centroids[valid, axis], minlength=regions)
+                                   for axis in range(2)]) / np.maximum(counts, 1)[:, None]
+        centers[counts == 0] = np.nan
+
+    coordinates = resource_coordinates(resources)
+    resource_regions, _ = nearest(coordinates, centers)
+    if balance:
+        _balance_capacity(zones, resources, zone_regions, resource_regions, coordinates, centers)
+    return zone_regions, resource_regions
+
+
+def _balance_capacity(zones: List[Zone], resources: List[Resource], zone_regions: np.ndarray,
+                      resource_regions: np.ndarray, coordinates: np.ndarray, centers: np.ndarray) -> None:
+    regions = len(centers)
+    capacity = np.array([r.capacity if r.is_available and not r.assigned_zones else 0 for r in resources],
+                        dtype=np.float64)
+    population = np.array([zone.population for zone in zones], dtype=np.float64)
+    priority = np.array([zone.priority_score for zone in zones], dtype=np.float64)
+
+    # Zonas acima do corte global de prioridade: as que a capacidade total alcança
+    order = np.argsort(-priority, kind='stable')
+    reached = np.cumsum(population[order]) - population[order] < capacity.sum()
+    served = order[reached & (zone_regions[order] >= 0)]
+    demand = np.bincount(zone_regions[served], weights=population[served], minlength=regions)
+    located = resource_regions >= 0
+    supply = np.bincount(resource_regions[located], weights=capacity[located], minlength=regions)
+
+    # Excedentes, dos recursos mais distantes do centro da sua região para os mais próximos
+    distances = haversine_pairwise(coordinates[located], centers[resource_regions[located]])
+    candidates = np.flatnonzero(located)[np.argsort(-distances, kind='stable')]
+    released = []
+    for k in candidates.tolist():
+        region = resource_regions[k]
+        if capacity[k] and supply[region] - capacity[k] >= demand[region]:
+            supply[region] -= capacity[k]
+            released.append(k)
+    if not released:
+        return
+
+    # Cada recurso liberado vai para a região carente mais próxima
+    released = np.array(released, dtype=np.int64)
+    proximity = np.argsort(haversine_matrix(coordinates[released], centers), axis=1)
+    for k, ranked in zip(released.tolist(), proximity.tolist()):
+        target = next((region for region in ranked if supply[region] < demand[region]), resource_regions[k])
+        resource_regions[k] = target
+        supply[target] += capacity[k]
+
+
+def allocate_partitioned(zones: List[Zone], resources: List[Resource], regions: Optional[int] = None,
+                         method: str = 'grid', balance: bool = True, workers: Optional[int] = None,
+                         allocator_class=ResourceAllocator, seed: Optional[int] = 0) -> PartitionedAllocation:
+    """
+    Alocação por regiões em paralelo, seguida de uma reconciliação entre regiões.
+
+    Cada região (zonas e recursos da mesma área) é alocada por `allocator_class` em um
+    processo de trabalho, a partir dos arrays do cenário em memória compartilhada.
+    Depois, os recursos que sobraram em qualquer região (e os sem localização) são
+    oferecidos, ao mesmo alocador, às zonas cuja população ainda não foi coberta,
+    da maior para a menor prioridade, atravessando as fronteiras entre regiões.
+
+    O resultado é aplicado às zonas e recursos informados, como em uma chamada direta
+    a `allocate_resources`.
+
+    Args:
+        zones: Lista de zonas afetadas
+        resources: Lista de recursos disponíveis
+        regions: Número de regiões (padrão: uma a cada ZONES_PER_REGION zonas, ao menos uma por processo)
+        method: 'kmedians' ou 'grid'
+        balance: Redistribui a capacidade entre as regiões antes da alocação (ver `partition_scenario`)
+        workers: Número de processos (padrão: número de CPUs; 1 executa no processo atual)
+        allocator_class: Alocador com `allocate_resources(zones, resources)` que cobre a
+            população das zonas com recursos exclusivos
+        seed: Semente do particionamento por k-medianas
+
+    Returns:
+        Plano completo, regiões e tempos de cada etapa
+    """
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    regions = regions or max(workers, math.ceil(len(zones) / ZONES_PER_REGION))
+    zone_regions, resource_regions = partition_scenario(zones, resources, regions, method, balance, seed)
+    partitioned = time.perf_counter()
+
+    geometry = zone_geometry(zones)
+    coordinates = resource_coordinates(resources)
+    extra = {
+        'zone_lon': geometry.centroids[:, 0], 'zone_lat': geometry.centroids[:, 1],
+        'resource_lon': coordinates[:, 0], 'resource_lat': coordinates[:, 1],
+        'zone_region': zone_regions, 'resource_region': resource_regions,
+        # Recursos já atribuídos antes da chamada não entram nas regiões
+        'resource_free': np.array([r.is_available and not r.assigned_zones for r in resources], dtype=np.bool_)
+    }
+    # Regiões maiores primeiro, para equilibrar a carga dos processos
+    sizes = np.bincount(zone_regions[zone_regions >= 0], minlength=regions)
+    tasks = [int(region) for region in np.argsort(-sizes, kind='stable') if sizes[region]]
+
+    region_plans = []
+    with SharedScenario(zones, resources, extra=extra) as scenario:
+        if workers == 1 or len(tasks) == 1:
+            _init_worker(scenario.spec, allocator_class)
+            try:
+                region_plans = [_allocate_region(region) for region in tasks]
+            finally:
+                _release_worker()
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=_init_worker,
+                                     initargs=(scenario.spec, allocator_class)) as executor:
+                region_plans = list(executor.map(_allocate_region, tasks))
+    allocated = time.perf_counter()
+
+    zones_by_id = {zone.id: zone for zone in zones}
+    resources_by_id = {resource.id: resource for resource in resources}
+    plan = {zone.id: [] for zone in zones}
+    region_seconds = {}
+    for region, region_plan, seconds in region_plans:
+        region_seconds[region] = seconds
+        for zone_id, resource_ids in region_plan.items():
+            for resource_id in resource_ids:
+                _assign(zones_by_id[zone_id], resources_by_id[resource_id], plan)
+
+    reconciled = _reconcile(zones, resources, plan, allocator_class)
+    finished = time.perf_counter()
+    return PartitionedAllocation(
+        plan=plan,
+        zone_regions=zone_regions,
+        resource_regions=resource_regions,
+        region_seconds=region_seconds,
+        reconciled=reconciled,
+        elapsed_seconds=finished - start,
+        timings={'partition': partitioned - start, 'regions': allocated - partitioned,
+                 'reconciliation': finished - allocated}
+    )
+
+
+def _reconcile(zones: List[Zone], resources: List[Resource], plan: Dict[str, List[str]], allocator_class) -> int:
+    # Recursos que sobraram em qualquer região vão para zonas com população ainda descoberta
+    leftover = [r for r in resources if r.is_available and not r.assigned_zones]
+    if not leftover:
+        return 0
+    capacity = {resource.id: resource.capacity for resource in resources}
+    deficits = [zone.population - sum(capacity[r] for r in zone.resources_allocated) for zone in zones]
+    # Cópias das zonas descobertas com a população que falta; a geometria é a mesma
+    underserved = [dataclasses.replace(zone, population=int(deficit), resources_allocated=None)
+                   for zone, deficit in zip(zones, deficits) if deficit > 0]
+    if not underserved:
+        return 0
+    zones_by_id = {zone.id: zone for zone in zones}
+    reconciled = 0
+    for zone_id, allocated in allocator_class().allocate_resources(underserved, leftover).items():
+        for resource in allocated:
+            # O alocador já registrou a zona no recurso; falta a zona original e o plano
+            zones_by_id[zone_id].add_resource(resource.id)
+            plan[zone_id].append(resource.id)
+            reconciled += 1
+    return reconciled
+
+
+def _assign(zone: Zone, resource: Resource, plan: Dict[str, List[str]]) -> None:
+    resource.assign_to_zone(zone.id)
+    zone.add_resource(resource.id)
+    plan[zone.id].append(resource.id)
+
+
+def _grid_regions(points: np.ndarray, regions: int) -> np.ndarray:
+    # Faixas de longitude com o mesmo número de pontos, cada uma cortada em latitude
+    columns = max(1, int(round(math.sqrt(regions))))
+    per_column = [regions // columns + (1 if c < regions % columns else 0) for c in range(columns)]
+    labels = np.empty(len(points), dtype=np.int64)
+    order = np.argsort(points[:, 0], kind='stable')
+    first = 0
+    for column, strip in enumerate(np.array_split(order, columns)):
+        rows = np.array_split(strip[np.argsort(points[strip, 1], kind='stable')], per_column[column])
+        for offset, members in enumerate(rows):
+            labels[members] = first + offset
+        first += per_column[column]
+    return labels
+
+
+def _init_worker(spec: Dict, allocator_class) -> None:
+    init_worker_scenario(spec)
+    _worker_state.update(allocator_class=allocator_class)
+
+
+def _release_worker() -> None:
+    _worker_state.clear()
+    release_worker_scenario()
+
+
+def _allocate_region(region: int) -> Tuple[int, Dict[str, List[str]], float]:
+    spec, arrays = worker_scenario()
+    zone_rows = np.flatnonzero(arrays['extra.zone_region'] == region)
+    resource_rows = np.flatnonzero((arrays['extra.resource_region'] == region) & arrays['extra.resource_free'])
+    lon, lat = arrays['extra.zone_lon'], arrays['extra.zone_lat']
+    # Objetos só da região, com o centroide como geometria (basta para o desempate por distância)
+    zones = [
+        Zone(id=spec['zone_ids'][i], name=spec['zone_names'][i], geometry=Point(lon[i], lat[i]),
+             population=int(arrays['zone.population'][i]), damage_level=float(arrays['zone.damage_level'][i]),
+             priority_score=float(arrays['zone.priority_score'][i]))
+        for i in zone_rows.tolist()
+    ]
+    lon, lat = arrays['extra.resource_lon'], arrays['extra.resource_lat']
+    resources = [
+        Resource(id=spec['resource_ids'][k], name=spec['resource_names'][k], type=spec['resource_types'][k],
+                 capacity=int(arrays['resource.capacity'][k]), location=Point(lon[k], lat[k]))
+        for k in resource_rows.tolist()
+    ]
+
+    start = time.perf_counter()
+    allocation = _worker_state['allocator_class']().allocate_resources(zones, resources)
+    seconds = time.perf_counter() - start
+    return region, {zone_id: [r.id for r in allocated] for zone_id, allocated in allocation.items()}, seconds
@@ -0,0 +1,193 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import pandas as pd
+from src.models.zone import Zone
+from src.models.resource import Resource
+from src.models.ml_models import DisasterPredictor, RouteOptimizer, zone_to_features
+from src.models.road_routing import RoadRouter
+from src.utils.resource_allocator import ResourceAllocator
+from src.utils.geometry import resource_coordinates, zone_geometry
+from src.utils.distance import nearest
+from src.utils.scenario_io import load_scenario
+
+# Mínimo de zonas para treinar o modelo de previsão com divisão treino/teste
+MIN_ZONES_FOR_PREDICTION = 5
+
+# Modos de alocação: sequencial (ResourceAllocator) ou por regiões em paralelo (allocate_partitioned)
+ALLOCATION_MODES = ('sequential', 'partitioned')
+
+
+def run_pipeline(zones: List[Zone], resources: List[Resource],
+                 road_router: Optional[RoadRouter] = None, allocation_mode: str = 'sequential',
+                 partition_workers: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Executa o fluxo completo sem interface: pontuação, alocação, rotas e previsão.
+
+    Args:
+        zones: Lista de zonas afetadas
+        resources: Lista de recursos disponíveis
+        road_router: Malha viária opcional para rotas recurso -> zona pelas ruas
+        allocation_mode: Um de ALLOCATION_MODES
+        partition_workers: Processos da alocação 'partitioned' (padrão: número de CPUs)
+
+    Returns:
+        Dicionário com as tabelas "allocations", "routes", "predictions" e "history",
+        mais "road_routes" quando `road_router` é informado
+    """
+    if allocation_mode not in ALLOCATION_MODES:
+        raise ValueError(f"Modo de alocação desconhecido: {allocation_mode}")
+    for zone in zones:
+        zone.calculate_priority()
+
+    allocator = ResourceAllocator()
+    if allocation_mode == 'partitioned':
+        allocation = _allocate_partitioned(zones, resources, allocator, partition_workers)
+    else:
+        allocation = allocator.allocate_resources(zones, resources)
+
+    allocation_rows = []
+    for zone in zones:
+        for resource in allocation.get(zone.id, []):
+            allocation_rows.append({
+                'zone_id': zone.id,
+                'zone_name': zone.name,
+                'priority_score': zone.priority_score,
+                'resource_id': resource.id,
+                'resource_type': resource.type,
+                'capacity_allocated': resource.capacity
+            })
+
+    route_optimizer = RouteOptimizer()
+    route_optimizer.build_graph(zones, resources)
+
+    route_rows = []
+    nearest_zone = _nearest_zone_ids(zones, resources)
+    for zone_id, allocated in allocation.items():
+        for resource in allocated:
+            start_id = nearest_zone.get(resource.id)
+            if start_id is None:
+                continue
+            route = route_optimizer.find_optimal_route(start_id, zone_id)
+            for step, step_zone_id in enumerate(route):
+                route_rows.append({
+                    'resource_id': resource.id,
+                    'target_zone_id': zone_id,
+                    'step': step,
+                    'zone_id': step_zone_id
+                })
+
+    prediction_rows = []
+    if len(zones) >= MIN_ZONES_FOR_PREDICTION:
+        zone_data = [zone_to_features(zone) for zone in zones]
+        predictor = DisasterPredictor()
+        predictor.train(zone_data)
+        predictions = predictor.predict(zone_data)
+        for zone, prediction in zip(zones, predictions):
+            prediction_rows.append({
+                'zone_id': zone.id,
+                'damage_level': zone.damage_level,
+                'predicted_damage': float(prediction)
+            })
+
+    tables = {
+        'allocations': pd.DataFrame(allocation_rows, columns=[
+            'zone_id', 'zone_name', 'priority_score',
+            'resource_id', 'resource_type', 'capacity_allocated'
+        ]),
+        'routes': pd.DataFrame(route_rows, columns=['resource_id', 'target_zone_id', 'step', 'zone_id']),
+        'predictions': pd.DataFrame(prediction_rows, columns=['zone_id', 'damage_level', 'predicted_damage']),
+        'history': allocator.allocation_history.to_arrow().to_pandas()
+    }
+
+    if road_router is not None:
+        zones_by_id = {zone.id: zone for zone in zones}
+        road_rows = []
+        for zone_id, allocated in allocation.items():
+            for resource in allocated:
+                route = road_router.resource_to_zone(resource, zones_by_id[zone_id])
+                road_rows.append({
+                    'resource_id': resource.id,
+                    'zone_id': zone_id,
+                    'travel_minutes': route.minutes,
+                    'length_km': route.length_km,
+                    'road_nodes': len(route.nodes)
+                })
+        tables['road_routes'] = pd.DataFrame(road_rows, columns=[
+            'resource_id', 'zone_id', 'travel_minutes', 'length_km', 'road_nodes'
+        ])
+
+    return tables
+
+
+def run_scenario_file(path: Union[str, Path], output_dir: Union[str, Path],
+                      road_router_dir: Optional[Union[str, Path]] = None, allocation_mode: str = 'sequential',
+                      partition_workers: Optional[int] = None) -> Dict[str, int]:
+    """
+    Executa o fluxo para um arquivo de cenário e grava os resultados em Parquet.
+
+    Os arquivos são gravados em `<output_dir>/<nome do cenário>/`.
+
+    Args:
+        path: Caminho do arquivo de cenário
+        output_dir: Diretório de saída
+        road_router_dir: Malha viária já pré-processada (ver `prepare_road_router`)
+        allocation_mode: Um de ALLOCATION_MODES (ver `run_pipeline`)
+        partition_workers: Processos da alocação 'partitioned'
+
+    Returns:
+        Resumo com o nome do cenário e o número de linhas de cada tabela
+    """
+    path = Path(path)
+    zones, resources = load_scenario(path)
+    road_router = RoadRouter.load(road_router_dir) if road_router_dir else None
+    tables = run_pipeline(zones, resources, road_router, allocation_mode, partition_workers)
+
+    scenario_dir = Path(output_dir) / path.stem
+    scenario_dir.mkdir(parents=True, exist_ok=True)
+    summary = {'scenario': path.stem}
+    for name, table in tables.items():
+        table.to_parquet(scenario_dir / f"{name}.parquet", index=False)
+        summary[name] = len(table)
+    return summary
+
+
+def prepare_road_router(network_path: Union[str, Path], output_dir: Union[str, Path]) -> Path:
+    """
+    Lê a malha viária e pré-processa a hierarquia de contração uma única vez,
+    gravando ambas em `<output_dir>/road_network/` para os processos de cenário.
+    """
+    from src.utils.road_network import load_road_network
+
+    directory = Path(output_dir) / 'road_network'
+    RoadRouter(load_road_network(network_path)).save(directory)
+    return directory
+
+
+def _allocate_partitioned(zones: List[Zone], resources: List[Resource], allocator: ResourceAllocator,
+                          workers: Optional[int]) -> Dict[str, List[Resource]]:
+    # Mesmo formato de ResourceAllocator.allocate_resources; o histórico recebe o plano final
+    from src.utils.partitioned_allocation import allocate_partitioned
+
+    plan = allocate_partitioned(zones, resources, workers=workers).plan
+    zones_by_id = {zone.id: zone for zone in zones}
+    resources_by_id = {resource.id: resource for resource in resources}
+    allocation = {zone_id: [resources_by_id[r] for r in resource_ids] for zone_id, resource_ids in plan.items()}
+    allocator.allocation_history.start_run()
+    for zone_id, allocated in allocation.items():
+        zone = zones_by_id[zone_id]
+        for resource in allocated:
+            allocator.allocation_history.append(
+                zone_id=zone.id,
+                zone_name=zone.name,
+                resource_id=resource.id,
+                resource_type=resource.type,
+                priority_score=zone.priority_score,
+                capacity_allocated=resource.capacity
+            )
+    return allocation
+
+
+def _nearest_zone_ids(zones: List[Zone], resources: List[Resource]) -> Dict[str, str]:
+    geometry = zone_geometry(zones)
+    indices, _ = nearest(resource_coordinates(resources), geometry.centroids)
+    return {resource.id: geometry.ids[i] for resource, i in zip(resources, indices) if i >= 0}
@@ -0,0 +1,387 @@
+import asyncio
+import json
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import numpy as np
+from src.models.zone import Zone, MAX_DAMAGE_LEVEL, calculate_priorities
+from src.models.priority import PriorityScorer, StreamingTopK
+
+# Máximo de relatórios aplicados de uma vez e espera máxima para completar um lote
+MAX_BATCH_SIZE = 2048
+MAX_BATCH_DELAY = 0.05
+
+# Intervalo entre leituras do arquivo quando não há linhas novas
+TAIL_POLL_INTERVAL = 0.1
+
+# Relatórios aguardando aplicação; acima disso a leitura espera (contrapressão)
+MAX_QUEUE_SIZE = 100_000
+
+# Faixas da distribuição de danos, como em Dashboard.display_damage_distribution
+DAMAGE_BINS = int(MAX_DAMAGE_LEVEL) + 1
+
+# Zonas mais urgentes acompanhadas a cada lote
+URGENT_ZONES = 20
+
+
+@dataclass
+class DamageReport:
+    zone_id: str
+    # Campos ausentes no relatório não alteram a zona
+    damage_level: Optional[float] = None
+    infrastructure_damage: Optional[float] = None
+    accessibility: Optional[float] = None
+
+
+def parse_report(line: Union[str, bytes]) -> Optional[DamageReport]:
+    """
+    Lê um relatório em JSON, por exemplo `{"zone_id": "z1", "damage_level": 3.5}`.
+
+    Returns:
+        O relatório, ou None se a linha estiver vazia ou malformada
+    """
+    try:
+        data = json.loads(line)
+        report = DamageReport(
+            zone_id=str(data['zone_id']),
+            damage_level=_optional_float(data.get('damage_level')),
+            infrastructure_damage=_optional_float(data.get('infrastructure_damage')),
+            accessibility=_optional_float(data.get('accessibility'))
+        )
+    except (ValueError, TypeError, KeyError):
+        return None
+    if report.damage_level is None and report.infrastructure_damage is None and report.accessibility is None:
+        return None
+    return report
+
+
+class LiveDamageState:
+    """
+    Condição das zonas atualizada por relatórios de campo.
+
+    Cada lote altera apenas as zonas citadas: a prioridade é recalculada só para elas
+    (de forma vetorizada) e os agregados do painel (zonas afetadas, dano médio,
+    distribuição de danos) são corrigidos pela diferença, sem percorrer todas as zonas.
+    Os objetos `Zone` recebem os novos valores, e um `RouteOptimizer` opcional tem o
+    custo de travessia das zonas atualizado.
+
+    Sem `scorer`, a prioridade segue `Zone.calculate_priority`; com um `PriorityScorer`,
+    seus critérios. Critérios 'minmax' dependem de todas as zonas, então cada lote
+    recalcula a prioridade de todas elas.
+    """
+
+    def __init__(self, zones: List[Zone], route_optimizer=None, scorer: Optional[PriorityScorer] = None):
+        self.zones = zones
+        self.route_optimizer = route_optimizer
+        self._index = {zone.id: i for i, zone in enumerate(zones)}
+        self._lock = threading.Lock()
+        self.population = np.array([zone.population for zone in zones], dtype=np.float64)
+        self.damage = np.array([zone.damage_level for zone in zones], dtype=np.float64)
+        self.infrastructure = np.array([zone.infrastructure_damage for zone in zones], dtype=np.float64)
+        self.accessibility = np.array([zone.accessibility for zone in zones], dtype=np.float64)
+        self.priority = np.array([zone.priority_score for zone in zones], dtype=np.float64)
+        # Versão do último lote que alterou cada zona
+        self.changed_at = np.zeros(len(zones), dtype=np.int64)
+        self.version = 0
+        self.reports_applied = 0
+        self.unknown_zones = 0
+
+        self._damage_sum = float(self.damage.sum())
+        self._affected = int((self.damage > 0).sum())
+        self._histogram = np.bincount(_damage_bins(self.damage), minlength=DAMAGE_BINS)
+        self._urgent = StreamingTopK(URGENT_ZONES)
+        self._urgent.update_many(range(len(zones)), self.priority.tolist())
+        self._set_scorer(scorer)
+
+    def rescore(self, scorer: Optional[PriorityScorer]) -> None:
+        """Troca os critérios de prioridade e recalcula todas as zonas."""
+        with self._lock:
+            self._set_scorer(scorer)
+            if scorer is None:
+                priority = calculate_priorities(self.damage, self.population)
+            else:
+                priority = scorer.scores(self._columns)
+            self._set_priorities(np.arange(len(self.zones)), priority)
+
+    def apply(self, reports: List[DamageReport]) -> np.ndarray:
+        """
+        Aplica um lote de relatórios; para a mesma zona, vale o último de cada campo.
+
+        Returns:
+            Índices das zonas alteradas
+        """
+        latest: Dict[int, List[float]] = {}
+        unknown = 0
+        for report in reports:
+            i = self._index.get(report.zone_id)
+            if i is None:
+                unknown += 1
+                continue
+            entry = latest.setdefault(i, [np.nan, np.nan, np.nan])
+            if report.damage_level is not None:
+                entry[0] = report.damage_level
+            if report.infrastructure_damage is not None:
+                entry[1] = report.infrastructure_damage
+            if report.accessibility is not None:
+                entry[2] = report.accessibility
+        if not latest:
+            with self._lock:
+                self.unknown_zones += unknown
+            return np.empty(0, dtype=np.int64)
+
+        rows = np.fromiter(latest, dtype=np.int64, count=len(latest))
+        values = np.array(list(latest.values()), dtype=np.float64)
+        with self._lock:
+            old_damage = self.damage[rows]
+            damage = np.where(np.isnan(values[:, 0]), old_damage, np.clip(values[:, 0], 0.0, MAX_DAMAGE_LEVEL))
+            infrastructure = np.where(np.isnan(values[:, 1]), self.infrastructure[rows], np.clip(values[:, 1], 0.0, 1.0))
+            accessibility = np.where(np.isnan(values[:, 2]), self.accessibility[rows], np.clip(values[:, 2], 0.0, 1.0))
+            condition_changed = ((infrastructure != self.infrastructure[rows])
+                                 | (accessibility != self.accessibility[rows]))
+
+            self._damage_sum += float((damage - old_damage).sum())
+            self._affected += int((damage > 0).sum() - (old_damage > 0).sum())
+            np.subtract.at(self._histogram, _damage_bins(old_damage), 1)
+            np.add.at(self._histogram, _damage_bins(damage), 1)
+
+            self.damage[rows] = damage
+            self.infrastructure[rows] = infrastructure
+            self.accessibility[rows] = accessibility
+            if self.scorer is None:
+                priority = calculate_priorities(damage, self.population[rows])
+            else:
+                for attribute, values in (('damage_level', damage), ('infrastructure_damage', infrastructure),
+                                          ('accessibility', accessibility)):
+                    if attribute in self._columns:
+                        self._columns[attribute][rows] = values
+                if self._relative:
+                    self._set_priorities(np.arange(len(self.zones)), self.scorer.scores(self._columns))
+                    priority = self.priority[rows]
+                else:
+                    priority = self.scorer.scores({name: column[rows] for name, column in self._columns.items()})
+            self.priority[rows] = priority
+            self._urgent.update_many(rows.tolist(), priority.tolist())
+            self.version += 1
+            self.changed_at[rows] = self.version
+            self.reports_applied += len(reports) - unknown
+            self.unknown_zones += unknown
+
+            for i, d, infra, access, p in zip(rows.tolist(), damage.tolist(), infrastructure.tolist(),
+                                              accessibility.tolist(), priority.tolist()):
+                zone = self.zones[i]
+                zone.damage_level = d
+                zone.infrastructure_damage = infra
+                zone.accessibility = access
+                zone.priority_score = p
+
+        if self.route_optimizer is not None:
+            for i in rows[condition_changed].tolist():
+                self.route_optimizer.update_zone_condition(self.zones[i].id, self.infrastructure[i],
+                                                           self.accessibility[i])
+        return rows
+
+    def _set_scorer(self, scorer: Optional[PriorityScorer]) -> None:
+        self.scorer = scorer
+        self._columns = scorer.zone_columns(self.zones) if scorer is not None else None
+        self._relative = scorer is not None and any(c.normalizer == 'minmax' for c in scorer.criteria)
+
+    def _set_priorities(self, rows: np.ndarray, priority: np.ndarray) -> None:
+        # Grava só as pontuações que mudaram (estado, top-k e objetos Zone)
+        changed = rows[priority != self.priority[rows]]
+        if not len(changed):
+            return
+        values = priority[priority != self.priority[rows]]
+        self.priority[changed] = values
+        self._urgent.update_many(changed.tolist(), values.tolist())
+        self.version += 1
+        self.changed_at[changed] = self.version
+        for i, p in zip(changed.tolist(), values.tolist()):
+            self.zones[i].priority_score = p
+
+    def aggregates(self) -> Dict:
+        """Agregados do painel, mantidos incrementalmente (custo O(1))."""
+        with self._lock:
+            n = len(self.zones)
+            return {
+                'version': self.version,
+                'total_zones': n,
+                'affected_zones': self._affected,
+                'average_damage': self._damage_sum / n if n else 0.0,
+                'damage_distribution': self._histogram.tolist(),
+                'reports_applied': self.reports_applied,
+                'unknown_zones': self.unknown_zones,
+            }
+
+    def most_urgent(self) -> List[Zone]:
+        """As URGENT_ZONES zonas de maior prioridade, mantidas por um heap limitado."""
+        with self._lock:
+            rows = [i for i, _ in self._urgent.top()]
+        return [self.zones[i] for i in rows]
+
+    def changed_since(self, version: int, limit: Optional[int] = 20) -> List[Zone]:
+        """Zonas alteradas depois de `version`, da maior para a menor prioridade (todas sem `limit`)."""
+        with self._lock:
+            rows = np.flatnonzero(self.changed_at > version)
+            if limit is not None and len(rows) > limit:
+                rows = rows[np.argpartition(-self.priority[rows], limit - 1)[:limit]]
+            rows = rows[np.argsort(-self.priority[rows], kind='stable')]
+        return [self.zones[i] for i in rows.tolist()]
+
+
+class ReportIngestor:
+    """
+    Ingestão contínua de relatórios de danos em uma thread própria com laço asyncio.
+
+    As fontes (arquivo JSONL acompanhado como `tail -f` e/ou socket TCP com um JSON
+    por linha) colocam os relatórios em uma `asyncio.Queue`; o consumidor junta o que
+    estiver disponível (até MAX_BATCH_SIZE, esperando no máximo MAX_BATCH_DELAY) e
+    aplica cada lote de uma vez em `LiveDamageState`.
+    """
+
+    def __init__(self, state: LiveDamageState, path: Optional[Union[str, Path]] = None,
+                 host: str = '127.0.0.1', port: Optional[int] = None, from_start: bool = False,
+                 max_batch_size: int = MAX_BATCH_SIZE, max_batch_delay: float = MAX_BATCH_DELAY):
+        if path is None and port is None:
+            raise ValueError("Informe um arquivo JSONL ou uma porta TCP")
+        self.state = state
+        self.path = Path(path) if path is not None else None
+        self.host = host
+        self.port = port
+        self.from_start = from_start
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+        self.received = 0
+        self.malformed = 0
+        self.batches = 0
+        self.started_at: Optional[float] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> 'ReportIngestor':
+        if not self.running:
+            self._ready.clear()
+            self._thread = threading.Thread(target=lambda: asyncio.run(self._main()), daemon=True,
+                                            name="report-ingestor")
+            self._thread.start()
+            self._ready.wait(timeout=5)
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._loop is not None and self._stop is not None and self.running:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> Dict:
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        return {
+            'received': self.received,
+            'malformed': self.malformed,
+            'batches': self.batches,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'applied': self.state.reports_applied,
+            'reports_per_second': self.state.reports_applied / elapsed if elapsed > 0 else 0.0,
+        }
+
+    async def _main(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self._queue = asyncio.Queue(MAX_QUEUE_SIZE)
+        self.started_at = time.monotonic()
+
+        tasks = [asyncio.create_task(self._consume())]
+        server = None
+        if self.path is not None:
+            # A posição inicial é fixada antes de `start` retornar: linhas gravadas
+            # depois disso nunca são perdidas
+            position = 0 if self.from_start or not self.path.exists() else self.path.stat().st_size
+            tasks.append(asyncio.create_task(self._tail(position)))
+        if self.port is not None:
+            server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+            # Porta 0: o sistema escolhe uma porta livre
+            self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+
+        await self._stop.wait()
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _put(self, line: Union[str, bytes]) -> None:
+        report = parse_report(line)
+        if report is None:
+            if line.strip():
+                self.malformed += 1
+            return
+        self.received += 1
+        await self._queue.put(report)
+
+    async def _tail(self, position: int) -> None:
+        # Acompanha o arquivo como `tail -f`, recomeçando do início se ele for truncado
+        pending = b''
+        while True:
+            try:
+                with open(self.path, 'rb') as f:
+                    size = f.seek(0, 2)
+                    if size < position:
+                        position, pending = 0, b''
+                    f.seek(position)
+                    chunk = f.read()
+                    position = f.tell()
+            except FileNotFoundError:
+                chunk = b''
+            if not chunk:
+                await asyncio.sleep(TAIL_POLL_INTERVAL)
+                continue
+            lines = (pending + chunk).split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                await self._put(line)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                await self._put(line)
+        finally:
+            writer.close()
+
+    async def _consume(self) -> None:
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            deadline = self._loop.time() + self.max_batch_delay
+            while len(batch) < self.max_batch_size:
+                if queue.empty():
+                    remaining = deadline - self._loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(queue.get_nowait())
+            # Fora do laço de eventos, para a leitura continuar enquanto o lote é aplicado
+            await self._loop.run_in_executor(None, self.state.apply, batch)
+            self.batches += 1
+
+
+def _optional_float(value) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def _damage_bins(damage: np.ndarray) -> np.ndarray:
+    return np.clip(damage.astype(np.int64), 0, DAMAGE_BINS - 1)
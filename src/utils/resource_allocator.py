@@ -1,10 +1,15 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
+import numpy as np
 from src.models.zone import Zone
 from src.models.resource import Resource
+from src.models.history import AllocationHistory
+from src.models.priority import LazyRanking
+from src.utils.geometry import resource_coordinates, zone_geometry
+from src.utils.distance import haversine_matrix
 
 class ResourceAllocator:
-    def __init__(self):
-        self.allocation_history = []
+    def __init__(self, history: Optional[AllocationHistory] = None):
+        self.allocation_history = history if history is not None else AllocationHistory()
 
     def allocate_resources(self, zones: List[Zone], resources: List[Resource]) -> Dict[str, List[Resource]]:
         """
@@ -17,18 +22,33 @@ class ResourceAllocator:
         Returns:
             Dicionário com a alocação de recursos por zona
         """
-        # Ordenar zonas por prioridade (maior para menor)
-        sorted_zones = sorted(zones, key=lambda x: x.priority_score, reverse=True)
+        # Zonas por prioridade (maior para menor), ordenadas sob demanda: a alocação
+        # para quando os recursos acabam, sem ordenar o restante da lista
+        priorities = np.fromiter((z.priority_score for z in zones), dtype=np.float64, count=len(zones))
+        zone_order = LazyRanking(priorities)
         
         # Ordenar recursos por capacidade (maior para menor)
         sorted_resources = sorted(resources, key=lambda x: x.capacity, reverse=True)
         
+        # Distâncias zona x recurso (km); entre recursos de mesma capacidade vence o mais próximo
+        distances = haversine_matrix(zone_geometry(zones).centroids,
+                                     resource_coordinates(sorted_resources), dtype=np.float32)
+        # Sem localização, a distância é infinita e o recurso nunca vence o desempate
+        distances[np.isnan(distances)] = np.inf
+        zone_rows = {zone.id: i for i, zone in enumerate(zones)}
+        columns = list(range(len(sorted_resources)))
+        
         # Inicializar dicionário de alocação
         allocation = {zone.id: [] for zone in zones}
+        self.allocation_history.start_run()
         
         # Alocar recursos para cada zona
-        for zone in sorted_zones:
+        for zone_index in zone_order:
+            if not sorted_resources:
+                break
+            zone = zones[zone_index]
             remaining_capacity = zone.population  # Capacidade necessária baseada na população
+            zone_distances = distances[zone_rows[zone.id]]
             
             while remaining_capacity > 0 and sorted_resources:
                 # Encontrar o melhor recurso disponível
@@ -36,31 +56,38 @@ class ResourceAllocator:
                 best_resource_index = -1
                 
                 for i, resource in enumerate(sorted_resources):
-                    if resource.capacity <= remaining_capacity and not resource.assigned_zones:
-                        best_resource = resource
-                        best_resource_index = i
+                    if best_resource is not None and resource.capacity < best_resource.capacity:
                         break
+                    if (resource.capacity <= remaining_capacity and resource.is_available
+                            and not resource.assigned_zones):
+                        if (best_resource is None or
+                                zone_distances[columns[i]] < zone_distances[columns[best_resource_index]]):
+                            best_resource = resource
+                            best_resource_index = i
                 
                 if best_resource is None:
                     break
                 
                 # Alocar o recurso
+                # Zonas e recursos guardam apenas IDs uns dos outros, evitando ciclos de referência
                 allocation[zone.id].append(best_resource)
-                best_resource.assigned_zones.append(zone)
-                zone.resources_allocated.append(best_resource)
+                best_resource.assign_to_zone(zone.id)
+                zone.add_resource(best_resource.id)
                 remaining_capacity -= best_resource.capacity
                 
                 # Remover recurso da lista de disponíveis
                 sorted_resources.pop(best_resource_index)
+                columns.pop(best_resource_index)
                 
                 # Registrar alocação no histórico
-                self.allocation_history.append({
-                    'zone_id': zone.id,
-                    'zone_name': zone.name,
-                    'resource_id': best_resource.id,
-                    'resource_type': best_resource.type,
-                    'capacity_allocated': best_resource.capacity
-                })
+                self.allocation_history.append(
+                    zone_id=zone.id,
+                    zone_name=zone.name,
+                    resource_id=best_resource.id,
+                    resource_type=best_resource.type,
+                    priority_score=zone.priority_score,
+                    capacity_allocated=best_resource.capacity
+                )
         
         return allocation
 
@@ -71,7 +98,7 @@ class ResourceAllocator:
         Returns:
             Lista de dicionários com informações sobre cada alocação
         """
-        return self.allocation_history
+        return list(self.allocation_history)
 
     def calculate_allocation_metrics(self, zones: List[Zone], resources: List[Resource]) -> Dict:
         """
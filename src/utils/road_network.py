@@ -0,0 +1,291 @@
+import heapq
+import json
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Hashable, List, Optional, Tuple, Union
+import numpy as np
+from src.models.zone import Zone
+from src.models.resource import Resource
+from src.utils.distance import haversine_pairwise
+from src.utils.geometry import project_lonlat, resource_coordinates, zone_geometry
+
+# Velocidade (km/h) por tipo de via do OSM; vias "*_link" usam a velocidade da via principal
+DEFAULT_SPEEDS_KMH = {
+    'motorway': 100, 'trunk': 80, 'primary': 60, 'secondary': 50, 'tertiary': 40,
+    'unclassified': 30, 'residential': 30, 'service': 20, 'living_street': 10,
+    'road': 30, 'track': 15
+}
+DEFAULT_SPEED_KMH = 30
+
+# Tipos de via implicitamente de mão única
+IMPLIED_ONEWAY = {'motorway'}
+
+
+@dataclass
+class RoadNetwork:
+    """
+    Malha viária em formato CSR: as arestas que saem do nó i estão em
+    indices[indptr[i]:indptr[i + 1]], com pesos em minutos de viagem.
+    """
+    # Longitude/latitude de cada nó, forma (n, 2)
+    lonlat: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    # Tempo de viagem (minutos) e comprimento (km) de cada aresta
+    weights: np.ndarray
+    lengths_km: np.ndarray
+    # IDs de origem (OSM) dos nós, ou sequenciais para GeoJSON
+    node_ids: np.ndarray
+    _index: Optional[object] = field(default=None, init=False, repr=False)
+    _lists: Optional[Tuple[List, List, List]] = field(default=None, init=False, repr=False)
+    _reference: Tuple[float, float] = field(default=(0.0, 0.0), init=False, repr=False)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.lonlat)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.indices)
+
+    def edge_length(self, source: int, target: int) -> float:
+        start, stop = self.indptr[source], self.indptr[source + 1]
+        position = start + int(np.flatnonzero(self.indices[start:stop] == target)[0])
+        return float(self.lengths_km[position])
+
+    def snap(self, lonlat: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Nó da malha mais próximo de cada ponto, por índice espacial (k-d tree).
+
+        Returns:
+            Tupla com os índices dos nós e as distâncias em metros
+        """
+        from scipy.spatial import cKDTree
+
+        if self._index is None:
+            self._reference = (float(self.lonlat[:, 0].mean()), float(self.lonlat[:, 1].mean()))
+            self._index = cKDTree(project_lonlat(self.lonlat, self._reference))
+        points = project_lonlat(lonlat, self._reference)
+        valid = ~np.isnan(points).any(axis=1)
+        nodes = np.full(len(points), -1, dtype=np.int64)
+        distances = np.full(len(points), np.inf)
+        if valid.any():
+            distances[valid], nodes[valid] = self._index.query(points[valid])
+        return nodes, distances
+
+    def snap_zones(self, zones: List[Zone]) -> Dict[str, int]:
+        geometry = zone_geometry(zones)
+        nodes, _ = self.snap(geometry.centroids)
+        return {zone_id: int(node) for zone_id, node in zip(geometry.ids, nodes) if node >= 0}
+
+    def snap_resources(self, resources: List[Resource]) -> Dict[str, int]:
+        nodes, _ = self.snap(resource_coordinates(resources))
+        return {resource.id: int(node) for resource, node in zip(resources, nodes) if node >= 0}
+
+    def dijkstra(self, source: int, target: int) -> Tuple[float, List[int]]:
+        """Dijkstra simples entre dois nós (referência para a hierarquia de contração)."""
+        if self._lists is None:
+            # Listas Python são bem mais rápidas que arrays numpy para acesso item a item
+            self._lists = (self.indptr.tolist(), self.indices.tolist(), self.weights.tolist())
+        indptr, indices, weights = self._lists
+        dist = {source: 0.0}
+        parent = {source: -1}
+        heap = [(0.0, source)]
+        while heap:
+            d, node = heapq.heappop(heap)
+            if node == target:
+                path = [node]
+                while parent[path[-1]] >= 0:
+                    path.append(parent[path[-1]])
+                return d, path[::-1]
+            if d > dist[node]:
+                continue
+            for position in range(indptr[node], indptr[node + 1]):
+                neighbor = indices[position]
+                candidate = d + weights[position]
+                if candidate < dist.get(neighbor, np.inf):
+                    dist[neighbor] = candidate
+                    parent[neighbor] = node
+                    heapq.heappush(heap, (candidate, neighbor))
+        return np.inf, []
+
+    def save(self, path: Union[str, Path]) -> None:
+        np.savez(path, lonlat=self.lonlat, indptr=self.indptr, indices=self.indices,
+                 weights=self.weights, lengths_km=self.lengths_km, node_ids=self.node_ids)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'RoadNetwork':
+        with np.load(path) as data:
+            return cls(**{name: data[name] for name in data.files})
+
+
+def load_road_network(path: Union[str, Path]) -> RoadNetwork:
+    """
+    Lê uma malha viária local: OSM PBF (requer o pacote opcional `osmium`),
+    OSM XML (.osm/.xml) ou GeoJSON com LineStrings.
+    """
+    path = Path(path)
+    name = path.name.lower()
+    if name.endswith('.pbf'):
+        return load_osm_pbf(path)
+    if name.endswith(('.osm', '.xml')):
+        return load_osm_xml(path)
+    if name.endswith(('.geojson', '.json')):
+        return load_geojson(path)
+    if name.endswith('.npz'):
+        return RoadNetwork.load(path)
+    raise ValueError(f"Formato de malha viária não suportado: {path.name}")
+
+
+def load_geojson(path: Union[str, Path]) -> RoadNetwork:
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+
+    builder = _NetworkBuilder()
+    for feature in data.get('features', []):
+        geometry = feature.get('geometry') or {}
+        properties = feature.get('properties') or {}
+        if geometry.get('type') == 'LineString':
+            lines = [geometry['coordinates']]
+        elif geometry.get('type') == 'MultiLineString':
+            lines = geometry['coordinates']
+        else:
+            continue
+        for line in lines:
+            # Vértices com as mesmas coordenadas são o mesmo nó (cruzamentos)
+            keys = [(round(x, 7), round(y, 7)) for x, y, *_ in line]
+            for key in keys:
+                builder.add_node(key, key[0], key[1])
+            builder.add_way(keys, properties)
+    return builder.build()
+
+
+def load_osm_xml(path: Union[str, Path]) -> RoadNetwork:
+    builder = _NetworkBuilder()
+    coordinates = {}
+    for _, element in ET.iterparse(path, events=('end',)):
+        if element.tag == 'node':
+            coordinates[int(element.get('id'))] = (float(element.get('lon')), float(element.get('lat')))
+            element.clear()
+        elif element.tag == 'way':
+            tags = {tag.get('k'): tag.get('v') for tag in element.iter('tag')}
+            if 'highway' in tags:
+                refs = [int(nd.get('ref')) for nd in element.iter('nd')]
+                refs = [ref for ref in refs if ref in coordinates]
+                for ref in refs:
+                    builder.add_node(ref, *coordinates[ref])
+                builder.add_way(refs, tags)
+            element.clear()
+    return builder.build()
+
+
+def load_osm_pbf(path: Union[str, Path]) -> RoadNetwork:
+    try:
+        import osmium
+    except ImportError:
+        raise ImportError("Leitura de OSM PBF requer o pacote opcional 'osmium' (pip install osmium)")
+
+    builder = _NetworkBuilder()
+
+    class WayHandler(osmium.SimpleHandler):
+        def way(self, way):
+            tags = {tag.k: tag.v for tag in way.tags}
+            if 'highway' not in tags:
+                return
+            refs = []
+            for node in way.nodes:
+                if node.location.valid():
+                    builder.add_node(node.ref, node.location.lon, node.location.lat)
+                    refs.append(node.ref)
+            builder.add_way(refs, tags)
+
+    WayHandler().apply_file(str(path), locations=True)
+    return builder.build()
+
+
+def way_speed_kmh(tags: Dict) -> float:
+    maxspeed = re.match(r'\s*(\d+(?:\.\d+)?)\s*(mph)?', str(tags.get('maxspeed', '')))
+    if maxspeed:
+        speed = float(maxspeed.group(1))
+        return speed * 1.609344 if maxspeed.group(2) else speed
+    highway = str(tags.get('highway', '')).removesuffix('_link')
+    return DEFAULT_SPEEDS_KMH.get(highway, DEFAULT_SPEED_KMH)
+
+
+def _oneway(tags: Dict) -> int:
+    # 1: sentido da geometria, -1: sentido inverso, 0: mão dupla
+    value = str(tags.get('oneway', '')).lower()
+    if value in ('yes', 'true', '1'):
+        return 1
+    if value == '-1':
+        return -1
+    if value == 'no':
+        return 0
+    if tags.get('junction') == 'roundabout' or tags.get('highway') in IMPLIED_ONEWAY:
+        return 1
+    return 0
+
+
+class _NetworkBuilder:
+    def __init__(self):
+        self._nodes: Dict[Hashable, int] = {}
+        self._lonlat: List[Tuple[float, float]] = []
+        self._node_ids: List = []
+        self._sources: List[int] = []
+        self._targets: List[int] = []
+        self._speeds: List[float] = []
+
+    def add_node(self, key: Hashable, lon: float, lat: float) -> None:
+        if key not in self._nodes:
+            self._nodes[key] = len(self._lonlat)
+            self._lonlat.append((lon, lat))
+            self._node_ids.append(key if isinstance(key, int) else len(self._node_ids))
+
+    def add_way(self, keys: List[Hashable], tags: Dict) -> None:
+        nodes = [self._nodes[key] for key in keys]
+        speed = way_speed_kmh(tags)
+        direction = _oneway(tags)
+        for a, b in zip(nodes, nodes[1:]):
+            if a == b:
+                continue
+            if direction >= 0:
+                self._add_edge(a, b, speed)
+            if direction <= 0:
+                self._add_edge(b, a, speed)
+
+    def _add_edge(self, a: int, b: int, speed: float) -> None:
+        self._sources.append(a)
+        self._targets.append(b)
+        self._speeds.append(speed)
+
+    def build(self) -> RoadNetwork:
+        lonlat = np.asarray(self._lonlat, dtype=np.float64).reshape(-1, 2)
+        sources = np.asarray(self._sources, dtype=np.int64)
+        targets = np.asarray(self._targets, dtype=np.int64)
+        lengths = haversine_pairwise(lonlat[sources], lonlat[targets]) if len(sources) else np.empty(0)
+        minutes = lengths / np.asarray(self._speeds, dtype=np.float64) * 60.0 if len(sources) else np.empty(0)
+        return _csr(lonlat, np.asarray(self._node_ids, dtype=np.int64), sources, targets, minutes, lengths)
+
+
+def _csr(lonlat: np.ndarray, node_ids: np.ndarray, sources: np.ndarray, targets: np.ndarray,
+         weights: np.ndarray, lengths: np.ndarray) -> RoadNetwork:
+    # Arestas paralelas: fica a de menor tempo de viagem
+    order = np.lexsort((weights, targets, sources))
+    sources, targets = sources[order], targets[order]
+    weights, lengths = weights[order], lengths[order]
+    keep = np.ones(len(sources), dtype=bool)
+    keep[1:] = (sources[1:] != sources[:-1]) | (targets[1:] != targets[:-1])
+    sources, targets = sources[keep], targets[keep]
+
+    indptr = np.zeros(len(lonlat) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=len(lonlat)), out=indptr[1:])
+    return RoadNetwork(
+        lonlat=lonlat,
+        indptr=indptr,
+        indices=targets.astype(np.int32),
+        weights=weights[keep].astype(np.float32),
+        lengths_km=lengths[keep].astype(np.float32),
+        node_ids=node_ids
+    )
@@ -0,0 +1,277 @@
+import dataclasses
+import hashlib
+import pickle
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from operator import attrgetter
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+import shapely
+from src.models.zone import Zone
+from src.models.resource import Resource
+
+# Teto padrão de memória dos cenários em cache (bytes residentes estimados)
+SCENARIO_CACHE_BYTES = 512 * 1024 * 1024
+
+# Objetos medidos com sys.getsizeof por lista; o restante é extrapolado pela média
+SIZE_SAMPLE = 256
+
+# Memória de uma geometria no GEOS, fora do heap do Python: custo fixo mais x, y, z (double)
+# por coordenada; medido pelo RSS com pontos, retângulos e polígonos de 33 vértices
+GEOS_GEOMETRY_BYTES = 160
+GEOS_COORDINATE_BYTES = 24
+
+# Atributos que definem o conteúdo de zonas e recursos (geometrias à parte, em WKB)
+_zone_attributes = attrgetter(*(field.name for field in dataclasses.fields(Zone) if field.name != 'geometry'))
+_resource_attributes = attrgetter(*(field.name for field in dataclasses.fields(Resource) if field.name != 'location'))
+
+
+@dataclasses.dataclass(frozen=True)
+class ScenarioView:
+    """
+    Cenário compartilhado entre sessões, somente leitura: tuplas em vez de listas e
+    plano em `MappingProxyType`. Os objetos `Zone` e `Resource` também são
+    compartilhados e não devem ser alterados; use `ScenarioLease.edit` para obter
+    cópias próprias.
+    """
+    key: str
+    zones: Tuple[Zone, ...]
+    resources: Tuple[Resource, ...]
+    plan: Optional[Mapping[str, Tuple[str, ...]]]
+    nbytes: int
+
+
+class ScenarioLease:
+    """
+    Referência de uma sessão a um cenário do cache. Enquanto houver referências, o
+    cenário não é descartado; a referência é liberada por `release`, por `edit` ou
+    quando a sessão (e com ela o objeto) deixa de existir.
+    """
+
+    def __init__(self, cache: 'ScenarioCache', view: ScenarioView):
+        self.view = view
+        self._cache = cache
+        self._finalizer = weakref.finalize(self, cache._release, view.key)
+
+    @property
+    def zones(self) -> Tuple[Zone, ...]:
+        return self.view.zones
+
+    @property
+    def resources(self) -> Tuple[Resource, ...]:
+        return self.view.resources
+
+    @property
+    def plan(self) -> Optional[Mapping[str, Tuple[str, ...]]]:
+        return self.view.plan
+
+    @property
+    def active(self) -> bool:
+        return self._finalizer.alive
+
+    def release(self) -> None:
+        self._finalizer()
+
+    def edit(self) -> Tuple[List[Zone], List[Resource], Optional[Dict[str, List[str]]]]:
+        """
+        Copy-on-write: cópias próprias de zonas, recursos e plano para a sessão alterar.
+        A referência ao cenário compartilhado é liberada.
+        """
+        zones, resources, plan = copy_scenario(self.view)
+        self._cache._copied()
+        self.release()
+        return zones, resources, plan
+
+
+class ScenarioCache:
+    """
+    Cenários compartilhados entre todas as sessões do processo, deduplicados pelo hash
+    do conteúdo.
+
+    Sessões que abrem o mesmo cenário (mesmas zonas, recursos e plano) recebem a mesma
+    `ScenarioView`, então a memória não cresce com o número de usuários. Cada sessão
+    segura um `ScenarioLease`; cenários sem referências continuam em cache para a
+    próxima sessão até que a memória estimada (`scenario_nbytes`) passe de
+    `max_bytes`, quando os menos usados recentemente são descartados. Cenários em uso
+    nunca são descartados, então `max_bytes` limita a memória dos cenários ociosos
+    retidos além dos que as sessões abertas usam.
+    """
+
+    def __init__(self, max_bytes: int = SCENARIO_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        # finalizadores de ScenarioLease podem rodar dentro de uma seção com o lock
+        self._lock = threading.RLock()
+        self._entries: 'OrderedDict[str, ScenarioView]' = OrderedDict()
+        self._refs: Dict[str, int] = {}
+        self.bytes_held = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.copies = 0
+
+    def acquire(self, zones: Sequence[Zone], resources: Sequence[Resource],
+                plan: Optional[Mapping[str, Sequence[str]]] = None) -> ScenarioLease:
+        """
+        Referência ao cenário com este conteúdo, criando-o se ainda não estiver em cache.
+
+        Em uma falha os objetos informados passam a pertencer ao cache (sem cópia) e não
+        devem mais ser alterados pelo chamador; em um acerto são descartados e a sessão
+        passa a usar os objetos já compartilhados.
+        """
+        key = scenario_key(zones, resources, plan)
+        with self._lock:
+            view = self._entries.get(key)
+            if view is None:
+                self.misses += 1
+                nbytes = scenario_nbytes(zones, resources, plan)
+                view = ScenarioView(
+                    key=key,
+                    zones=tuple(zones),
+                    resources=tuple(resources),
+                    plan=None if plan is None else MappingProxyType(
+                        {zone_id: tuple(resource_ids) for zone_id, resource_ids in plan.items()}
+                    ),
+                    nbytes=nbytes
+                )
+                self._entries[key] = view
+                self.bytes_held += nbytes
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            self._refs[key] = self._refs.get(key, 0) + 1
+            lease = ScenarioLease(self, view)
+            self._evict()
+        return lease
+
+    def resize(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'active': sum(1 for refs in self._refs.values() if refs > 0),
+                'leases': sum(self._refs.values()),
+                'bytes_held': self.bytes_held,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'copies': self.copies,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    def clear(self) -> None:
+        """Descarta os cenários sem referências."""
+        with self._lock:
+            for key in [key for key in self._entries if not self._refs.get(key)]:
+                self._discard(key)
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            refs = self._refs.get(key, 0) - 1
+            if refs > 0:
+                self._refs[key] = refs
+            else:
+                self._refs.pop(key, None)
+            self._evict()
+
+    def _copied(self) -> None:
+        with self._lock:
+            self.copies += 1
+
+    def _evict(self) -> None:
+        if self.bytes_held <= self.max_bytes:
+            return
+        for key in [key for key in self._entries if not self._refs.get(key)]:
+            if self.bytes_held <= self.max_bytes:
+                break
+            if self._discard(key):
+                self.evictions += 1
+
+    def _discard(self, key: str) -> bool:
+        # Um finalizador pode ter descartado a entrada no meio de uma varredura
+        view = self._entries.pop(key, None)
+        if view is None:
+            return False
+        self.bytes_held -= view.nbytes
+        return True
+
+
+def scenario_key(zones: Sequence[Zone], resources: Sequence[Resource],
+                 plan: Optional[Mapping[str, Sequence[str]]] = None) -> str:
+    """
+    Hash do conteúdo do cenário.
+
+    Todos os atributos de zonas e recursos entram no hash, inclusive as alocações;
+    geometrias entram pelo WKB.
+    """
+    payload = pickle.dumps((
+        [_zone_attributes(zone) for zone in zones],
+        _wkb([zone.geometry for zone in zones]),
+        [_resource_attributes(resource) for resource in resources],
+        _wkb([resource.location for resource in resources]),
+        None if plan is None else sorted((zone_id, tuple(resource_ids)) for zone_id, resource_ids in plan.items())
+    ), protocol=pickle.HIGHEST_PROTOCOL)
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def scenario_nbytes(zones: Sequence[Zone], resources: Sequence[Resource],
+                    plan: Optional[Mapping[str, Sequence[str]]] = None) -> int:
+    """
+    Memória residente estimada do cenário em cache, em bytes.
+
+    Objetos Python (zonas, recursos, seus atributos e dicionários de alocação) são
+    medidos com `sys.getsizeof` em até SIZE_SAMPLE itens de cada lista e extrapolados;
+    as geometrias somam o objeto do shapely e as coordenadas guardadas no GEOS.
+    """
+    total = _objects_nbytes(zones) + _objects_nbytes(resources)
+    geometries = _geometry_array([zone.geometry for zone in zones] + [r.location for r in resources])
+    present = ~shapely.is_missing(geometries)
+    total += int(np.count_nonzero(present)) * GEOS_GEOMETRY_BYTES
+    total += int(shapely.get_num_coordinates(geometries[present]).sum()) * GEOS_COORDINATE_BYTES
+    if plan is not None:
+        total += sys.getsizeof(plan) + sum(sys.getsizeof(ids) for ids in plan.values())
+    return total
+
+
+def copy_scenario(view: ScenarioView) -> Tuple[List[Zone], List[Resource], Optional[Dict[str, List[str]]]]:
+    """Cópias rasas e independentes: alocações e atributos podem mudar sem afetar a visão."""
+    # dataclasses.replace passa por __post_init__, que copia os dicionários de alocação;
+    # geometrias do shapely são imutáveis e continuam compartilhadas
+    zones = [dataclasses.replace(zone) for zone in view.zones]
+    resources = [dataclasses.replace(resource) for resource in view.resources]
+    plan = None if view.plan is None else {zone_id: list(ids) for zone_id, ids in view.plan.items()}
+    return zones, resources, plan
+
+
+def _objects_nbytes(items: Sequence) -> int:
+    # Tupla da visão mais a média medida na amostra (objeto e atributos, com slots);
+    # a geometria no GEOS é contada à parte
+    if not items:
+        return sys.getsizeof(())
+    sample = items[::max(1, len(items) // SIZE_SAMPLE)][:SIZE_SAMPLE]
+    names = [field.name for field in dataclasses.fields(sample[0])]
+    measured = sum(sys.getsizeof(item) + sum(sys.getsizeof(getattr(item, name)) for name in names)
+                   for item in sample)
+    return sys.getsizeof(()) + len(items) * tuple.__itemsize__ + measured * len(items) // len(sample)
+
+
+def _geometry_array(geometries: List) -> np.ndarray:
+    array = np.empty(len(geometries), dtype=object)
+    array[:] = geometries
+    return array
+
+
+def _wkb(geometries: List) -> List[Optional[bytes]]:
+    return shapely.to_wkb(_geometry_array(geometries)).tolist()
+
+
+# Cache do processo, compartilhado por todas as páginas e sessões
+scenario_cache = ScenarioCache()
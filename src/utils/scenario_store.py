@@ -0,0 +1,448 @@
+import json
+import sqlite3
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+import shapely
+from src.models.zone import Zone
+from src.models.resource import Resource
+from src.models.history import AllocationHistory
+
+DEFAULT_STORE_PATH = Path("data") / "scenarios.db"
+
+# Colunas numéricas das zonas gravadas na tabela `zones`
+ZONE_COLUMNS = ('population', 'damage_level', 'infrastructure_damage', 'accessibility',
+                'critical_facilities', 'historical_risk', 'priority_score')
+
+# Colunas aceitas em `order_by`
+ZONE_ORDER_COLUMNS = ('priority_score', 'damage_level', 'population', 'name')
+
+# Caixa delimitadora em graus: (min_lon, min_lat, max_lon, max_lat)
+BBox = Tuple[float, float, float, float]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    created_at TEXT NOT NULL,
+    disaster_info TEXT
+);
+CREATE TABLE IF NOT EXISTS zones (
+    rowid INTEGER PRIMARY KEY,
+    scenario_id INTEGER NOT NULL REFERENCES scenarios(id) ON DELETE CASCADE,
+    zone_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    geometry BLOB NOT NULL,
+    population INTEGER NOT NULL,
+    damage_level REAL NOT NULL,
+    infrastructure_damage REAL NOT NULL,
+    accessibility REAL NOT NULL,
+    critical_facilities INTEGER NOT NULL,
+    historical_risk REAL NOT NULL,
+    priority_score REAL NOT NULL,
+    UNIQUE (scenario_id, zone_id)
+);
+CREATE INDEX IF NOT EXISTS zones_priority ON zones (scenario_id, priority_score DESC);
+CREATE INDEX IF NOT EXISTS zones_damage ON zones (scenario_id, damage_level);
+CREATE VIRTUAL TABLE IF NOT EXISTS zones_rtree USING rtree(rowid, min_lon, max_lon, min_lat, max_lat);
+CREATE TABLE IF NOT EXISTS resources (
+    rowid INTEGER PRIMARY KEY,
+    scenario_id INTEGER NOT NULL REFERENCES scenarios(id) ON DELETE CASCADE,
+    resource_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    capacity INTEGER NOT NULL,
+    lon REAL,
+    lat REAL,
+    is_available INTEGER NOT NULL,
+    UNIQUE (scenario_id, resource_id)
+);
+CREATE INDEX IF NOT EXISTS resources_type ON resources (scenario_id, type);
+CREATE VIRTUAL TABLE IF NOT EXISTS resources_rtree USING rtree(rowid, min_lon, max_lon, min_lat, max_lat);
+CREATE TABLE IF NOT EXISTS allocations (
+    scenario_id INTEGER NOT NULL REFERENCES scenarios(id) ON DELETE CASCADE,
+    run INTEGER NOT NULL,
+    zone_id TEXT NOT NULL,
+    resource_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS allocations_run ON allocations (scenario_id, run, zone_id);
+CREATE TABLE IF NOT EXISTS history (
+    scenario_id INTEGER NOT NULL REFERENCES scenarios(id) ON DELETE CASCADE,
+    run INTEGER NOT NULL,
+    zone_id TEXT NOT NULL,
+    zone_name TEXT NOT NULL,
+    resource_id TEXT NOT NULL,
+    resource_type TEXT NOT NULL,
+    priority_score REAL NOT NULL,
+    capacity_allocated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_zone ON history (scenario_id, zone_id);
+"""
+
+
+class ScenarioStore:
+    """
+    Cenários persistidos em SQLite: zonas, recursos, alocações e histórico em tabelas
+    indexadas, com índices espaciais R*Tree sobre a caixa delimitadora de cada zona
+    e a posição de cada recurso.
+
+    Filtros por região e por atributo são resolvidos no SQL, então as páginas leem
+    apenas as linhas que exibem. Gravações em lote usam `executemany` em uma única
+    transação. A conexão é compartilhada entre threads e protegida por um lock.
+    """
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_STORE_PATH):
+        self.path = path
+        if str(path) != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def __enter__(self) -> 'ScenarioStore':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # Cenários
+
+    def save_scenario(self, name: str, zones: List[Zone], resources: List[Resource],
+                      disaster_info: Optional[Dict] = None) -> int:
+        """
+        Grava um cenário completo, substituindo o anterior com o mesmo nome.
+
+        Returns:
+            ID do cenário
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM scenarios WHERE name = ?", (name,))
+            self._delete_orphans()
+            cursor = self._conn.execute(
+                "INSERT INTO scenarios (name, created_at, disaster_info) VALUES (?, ?, ?)",
+                (name, datetime.now().isoformat(timespec='seconds'), _dump_info(disaster_info))
+            )
+            scenario_id = cursor.lastrowid
+            self._insert_zones(scenario_id, zones)
+            self._insert_resources(scenario_id, resources)
+        return scenario_id
+
+    def delete_scenario(self, scenario_id: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM scenarios WHERE id = ?", (scenario_id,))
+            self._delete_orphans()
+
+    def list_scenarios(self) -> pd.DataFrame:
+        return self._frame("""
+            SELECT s.id, s.name, s.created_at,
+                   (SELECT COUNT(*) FROM zones z WHERE z.scenario_id = s.id) AS zones,
+                   (SELECT COUNT(*) FROM resources r WHERE r.scenario_id = s.id) AS resources
+            FROM scenarios s ORDER BY s.created_at DESC, s.id DESC
+        """)
+
+    def scenario_id(self, name: str) -> Optional[int]:
+        row = self._fetchone("SELECT id FROM scenarios WHERE name = ?", (name,))
+        return row[0] if row else None
+
+    def disaster_info(self, scenario_id: int) -> Optional[Dict]:
+        row = self._fetchone("SELECT disaster_info FROM scenarios WHERE id = ?", (scenario_id,))
+        return _load_info(row[0]) if row else None
+
+    # Zonas
+
+    def upsert_zones(self, scenario_id: int, zones: List[Zone]) -> None:
+        """Insere ou atualiza zonas (por exemplo, novas condições e prioridades)."""
+        with self._lock, self._conn:
+            self._insert_zones(scenario_id, zones)
+
+    def load_zones(self, scenario_id: int, bbox: Optional[BBox] = None, **filters) -> List[Zone]:
+        """
+        Zonas do cenário, filtradas no SQL.
+
+        Args:
+            scenario_id: ID do cenário
+            bbox: Apenas zonas cuja caixa delimitadora intersecta a região (R*Tree)
+            **filters: Mesmos filtros de `zone_frame` (min_priority, min_damage,
+                zone_ids, order_by, limit, offset)
+        """
+        frame = self.zone_frame(scenario_id, bbox, geometry=True, **filters)
+        geometries = shapely.from_wkb(frame['geometry'].to_numpy()) if len(frame) else []
+        return [
+            Zone(id=zone_id, name=name, geometry=geometry, population=int(population),
+                 damage_level=damage, infrastructure_damage=infrastructure, accessibility=accessibility,
+                 critical_facilities=int(facilities), historical_risk=risk, priority_score=priority)
+            for (zone_id, name, population, damage, infrastructure, accessibility, facilities, risk, priority), geometry
+            in zip(frame[['zone_id', 'name', *ZONE_COLUMNS]].itertuples(index=False, name=None), geometries)
+        ]
+
+    def zone_frame(self, scenario_id: int, bbox: Optional[BBox] = None, min_priority: Optional[float] = None,
+                   min_damage: Optional[float] = None, zone_ids: Optional[Sequence[str]] = None,
+                   order_by: Optional[str] = None, limit: Optional[int] = None, offset: int = 0,
+                   geometry: bool = False) -> pd.DataFrame:
+        """
+        Atributos das zonas como DataFrame, sem criar objetos `Zone`.
+
+        Args:
+            order_by: Coluna de ordenação (decrescente, exceto "name"), entre ZONE_ORDER_COLUMNS
+            limit: Máximo de linhas (paginação, com `offset`)
+            geometry: Inclui a geometria em WKB na coluna "geometry"
+        """
+        where, params = self._zone_filters(scenario_id, bbox, min_priority, min_damage, zone_ids)
+        columns = ", ".join(['z.zone_id', 'z.name', *(f"z.{c}" for c in ZONE_COLUMNS)]
+                            + (['z.geometry'] if geometry else []))
+        sql = f"SELECT {columns} FROM zones z{self._bbox_join('zones', bbox)} WHERE {where}"
+        if order_by is not None:
+            if order_by not in ZONE_ORDER_COLUMNS:
+                raise ValueError(f"Ordenação não suportada: {order_by}")
+            sql += f" ORDER BY z.{order_by}" + ("" if order_by == 'name' else " DESC")
+        else:
+            sql += " ORDER BY z.rowid"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        return self._frame(sql, params)
+
+    def count_zones(self, scenario_id: int, bbox: Optional[BBox] = None, min_priority: Optional[float] = None,
+                    min_damage: Optional[float] = None) -> int:
+        where, params = self._zone_filters(scenario_id, bbox, min_priority, min_damage, None)
+        return self._fetchone(f"SELECT COUNT(*) FROM zones z{self._bbox_join('zones', bbox)} WHERE {where}",
+                              params)[0]
+
+    def zone_summary(self, scenario_id: int) -> Dict[str, float]:
+        """Totais das zonas calculados no SQL."""
+        row = self._fetchone("""
+            SELECT COUNT(*), COALESCE(SUM(population), 0), COALESCE(AVG(damage_level), 0),
+                   COALESCE(AVG(priority_score), 0), COALESCE(MAX(priority_score), 0)
+            FROM zones WHERE scenario_id = ?
+        """, (scenario_id,))
+        return dict(zip(('zones', 'population', 'mean_damage', 'mean_priority', 'max_priority'), row))
+
+    # Recursos
+
+    def upsert_resources(self, scenario_id: int, resources: List[Resource]) -> None:
+        with self._lock, self._conn:
+            self._insert_resources(scenario_id, resources)
+
+    def load_resources(self, scenario_id: int, bbox: Optional[BBox] = None, resource_type: Optional[str] = None,
+                       available: Optional[bool] = None) -> List[Resource]:
+        frame = self.resource_frame(scenario_id, bbox, resource_type, available)
+        return [
+            Resource(id=resource_id, name=name, type=resource_type, capacity=int(capacity),
+                     location=shapely.Point(lon, lat) if not np.isnan(lon) else None,
+                     is_available=bool(is_available))
+            for resource_id, name, resource_type, capacity, lon, lat, is_available
+            in frame.itertuples(index=False, name=None)
+        ]
+
+    def resource_frame(self, scenario_id: int, bbox: Optional[BBox] = None, resource_type: Optional[str] = None,
+                       available: Optional[bool] = None) -> pd.DataFrame:
+        where, params = ["r.scenario_id = ?"], [scenario_id]
+        if bbox is not None:
+            where.append("t.min_lon <= ? AND t.max_lon >= ? AND t.min_lat <= ? AND t.max_lat >= ?")
+            params += [bbox[2], bbox[0], bbox[3], bbox[1]]
+        if resource_type is not None:
+            where.append("r.type = ?")
+            params.append(resource_type)
+        if available is not None:
+            where.append("r.is_available = ?")
+            params.append(int(available))
+        frame = self._frame(
+            "SELECT r.resource_id, r.name, r.type, r.capacity, r.lon, r.lat, r.is_available "
+            f"FROM resources r{self._bbox_join('resources', bbox, 'r')} WHERE {' AND '.join(where)} ORDER BY r.rowid",
+            params
+        )
+        frame[['lon', 'lat']] = frame[['lon', 'lat']].astype(np.float64)
+        return frame
+
+    # Alocações e histórico
+
+    def save_allocations(self, scenario_id: int, plan: Dict[str, Iterable[str]]) -> int:
+        """
+        Grava um plano {zona: [recursos]} como uma nova rodada.
+
+        Returns:
+            Número da rodada
+        """
+        with self._lock, self._conn:
+            run = self._fetchone("SELECT COALESCE(MAX(run), 0) + 1 FROM allocations WHERE scenario_id = ?",
+                                 (scenario_id,))[0]
+            self._conn.executemany(
+                "INSERT INTO allocations (scenario_id, run, zone_id, resource_id) VALUES (?, ?, ?, ?)",
+                ((scenario_id, run, zone_id, resource_id)
+                 for zone_id, resource_ids in plan.items() for resource_id in resource_ids)
+            )
+        return run
+
+    def load_allocations(self, scenario_id: int, run: Optional[int] = None,
+                         zone_ids: Optional[Sequence[str]] = None) -> Dict[str, List[str]]:
+        """Plano de uma rodada (a mais recente por padrão), opcionalmente só de algumas zonas."""
+        if run is None:
+            run = self._fetchone("SELECT MAX(run) FROM allocations WHERE scenario_id = ?", (scenario_id,))[0]
+            if run is None:
+                return {}
+        sql = "SELECT zone_id, resource_id FROM allocations WHERE scenario_id = ? AND run = ?"
+        params = [scenario_id, run]
+        if zone_ids is not None:
+            sql += f" AND zone_id IN ({_placeholders(zone_ids)})"
+            params += list(zone_ids)
+        plan: Dict[str, List[str]] = {}
+        for zone_id, resource_id in self._fetchall(sql, params):
+            plan.setdefault(zone_id, []).append(resource_id)
+        return plan
+
+    def append_history(self, scenario_id: int, history: Union[AllocationHistory, Iterable[Dict]]) -> int:
+        """
+        Acrescenta linhas de histórico (no formato de `AllocationHistory`).
+
+        Returns:
+            Número de linhas gravadas
+        """
+        columns = ('run', 'zone_id', 'zone_name', 'resource_id', 'resource_type',
+                   'priority_score', 'capacity_allocated')
+        rows = [(scenario_id, *(row[c] for c in columns)) for row in history]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO history (scenario_id, {', '.join(columns)}) VALUES (?{', ?' * len(columns)})", rows
+            )
+        return len(rows)
+
+    def history_frame(self, scenario_id: int, zone_id: Optional[str] = None,
+                      limit: Optional[int] = None) -> pd.DataFrame:
+        sql = ("SELECT run, zone_id, zone_name, resource_id, resource_type, priority_score, capacity_allocated "
+               "FROM history WHERE scenario_id = ?")
+        params: List = [scenario_id]
+        if zone_id is not None:
+            sql += " AND zone_id = ?"
+            params.append(zone_id)
+        sql += " ORDER BY rowid DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._frame(sql, params)
+
+    # Auxiliares
+
+    def _insert_zones(self, scenario_id: int, zones: List[Zone]) -> None:
+        if not zones:
+            return
+        geometries = np.array([zone.geometry for zone in zones], dtype=object)
+        wkb = shapely.to_wkb(geometries)
+        bounds = shapely.bounds(geometries).tolist()
+        self._conn.executemany(f"""
+            INSERT INTO zones (scenario_id, zone_id, name, geometry, {', '.join(ZONE_COLUMNS)})
+            VALUES (?, ?, ?, ?{', ?' * len(ZONE_COLUMNS)})
+            ON CONFLICT (scenario_id, zone_id) DO UPDATE SET
+                name = excluded.name, geometry = excluded.geometry,
+                {', '.join(f'{c} = excluded.{c}' for c in ZONE_COLUMNS)}
+        """, ((scenario_id, zone.id, zone.name, blob, int(zone.population), float(zone.damage_level),
+               float(zone.infrastructure_damage), float(zone.accessibility), int(zone.critical_facilities),
+               float(zone.historical_risk), float(zone.priority_score))
+              for zone, blob in zip(zones, wkb)))
+        self._index_rows('zones', 'zone_id', scenario_id, [zone.id for zone in zones],
+                         [(minx, maxx, miny, maxy) for minx, miny, maxx, maxy in bounds])
+
+    def _insert_resources(self, scenario_id: int, resources: List[Resource]) -> None:
+        if not resources:
+            return
+        coordinates = [(r.location.x, r.location.y) if r.location is not None else (None, None) for r in resources]
+        self._conn.executemany("""
+            INSERT INTO resources (scenario_id, resource_id, name, type, capacity, lon, lat, is_available)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (scenario_id, resource_id) DO UPDATE SET
+                name = excluded.name, type = excluded.type, capacity = excluded.capacity,
+                lon = excluded.lon, lat = excluded.lat, is_available = excluded.is_available
+        """, ((scenario_id, r.id, r.name, r.type, int(r.capacity), lon, lat, int(r.is_available))
+              for r, (lon, lat) in zip(resources, coordinates)))
+        located = [(r.id, (lon, lon, lat, lat)) for r, (lon, lat) in zip(resources, coordinates) if lon is not None]
+        self._conn.execute(
+            "DELETE FROM resources_rtree WHERE rowid IN "
+            "(SELECT rowid FROM resources WHERE scenario_id = ? AND lon IS NULL)", (scenario_id,)
+        )
+        self._index_rows('resources', 'resource_id', scenario_id,
+                         [resource_id for resource_id, _ in located], [box for _, box in located])
+
+    def _index_rows(self, table: str, id_column: str, scenario_id: int, ids: List[str],
+                    boxes: List[Tuple[float, float, float, float]]) -> None:
+        # rowid da tabela principal em uma consulta só, via tabela temporária
+        self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS _boxes "
+                           "(item_id TEXT PRIMARY KEY, min_lon, max_lon, min_lat, max_lat)")
+        self._conn.execute("DELETE FROM _boxes")
+        self._conn.executemany("INSERT OR REPLACE INTO _boxes VALUES (?, ?, ?, ?, ?)",
+                               ((item_id, *box) for item_id, box in zip(ids, boxes)))
+        self._conn.execute(f"""
+            INSERT OR REPLACE INTO {table}_rtree (rowid, min_lon, max_lon, min_lat, max_lat)
+            SELECT t.rowid, b.min_lon, b.max_lon, b.min_lat, b.max_lat
+            FROM _boxes b JOIN {table} t ON t.scenario_id = ? AND t.{id_column} = b.item_id
+        """, (scenario_id,))
+
+    def _delete_orphans(self) -> None:
+        # Tabelas virtuais não participam de chaves estrangeiras
+        for table in ('zones', 'resources'):
+            self._conn.execute(f"DELETE FROM {table}_rtree WHERE rowid NOT IN (SELECT rowid FROM {table})")
+
+    @staticmethod
+    def _bbox_join(table: str, bbox: Optional[BBox], alias: str = 'z') -> str:
+        return f" JOIN {table}_rtree t ON t.rowid = {alias}.rowid" if bbox is not None else ""
+
+    @staticmethod
+    def _zone_filters(scenario_id: int, bbox: Optional[BBox], min_priority: Optional[float],
+                      min_damage: Optional[float], zone_ids: Optional[Sequence[str]]) -> Tuple[str, List]:
+        where, params = ["z.scenario_id = ?"], [scenario_id]
+        if bbox is not None:
+            # Caixas que se intersectam com a região consultada
+            where.append("t.min_lon <= ? AND t.max_lon >= ? AND t.min_lat <= ? AND t.max_lat >= ?")
+            params += [bbox[2], bbox[0], bbox[3], bbox[1]]
+        if min_priority is not None:
+            where.append("z.priority_score >= ?")
+            params.append(min_priority)
+        if min_damage is not None:
+            where.append("z.damage_level >= ?")
+            params.append(min_damage)
+        if zone_ids is not None:
+            where.append(f"z.zone_id IN ({_placeholders(zone_ids)})")
+            params += list(zone_ids)
+        return " AND ".join(where), params
+
+    def _frame(self, sql: str, params: Sequence = ()) -> pd.DataFrame:
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            columns = [d[0] for d in cursor.description]
+            return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+    def _fetchone(self, sql: str, params: Sequence = ()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def _fetchall(self, sql: str, params: Sequence = ()) -> List:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+
+def _placeholders(values: Sequence) -> str:
+    return ", ".join("?" * len(values))
+
+
+def _dump_info(info: Optional[Dict]) -> Optional[str]:
+    if info is None:
+        return None
+    return json.dumps(info, default=lambda value: value.isoformat() if isinstance(value, (date, datetime)) else str(value))
+
+
+def _load_info(text: Optional[str]) -> Optional[Dict]:
+    if text is None:
+        return None
+    info = json.loads(text)
+    if isinstance(info.get('date'), str):
+        info['date'] = date.fromisoformat(info['date'])
+    return info
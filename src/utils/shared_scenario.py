@@ -0,0 +1,170 @@
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from src.models.zone import Zone
+from src.models.resource import Resource
+
+ZONE_FIELDS = {
+    'population': np.int64,
+    'damage_level': np.float64,
+    'infrastructure_damage': np.float64,
+    'accessibility': np.float64,
+    'critical_facilities': np.int64,
+    'historical_risk': np.float64,
+    'priority_score': np.float64,
+}
+RESOURCE_FIELDS = {
+    'capacity': np.int64,
+    'is_available': np.bool_,
+}
+
+
+class SharedScenario:
+    """
+    Arrays numéricos de um cenário em um único bloco de `multiprocessing.shared_memory`.
+
+    O processo principal cria o bloco; os processos de trabalho recebem apenas `spec`
+    (nome do bloco, deslocamentos e IDs) e acessam os arrays sem cópia nem pickling.
+    Use como gerenciador de contexto para liberar o bloco ao final.
+    """
+
+    def __init__(self, zones: List[Zone], resources: List[Resource],
+                 extra: Optional[Dict[str, np.ndarray]] = None):
+        columns = {f"zone.{name}": np.asarray([getattr(z, name) for z in zones], dtype=dtype)
+                   for name, dtype in ZONE_FIELDS.items()}
+        columns.update({f"resource.{name}": np.asarray([getattr(r, name) for r in resources], dtype=dtype)
+                        for name, dtype in RESOURCE_FIELDS.items()})
+        # Arrays adicionais por zona ou recurso, acessíveis como "extra.<nome>"
+        columns.update({f"extra.{name}": np.ascontiguousarray(values) for name, values in (extra or {}).items()})
+
+        layout = {}
+        offset = 0
+        for name, values in columns.items():
+            # Alinhamento de 8 bytes para todos os tipos
+            offset = (offset + 7) // 8 * 8
+            layout[name] = (offset, values.shape, values.dtype.str)
+            offset += values.nbytes
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for name, values in columns.items():
+            start, shape, dtype = layout[name]
+            np.ndarray(shape, dtype=dtype, buffer=self._shm.buf, offset=start)[...] = values
+
+        self.spec = {
+            'shm_name': self._shm.name,
+            'layout': layout,
+            'zone_ids': [z.id for z in zones],
+            'zone_names': [z.name for z in zones],
+            'resource_ids': [r.id for r in resources],
+            'resource_names': [r.name for r in resources],
+            'resource_types': [r.type for r in resources],
+        }
+
+    def __enter__(self) -> 'SharedScenario':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+def attach_shared_scenario(spec: Dict) -> Tuple[shared_memory.SharedMemory, Dict[str, np.ndarray]]:
+    """
+    Acessa o bloco compartilhado descrito por `spec` em outro processo.
+
+    Args:
+        spec: Descrição produzida por `SharedScenario.spec`
+
+    Returns:
+        Tupla com o bloco (mantenha a referência enquanto usar os arrays) e
+        os arrays somente leitura indexados por "zone.<campo>"/"resource.<campo>"
+    """
+    shm = shared_memory.SharedMemory(name=spec['shm_name'])
+    arrays = {}
+    for name, (offset, shape, dtype) in spec['layout'].items():
+        array = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+        array.flags.writeable = False
+        arrays[name] = array
+    return shm, arrays
+
+
+# Cenário acessado pelo processo de trabalho atual (ver init_worker_scenario)
+_worker_scenario: Dict = {}
+
+
+def init_worker_scenario(spec: Dict) -> None:
+    """Inicializador de pool: acessa o bloco compartilhado uma vez por processo."""
+    shm, arrays = attach_shared_scenario(spec)
+    _worker_scenario.update(shm=shm, spec=spec, arrays=arrays)
+
+
+def worker_scenario() -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """Retorna `spec` e os arrays do cenário acessado por `init_worker_scenario`."""
+    return _worker_scenario['spec'], _worker_scenario['arrays']
+
+
+def release_worker_scenario() -> None:
+    shm = _worker_scenario.pop('shm', None)
+    _worker_scenario.clear()
+    if shm is not None:
+        shm.close()
+
+
+def build_scenario_objects(spec: Dict, arrays: Dict[str, np.ndarray],
+                           geometry: Optional[object] = None) -> Tuple[List[Zone], List[Resource]]:
+    """
+    Recria zonas e recursos leves (sem geometria) a partir dos arrays compartilhados.
+
+    Args:
+        spec: Descrição produzida por `SharedScenario.spec`
+        arrays: Arrays devolvidos por `attach_shared_scenario`
+        geometry: Geometria atribuída a todas as zonas e recursos (padrão: None)
+
+    Returns:
+        Tupla contendo lista de zonas e lista de recursos
+    """
+    zones = []
+    for i, (zone_id, name) in enumerate(zip(spec['zone_ids'], spec['zone_names'])):
+        zone = Zone(
+            id=zone_id,
+            name=name,
+            geometry=geometry,
+            population=int(arrays['zone.population'][i]),
+            damage_level=float(arrays['zone.damage_level'][i]),
+            infrastructure_damage=float(arrays['zone.infrastructure_damage'][i]),
+            accessibility=float(arrays['zone.accessibility'][i]),
+            critical_facilities=int(arrays['zone.critical_facilities'][i]),
+            historical_risk=float(arrays['zone.historical_risk'][i]),
+            priority_score=float(arrays['zone.priority_score'][i])
+        )
+        zones.append(zone)
+
+    resources = []
+    for i, (resource_id, name, resource_type) in enumerate(
+            zip(spec['resource_ids'], spec['resource_names'], spec['resource_types'])):
+        resources.append(Resource(
+            id=resource_id,
+            name=name,
+            type=resource_type,
+            capacity=int(arrays['resource.capacity'][i]),
+            location=geometry,
+            is_available=bool(arrays['resource.is_available'][i])
+        ))
+    return zones, resources
+
+
+def reset_scenario_objects(arrays: Dict[str, np.ndarray], zones: List[Zone], resources: List[Resource]) -> None:
+    """Desfaz alocações e restaura os valores originais dos objetos criados por `build_scenario_objects`."""
+    for i, zone in enumerate(zones):
+        zone.population = int(arrays['zone.population'][i])
+        zone.damage_level = float(arrays['zone.damage_level'][i])
+        zone.priority_score = float(arrays['zone.priority_score'][i])
+        zone.resources_allocated.clear()
+    for i, resource in enumerate(resources):
+        resource.is_available = bool(arrays['resource.is_available'][i])
+        resource.assigned_zones.clear()
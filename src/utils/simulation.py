@@ -0,0 +1,134 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import numpy as np
+from src.models.zone import Zone, MAX_DAMAGE_LEVEL
+from src.models.resource import Resource
+from src.models.allocation import ResourceAllocator
+from src.models.ml_models import DisasterPredictor, zone_to_features
+from src.utils.shared_scenario import (SharedScenario, build_scenario_objects, init_worker_scenario,
+                                       release_worker_scenario, reset_scenario_objects, worker_scenario)
+
+# Objetos reutilizados entre cenários em cada processo de trabalho
+_worker_state: Dict = {}
+
+
+@dataclass
+class SimulationResult:
+    zone_ids: List[str]
+    coverage_probability: np.ndarray
+    n_scenarios: int
+    elapsed_seconds: float
+
+    @property
+    def scenarios_per_second(self) -> float:
+        return self.n_scenarios / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return dict(zip(self.zone_ids, self.coverage_probability.tolist()))
+
+
+def simulate_coverage(zones: List[Zone], resources: List[Resource], n_scenarios: int = 1000,
+                      seed: Optional[int] = None, damage_sigma: float = 0.25,
+                      population_sigma: float = 0.2, predictor: Optional[DisasterPredictor] = None,
+                      prior_weight: float = 0.5, workers: Optional[int] = None,
+                      chunk_size: int = 50, allocator_class=ResourceAllocator) -> SimulationResult:
+    """
+    Simulação de Monte Carlo da alocação sob incerteza de dano e população.
+
+    Cada cenário sorteia o dano em torno de uma média que combina o dano observado e,
+    se houver um `predictor` treinado, a previsão do modelo (peso `prior_weight`), e
+    multiplica a população por um fator log-normal. O alocador é executado em cada
+    cenário; os arrays base ficam em memória compartilhada para os processos de trabalho.
+
+    Args:
+        zones: Lista de zonas afetadas
+        resources: Lista de recursos disponíveis
+        n_scenarios: Número de cenários simulados
+        seed: Semente do gerador (resultados reprodutíveis para qualquer número de processos)
+        damage_sigma: Desvio padrão do dano sorteado
+        population_sigma: Desvio padrão do logaritmo do fator de população
+        predictor: Modelo de previsão treinado usado como prior do dano
+        prior_weight: Peso da previsão na média do dano (0 a 1)
+        workers: Número de processos (padrão: número de CPUs; 1 executa no processo atual)
+        chunk_size: Cenários por tarefa enviada ao pool
+        allocator_class: Classe do alocador executado em cada cenário
+
+    Returns:
+        Probabilidade de cada zona receber ao menos um recurso
+    """
+    start = time.perf_counter()
+    damage = np.array([z.damage_level for z in zones], dtype=np.float64)
+    prior = damage
+    if predictor is not None and predictor.is_trained and zones:
+        predicted = np.asarray(predictor.predict([zone_to_features(z) for z in zones]), dtype=np.float64)
+        prior = (1.0 - prior_weight) * damage + prior_weight * predicted
+
+    # Sementes independentes por bloco de cenários: o resultado não depende da distribuição entre processos
+    chunks = [chunk_size] * (n_scenarios // chunk_size)
+    if n_scenarios % chunk_size:
+        chunks.append(n_scenarios % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    params = (damage_sigma, population_sigma)
+
+    covered = np.zeros(len(zones), dtype=np.int64)
+    workers = workers or os.cpu_count() or 1
+    with SharedScenario(zones, resources, extra={'damage_mean': prior}) as scenario:
+        if workers == 1:
+            _init_worker(scenario.spec, allocator_class)
+            try:
+                for chunk_seed, size in zip(seeds, chunks):
+                    covered += _simulate_chunk(chunk_seed, size, params)
+            finally:
+                _release_worker()
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(scenario.spec, allocator_class)) as executor:
+                for counts in executor.map(_simulate_chunk, seeds, chunks, [params] * len(chunks)):
+                    covered += counts
+
+    probability = covered / n_scenarios if n_scenarios else covered.astype(np.float64)
+    return SimulationResult(
+        zone_ids=[z.id for z in zones],
+        coverage_probability=probability,
+        n_scenarios=n_scenarios,
+        elapsed_seconds=time.perf_counter() - start
+    )
+
+
+def _init_worker(spec: Dict, allocator_class) -> None:
+    init_worker_scenario(spec)
+    zones, resources = build_scenario_objects(*worker_scenario())
+    _worker_state.update(zones=zones, resources=resources, allocator_class=allocator_class)
+
+
+def _release_worker() -> None:
+    _worker_state.clear()
+    release_worker_scenario()
+
+
+def _simulate_chunk(seed: np.random.SeedSequence, n_scenarios: int, params: tuple) -> np.ndarray:
+    damage_sigma, population_sigma = params
+    state = _worker_state
+    _, arrays = worker_scenario()
+    zones, resources = state['zones'], state['resources']
+    damage_mean = arrays['extra.damage_mean']
+    base_population = arrays['zone.population']
+
+    rng = np.random.default_rng(seed)
+    covered = np.zeros(len(zones), dtype=np.int64)
+    for _ in range(n_scenarios):
+        damage = np.clip(rng.normal(damage_mean, damage_sigma), 0.0, MAX_DAMAGE_LEVEL)
+        population = np.rint(base_population * np.exp(rng.normal(0.0, population_sigma, len(zones))))
+
+        reset_scenario_objects(arrays, zones, resources)
+        for zone, zone_damage, zone_population in zip(zones, damage.tolist(), population.tolist()):
+            zone.damage_level = zone_damage
+            zone.population = int(zone_population)
+            zone.calculate_priority()
+
+        state['allocator_class']().allocate_resources(zones, resources)
+        covered += np.fromiter((bool(z.resources_allocated) for z in zones), dtype=np.int64, count=len(zones))
+    return covered
@@ -0,0 +1,213 @@
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import numpy as np
+import shapely
+from src.models.zone import Zone
+from src.models.resource import Resource
+from src.utils.shared_scenario import RESOURCE_FIELDS, ZONE_FIELDS
+
+DEFAULT_SNAPSHOT_DIR = Path("data") / "snapshot"
+
+SNAPSHOT_VERSION = 1
+
+MANIFEST_NAME = "manifest.json"
+
+
+@dataclass
+class Snapshot:
+    """
+    Cenário gravado como arquivos `.npy` abertos com `mmap_mode='r'`: abrir um
+    snapshot só lê o manifesto; os arrays são paginados do disco quando acessados.
+
+    Zonas e recursos são recriados sem recalcular prioridades, e o grafo de rotas
+    é restaurado sem recalcular distâncias.
+    """
+    directory: Path
+    manifest: Dict
+    # Arrays mapeados em memória, por nome de arquivo (sem extensão)
+    arrays: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    @property
+    def zone_ids(self) -> List[str]:
+        return self.manifest['zone_ids']
+
+    @property
+    def resource_ids(self) -> List[str]:
+        return self.manifest['resource_ids']
+
+    @property
+    def disaster_info(self) -> Optional[Dict]:
+        info = self.manifest.get('disaster_info')
+        if info and isinstance(info.get('date'), str):
+            info = dict(info, date=date.fromisoformat(info['date']))
+        return info
+
+    def zones(self) -> List[Zone]:
+        offsets = self.arrays['zone.wkb_offsets']
+        buffer = self.arrays['zone.wkb']
+        wkb = [buffer[start:stop].tobytes() for start, stop in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+        geometries = shapely.from_wkb(wkb) if wkb else []
+        columns = [self.arrays[f'zone.{name}'].tolist() for name in ZONE_FIELDS]
+        return [
+            Zone(id=zone_id, name=name, geometry=geometry, **dict(zip(ZONE_FIELDS, values)))
+            for zone_id, name, geometry, *values
+            in zip(self.zone_ids, self.manifest['zone_names'], geometries, *columns)
+        ]
+
+    def resources(self) -> List[Resource]:
+        lonlat = self.arrays['resource.lonlat']
+        located = ~np.isnan(lonlat).any(axis=1)
+        points = np.full(len(lonlat), None, dtype=object)
+        points[located] = shapely.points(np.asarray(lonlat[located]))
+        columns = [self.arrays[f'resource.{name}'].tolist() for name in RESOURCE_FIELDS]
+        return [
+            Resource(id=resource_id, name=name, type=resource_type, location=point,
+                     **dict(zip(RESOURCE_FIELDS, values)))
+            for resource_id, name, resource_type, point, *values
+            in zip(self.resource_ids, self.manifest['resource_names'], self.manifest['resource_types'],
+                   points, *columns)
+        ]
+
+    def allocation_plan(self) -> Optional[Dict[str, List[str]]]:
+        if 'plan.indptr' not in self.arrays:
+            return None
+        indptr = self.arrays['plan.indptr'].tolist()
+        indices = self.arrays['plan.indices'].tolist()
+        resource_ids = self.resource_ids
+        return {zone_id: [resource_ids[k] for k in indices[indptr[i]:indptr[i + 1]]]
+                for i, zone_id in enumerate(self.zone_ids) if indptr[i + 1] > indptr[i]}
+
+    def route_optimizer(self):
+        """Otimizador de rotas com o grafo gravado, ou None se o snapshot não tem grafo."""
+        from src.models.ml_models import RouteOptimizer
+
+        if 'graph' not in self.manifest:
+            return None
+        graph = self.manifest['graph']
+        optimizer = RouteOptimizer(damage_aware=graph['damage_aware'])
+        optimizer.restore_graph(graph['zone_ids'], graph['resource_ids'],
+                                {name.removeprefix('graph.'): values
+                                 for name, values in self.arrays.items() if name.startswith('graph.')})
+        return optimizer
+
+
+def save_snapshot(directory: Union[str, Path], zones: List[Zone], resources: List[Resource],
+                  route_optimizer=None, allocation_plan: Optional[Dict[str, List[str]]] = None,
+                  disaster_info: Optional[Dict] = None) -> Path:
+    """
+    Grava o cenário em um diretório de arquivos `.npy`: colunas numéricas das zonas e
+    recursos, geometrias em um único buffer WKB com deslocamentos, o grafo de rotas em
+    CSR e o plano de alocação em CSR (zona -> índices de recursos).
+
+    A gravação é atômica: os arquivos são escritos em um diretório temporário que
+    substitui o anterior ao final, então um processo lendo o snapshot nunca vê um
+    estado parcial.
+    """
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+
+    arrays: Dict[str, np.ndarray] = {}
+    for name, dtype in ZONE_FIELDS.items():
+        arrays[f'zone.{name}'] = np.array([getattr(z, name) for z in zones], dtype=dtype)
+    wkb = shapely.to_wkb(np.array([z.geometry for z in zones], dtype=object)).tolist() if zones else []
+    offsets = np.zeros(len(wkb) + 1, dtype=np.int64)
+    np.cumsum([len(blob) for blob in wkb], out=offsets[1:])
+    arrays['zone.wkb'] = np.frombuffer(b''.join(wkb), dtype=np.uint8)
+    arrays['zone.wkb_offsets'] = offsets
+
+    for name, dtype in RESOURCE_FIELDS.items():
+        arrays[f'resource.{name}'] = np.array([getattr(r, name) for r in resources], dtype=dtype)
+    arrays['resource.lonlat'] = np.array(
+        [(r.location.x, r.location.y) if r.location is not None else (np.nan, np.nan) for r in resources],
+        dtype=np.float64
+    ).reshape(-1, 2)
+
+    manifest = {
+        'version': SNAPSHOT_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'zone_ids': [z.id for z in zones],
+        'zone_names': [z.name for z in zones],
+        'resource_ids': [r.id for r in resources],
+        'resource_names': [r.name for r in resources],
+        'resource_types': [r.type for r in resources],
+        'disaster_info': disaster_info,
+    }
+
+    if allocation_plan is not None:
+        resource_index = {r.id: k for k, r in enumerate(resources)}
+        rows = [[resource_index[r] for r in allocation_plan.get(z.id, ()) if r in resource_index] for z in zones]
+        indptr = np.zeros(len(zones) + 1, dtype=np.int64)
+        np.cumsum([len(row) for row in rows], out=indptr[1:])
+        arrays['plan.indptr'] = indptr
+        arrays['plan.indices'] = np.array([k for row in rows for k in row], dtype=np.int64)
+
+    if route_optimizer is not None:
+        zone_ids, resource_ids, graph_arrays = route_optimizer.export_graph()
+        manifest['graph'] = {'zone_ids': zone_ids, 'resource_ids': resource_ids,
+                             'damage_aware': route_optimizer.damage_aware}
+        arrays.update({f'graph.{name}': values for name, values in graph_arrays.items()})
+
+    staging = Path(tempfile.mkdtemp(prefix=f".{directory.name}-", dir=directory.parent))
+    try:
+        for name, values in arrays.items():
+            np.save(staging / f"{name}.npy", np.ascontiguousarray(values), allow_pickle=False)
+        manifest['arrays'] = sorted(arrays)
+        with open(staging / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, default=_json_default)
+
+        previous = directory.with_name(f".{directory.name}-old")
+        if directory.exists():
+            shutil.rmtree(previous, ignore_errors=True)
+            os.replace(directory, previous)
+        os.replace(staging, directory)
+        shutil.rmtree(previous, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return directory
+
+
+def load_snapshot(directory: Union[str, Path]) -> Optional[Snapshot]:
+    """
+    Abre um snapshot com os arrays mapeados em memória (somente leitura).
+
+    Returns:
+        O snapshot, ou None se o diretório não contém um snapshot desta versão
+    """
+    directory = Path(directory)
+    try:
+        with open(directory / MANIFEST_NAME, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    if manifest.get('version') != SNAPSHOT_VERSION:
+        return None
+    arrays = {}
+    for name in manifest['arrays']:
+        arrays[name] = np.load(directory / f"{name}.npy", mmap_mode='r', allow_pickle=False)
+    return Snapshot(directory=directory, manifest=manifest, arrays=arrays)
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def apply_allocation_plan(zones: List[Zone], resources: List[Resource], plan: Dict[str, List[str]]) -> None:
+    """Marca em zonas e recursos um plano gravado, sem executar o alocador."""
+    resources_by_id = {r.id: r for r in resources}
+    for zone in zones:
+        for resource_id in plan.get(zone.id, ()):
+            resource = resources_by_id.get(resource_id)
+            if resource is not None:
+                resource.assign_to_zone(zone.id)
+                zone.add_resource(resource_id)
@@ -0,0 +1,203 @@
+import multiprocessing
+import os
+import time
+from multiprocessing.connection import wait
+from typing import Callable, Dict, List, Optional
+import numpy as np
+import pandas as pd
+import shapely
+from src.models.zone import Zone
+from src.models.resource import Resource
+from src.models.allocation import ResourceAllocator as PriorityAllocator
+from src.utils.geometry import resource_coordinates, zone_geometry
+from src.utils.resource_allocator import ResourceAllocator
+from src.utils.shared_scenario import (SharedScenario, build_scenario_objects,
+                                       init_worker_scenario, worker_scenario)
+
+# Estratégias de alocação: recebem zonas e recursos e devolvem {zone_id: [resource_id, ...]}
+AllocationStrategy = Callable[[List[Zone], List[Resource]], Dict[str, List[str]]]
+ALLOCATION_STRATEGIES: Dict[str, AllocationStrategy] = {}
+
+RESULT_COLUMNS = ['strategy', 'status', 'runtime_s', 'coverage_rate', 'weighted_priority_served', 'error']
+
+
+def register_strategy(name: str) -> Callable[[AllocationStrategy], AllocationStrategy]:
+    """
+    Registra uma estratégia de alocação para comparação.
+
+    A função deve estar definida no nível de um módulo para poder ser executada
+    nos processos de trabalho.
+    """
+    def decorator(strategy: AllocationStrategy) -> AllocationStrategy:
+        ALLOCATION_STRATEGIES[name] = strategy
+        return strategy
+    return decorator
+
+
+@register_strategy('greedy_priority')
+def greedy_priority(zones: List[Zone], resources: List[Resource]) -> Dict[str, List[str]]:
+    # src/models/allocation.py: até 3 recursos por zona, capacidade = número de zonas atendidas
+    return PriorityAllocator().allocate_resources(zones, resources)
+
+
+@register_strategy('greedy_population')
+def greedy_population(zones: List[Zone], resources: List[Resource]) -> Dict[str, List[str]]:
+    # src/utils/resource_allocator.py: recursos exclusivos até cobrir a população da zona
+    allocation = ResourceAllocator().allocate_resources(zones, resources)
+    return {zone_id: [r.id for r in allocated] for zone_id, allocated in allocation.items()}
+
+
+@register_strategy('partitioned')
+def partitioned(zones: List[Zone], resources: List[Resource]) -> Dict[str, List[str]]:
+    # src/utils/partitioned_allocation.py: o alocador de greedy_population por regiões, com
+    # reconciliação; as regiões rodam no processo da estratégia, que já roda em paralelo às outras
+    from src.utils.partitioned_allocation import allocate_partitioned
+
+    return allocate_partitioned(zones, resources, workers=1).plan
+
+
+def compare_strategies(zones: List[Zone], resources: List[Resource],
+                       strategies: Optional[List[str]] = None, deadline: float = 2.0,
+                       workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Executa estratégias de alocação em paralelo sobre o mesmo cenário compartilhado.
+
+    Cada estratégia roda em um processo próprio (iniciado com "spawn", seguro com as
+    threads de renderização do painel) e recebe sua própria cópia dos objetos,
+    reconstruída a partir dos arrays somente leitura em memória compartilhada; as
+    zonas e recursos informados não são alterados. O prazo de cada estratégia conta
+    a partir do momento em que ela começa a executar, não da submissão: com menos
+    processos que estratégias, as da fila esperam sem gastar o próprio prazo.
+    Estratégias que não terminam dentro de `deadline` segundos são interrompidas e
+    marcadas como "timeout".
+
+    Args:
+        zones: Lista de zonas afetadas
+        resources: Lista de recursos disponíveis
+        strategies: Nomes registrados a comparar (padrão: todos)
+        deadline: Tempo máximo por estratégia, em segundos
+        workers: Número de processos (padrão: uma por estratégia, limitado às CPUs)
+
+    Returns:
+        Tabela com tempo de execução, taxa de cobertura e prioridade ponderada atendida
+    """
+    names = list(strategies or ALLOCATION_STRATEGIES)
+    unknown = [name for name in names if name not in ALLOCATION_STRATEGIES]
+    if unknown:
+        raise ValueError(f"Estratégia desconhecida: {unknown[0]}")
+    if not names:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+
+    workers = workers or min(len(names), os.cpu_count() or 1)
+    context = multiprocessing.get_context('spawn')
+    results: Dict[str, Dict] = {}
+    waiting = list(names)
+    # Por estratégia em execução: processo, conexão de leitura e início (None enquanto inicia)
+    running: Dict[str, list] = {}
+    # Centroides das zonas e bases dos recursos, para estratégias que usam distâncias
+    centroids = zone_geometry(zones).centroids
+    coordinates = resource_coordinates(resources)
+    extra = {'zone_lon': centroids[:, 0], 'zone_lat': centroids[:, 1],
+             'resource_lon': coordinates[:, 0], 'resource_lat': coordinates[:, 1]}
+    with SharedScenario(zones, resources, extra=extra) as scenario:
+        try:
+            while waiting or running:
+                while waiting and len(running) < workers:
+                    name = waiting.pop(0)
+                    # Um pipe por processo: encerrar um processo não corrompe o canal dos outros
+                    receiver, sender = context.Pipe(duplex=False)
+                    process = context.Process(target=_strategy_process, args=(scenario.spec, name, sender),
+                                              daemon=True)
+                    process.start()
+                    sender.close()
+                    running[name] = [process, receiver, None]
+
+                deadlines = [started + deadline for _, _, started in running.values() if started is not None]
+                timeout = max(0.0, min(deadlines) - time.perf_counter()) if deadlines else None
+                connections = {receiver: name for name, (_, receiver, _) in running.items()}
+                for receiver in wait(list(connections), timeout):
+                    name = connections[receiver]
+                    try:
+                        kind, payload = receiver.recv()
+                    except EOFError:
+                        # Processo encerrado sem resultado (por exemplo, sem memória)
+                        process = running[name][0]
+                        process.join()
+                        kind, payload = 'result', {'strategy': name, 'status': 'error',
+                                                   'error': f"processo encerrado com código {process.exitcode}"}
+                    if kind == 'started':
+                        running[name][2] = time.perf_counter()
+                    else:
+                        results[name] = payload
+                        _stop_strategy(running.pop(name))
+
+                now = time.perf_counter()
+                for name, (_, _, started) in list(running.items()):
+                    if started is not None and now - started >= deadline:
+                        _stop_strategy(running.pop(name))
+                        results[name] = {'strategy': name, 'status': 'timeout', 'runtime_s': deadline}
+        finally:
+            # Encerra estratégias que ainda estejam executando (por exemplo, após uma interrupção)
+            for entry in running.values():
+                _stop_strategy(entry)
+
+    return pd.DataFrame([results[name] for name in names], columns=RESULT_COLUMNS)
+
+
+def _stop_strategy(entry: list) -> None:
+    process, receiver, _ = entry
+    if process.is_alive():
+        process.terminate()
+    process.join()
+    receiver.close()
+
+
+def _strategy_process(spec: Dict, name: str, sender) -> None:
+    # Processo de uma estratégia: avisa quando começa e envia o resultado (ou o erro)
+    init_worker_scenario(spec)
+    try:
+        result = _run_strategy(name, lambda: sender.send(('started', None)))
+    except Exception as e:
+        result = {'strategy': name, 'status': 'error', 'error': str(e)}
+    sender.send(('result', result))
+    sender.close()
+
+
+def _run_strategy(name: str, on_start: Callable[[], None] = lambda: None) -> Dict:
+    spec, arrays = worker_scenario()
+    zones, resources = build_scenario_objects(spec, arrays)
+    for items, prefix, attribute in ((zones, 'zone', 'geometry'), (resources, 'resource', 'location')):
+        # Objetos reconstruídos sem geometria: zonas viram o próprio centroide e recursos a base
+        lon, lat = arrays[f'extra.{prefix}_lon'], arrays[f'extra.{prefix}_lat']
+        points = shapely.points(lon, lat)
+        points[np.isnan(lon) | np.isnan(lat)] = None
+        for item, point in zip(items, points.tolist()):
+            setattr(item, attribute, point)
+
+    on_start()
+    start = time.perf_counter()
+    plan = ALLOCATION_STRATEGIES[name](zones, resources)
+    runtime = time.perf_counter() - start
+
+    # As estratégias podem não atualizar os objetos; as métricas partem do plano devolvido
+    zones_by_id = {zone.id: zone for zone in zones}
+    resources_by_id = {resource.id: resource for resource in resources}
+    for zone in zones:
+        zone.resources_allocated.clear()
+    for resource in resources:
+        resource.assigned_zones.clear()
+    for zone_id, resource_ids in plan.items():
+        for resource_id in resource_ids:
+            zones_by_id[zone_id].add_resource(resource_id)
+            resources_by_id[resource_id].assigned_zones[zone_id] = None
+
+    metrics = ResourceAllocator().calculate_allocation_metrics(zones, resources)
+    total_priority = sum(zone.priority_score for zone in zones)
+    served_priority = sum(zone.priority_score for zone in zones if zone.resources_allocated)
+    return {
+        'strategy': name,
+        'status': 'ok',
+        'runtime_s': runtime,
+        'coverage_rate': metrics['coverage_rate'],
+        'weighted_priority_served': served_priority / total_priority if total_priority else 0.0
+    }
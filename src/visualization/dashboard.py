@@ -1,8 +1,11 @@
 import streamlit as st
-import plotly.express as px
-from typing import List
+from typing import TYPE_CHECKING, Dict, List, Optional
 from src.models.zone import Zone
 from src.models.resource import Resource
+from src.visualization.render_cache import render_key
+
+if TYPE_CHECKING:
+    from src.visualization.render_cache import DeferredOutput
 
 class Dashboard:
     def __init__(self):
@@ -39,20 +42,15 @@ class Dashboard:
             st.metric("Dano Médio", f"{self.metrics['average_damage']:.2f}")
             st.metric("População Total", self.metrics['total_population'])
 
-    def display_damage_distribution(self, zones: List[Zone]) -> None:
+    def display_damage_distribution(self, zones: List[Zone], output: Optional['DeferredOutput'] = None) -> None:
         if not zones:
             return
         damage_levels = [int(z.damage_level) for z in zones]
         damage_counts = {level: damage_levels.count(level) for level in range(5)}
-        fig = px.bar(
-            x=list(damage_counts.keys()),
-            y=list(damage_counts.values()),
-            labels={'x': 'Nível de Dano', 'y': 'Número de Zonas'},
-            title='Distribuição de Níveis de Dano'
-        )
-        st.plotly_chart(fig)
+        self._show_figure(output, render_key('damage_distribution', damage_counts),
+                          lambda: damage_distribution_figure(damage_counts))
 
-    def display_resource_allocation(self, resources: List[Resource]) -> None:
+    def display_resource_allocation(self, resources: List[Resource], output: Optional['DeferredOutput'] = None) -> None:
         if not resources:
             return
         resource_types = {}
@@ -62,21 +60,40 @@ class Dashboard:
             resource_types[resource.type]['total'] += 1
             if getattr(resource, 'assigned_zones', None):
                 resource_types[resource.type]['allocated'] += 1
-        types = list(resource_types.keys())
-        total = [resource_types[t]['total'] for t in types]
-        allocated = [resource_types[t]['allocated'] for t in types]
-        df = {
-            "Tipo": types,
-            "Total": total,
-            "Alocados": allocated
-        }
-        fig = px.bar(
-            df,
-            x="Tipo",
-            y=["Total", "Alocados"],
-            barmode="group",
-            title="Alocação de Recursos por Tipo"
-        )
-        st.plotly_chart(fig)
+        self._show_figure(output, render_key('resource_allocation', resource_types),
+                          lambda: resource_allocation_figure(resource_types))
+
+    @staticmethod
+    def _show_figure(output: Optional['DeferredOutput'], key: str, build) -> None:
+        # Com `output`, a figura vem do cache de renderização (ou é gerada em segundo plano)
+        if output is None:
+            st.plotly_chart(build())
+        else:
+            output.plotly(key, lambda: build().to_json())
+
+
+def damage_distribution_figure(damage_counts: Dict[int, int]):
+    import plotly.express as px
+    return px.bar(
+        x=list(damage_counts.keys()),
+        y=list(damage_counts.values()),
+        labels={'x': 'Nível de Dano', 'y': 'Número de Zonas'},
+        title='Distribuição de Níveis de Dano'
+    )
+
 
- 
\ No newline at end of file
+def resource_allocation_figure(resource_types: Dict[str, Dict[str, int]]):
+    import plotly.express as px
+    types = list(resource_types.keys())
+    df = {
+        "Tipo": types,
+        "Total": [resource_types[t]['total'] for t in types],
+        "Alocados": [resource_types[t]['allocated'] for t in types]
+    }
+    return px.bar(
+        df,
+        x="Tipo",
+        y=["Total", "Alocados"],
+        barmode="group",
+        title="Alocação de Recursos por Tipo"
+    )
@@ -1,8 +1,12 @@
-import folium
-from typing import List, Dict
+from typing import List, Dict, Optional, TYPE_CHECKING
 from shapely.geometry import mapping
 from src.models.zone import Zone
 from src.models.resource import Resource
+from src.utils.geometry import zone_geometry
+
+if TYPE_CHECKING:
+    import folium
+    from src.utils.hexgrid import HexAggregation
 
 class DamageMap:
     def __init__(self):
@@ -15,10 +19,13 @@ class DamageMap:
             4: '#800000'   # Destruição total
         }
 
-    def create_map(self, zones: List[Zone], resources: List[Resource], center: List[float] = None) -> folium.Map:
+    def create_map(self, zones: List[Zone], resources: List[Resource], center: List[float] = None) -> 'folium.Map':
         if not zones:
             return None
 
+        # folium só é importado quando um mapa é de fato construído
+        import folium
+
         # Calcular centro se não fornecido
         if not center:
             center = self._calculate_center(zones)
@@ -49,26 +56,70 @@ class DamageMap:
 
         return self.map
 
+    def create_hex_map(self, aggregation: 'HexAggregation', resolution: int,
+                       resources: Optional[List[Resource]] = None, center: List[float] = None) -> 'folium.Map':
+        """
+        Mapa agregado: um hexágono por célula da resolução, colorido pelo dano médio,
+        em uma única camada GeoJSON (o custo não cresce com o número de zonas).
+        """
+        cells = aggregation.frame(resolution)
+        if cells.empty:
+            return None
+        import folium
+
+        if not center:
+            center = [float(cells['lat'].mean()), float(cells['lon'].mean())]
+        self.map = folium.Map(location=center, zoom_start=8, tiles='CartoDB positron')
+
+        rings = aggregation.grid.polygons(cells['cell'].to_numpy(), resolution)
+        features = [{
+            'type': 'Feature',
+            'geometry': {'type': 'Polygon', 'coordinates': [ring]},
+            'properties': {
+                'celula': label,
+                'zonas': int(count),
+                'populacao': f"{population:,}",
+                'dano_medio': round(damage, 2),
+                'prioridade_media': round(priority, 2),
+                'cor': self.colors.get(int(damage), '#808080')
+            }
+        } for ring, label, count, population, damage, priority in zip(
+            rings, cells['label'], cells['zones'].tolist(), cells['population'].tolist(),
+            cells['mean_damage'].tolist(), cells['mean_priority'].tolist()
+        )]
+        folium.GeoJson(
+            {'type': 'FeatureCollection', 'features': features},
+            style_function=lambda feature: {
+                'fillColor': feature['properties']['cor'],
+                'color': 'black',
+                'weight': 1,
+                'fillOpacity': 0.6
+            },
+            tooltip=folium.GeoJsonTooltip(
+                fields=['celula', 'zonas', 'populacao', 'dano_medio', 'prioridade_media'],
+                aliases=['Célula', 'Zonas', 'População', 'Dano Médio', 'Prioridade Média']
+            ),
+            name='Células'
+        ).add_to(self.map)
+
+        for resource in resources or []:
+            self._add_resource(resource)
+
+        folium.LayerControl().add_to(self.map)
+        return self.map
+
     def _calculate_center(self, zones: List[Zone]) -> List[float]:
         if not zones:
             return [-19.9167, -44.1667]  # Coordenadas de Brumadinho
 
-        # Calcular centroide de todas as zonas
-        total_lat = 0
-        total_lon = 0
-        count = 0
-
-        for zone in zones:
-            centroid = zone.geometry.centroid
-            total_lat += centroid.y
-            total_lon += centroid.x
-            count += 1
-
-        return [total_lat / count, total_lon / count]
+        # Calcular centroide de todas as zonas a partir do cache de geometria
+        centroids = zone_geometry(zones).centroids
+        return [float(centroids[:, 1].mean()), float(centroids[:, 0].mean())]
 
     def _add_zone(self, zone: Zone) -> None:
         if not self.map:
             return
+        import folium
 
         # Converter geometria para GeoJSON
         geojson = mapping(zone.geometry)
@@ -96,8 +147,10 @@ class DamageMap:
         ).add_to(self.map)
 
     def _add_resource(self, resource: Resource) -> None:
-        if not self.map:
+        # Recursos importados sem base ainda não têm posição no mapa
+        if not self.map or resource.location is None or resource.location.is_empty:
             return
+        import folium
 
         # Definir ícones por tipo de recurso
         icon_map = {
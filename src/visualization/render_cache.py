@@ -0,0 +1,180 @@
+import dataclasses
+import hashlib
+import pickle
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from src.models.zone import Zone
+from src.models.resource import Resource
+from src.utils.cache import LRUCache
+
+# Mapas e figuras renderizados mantidos em memória
+RENDER_CACHE_ENTRIES = 64
+
+# Threads de renderização em segundo plano
+RENDER_WORKERS = 2
+
+# Espera máxima, no fim da página, por uma renderização pendente (s)
+RENDER_TIMEOUT = 60.0
+
+
+def render_key(kind: str, *inputs) -> str:
+    """Chave de cache: tipo da saída + hash de todos os dados que a determinam."""
+    digest = hashlib.blake2b(pickle.dumps(inputs, protocol=pickle.HIGHEST_PROTOCOL), digest_size=16)
+    return f"{kind}:{digest.hexdigest()}"
+
+
+def map_inputs(zones: List[Zone], resources: List[Resource]) -> Tuple:
+    """Tudo o que o mapa exibe: geometrias, valores dos popups e quantidade de alocações."""
+    return (
+        tuple((z.id, z.name, z.geometry.wkb if z.geometry is not None else None, z.damage_level, z.population,
+               z.priority_score, len(z.resources_allocated)) for z in zones),
+        tuple((r.id, r.type, r.capacity, r.location.wkb if r.location is not None else None,
+               len(r.assigned_zones)) for r in resources)
+    )
+
+
+def snapshot_scenario(zones: List[Zone], resources: List[Resource]) -> Tuple[List[Zone], List[Resource]]:
+    """
+    Cópias rasas para renderizar em outra thread: alocações feitas depois na página
+    não alteram um mapa que já está sendo gerado.
+    """
+    return ([dataclasses.replace(z, resources_allocated=z.resources_allocated) for z in zones],
+            [dataclasses.replace(r, assigned_zones=r.assigned_zones) for r in resources])
+
+
+class RenderCache:
+    """
+    HTML de mapas e JSON de figuras Plotly por chave de entrada, com renderização em
+    segundo plano.
+
+    `submit` devolve um `Future` já resolvido quando a chave está em cache; senão,
+    agenda a renderização em um pool de threads (uma única vez por chave, mesmo com
+    várias sessões pedindo a mesma saída) e guarda o resultado ao terminar.
+    """
+
+    def __init__(self, max_entries: int = RENDER_CACHE_ENTRIES, workers: int = RENDER_WORKERS):
+        self._cache = LRUCache(max_entries)
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='render')
+        self.renders = 0
+        self.failures = 0
+
+    def lookup(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._cache.get(key)
+
+    def submit(self, key: str, render: Callable[[], str]) -> Future:
+        with self._lock:
+            value = self._cache.get(key)
+            if value is not None:
+                done = Future()
+                done.set_result(value)
+                return done
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pending[key] = self._executor.submit(self._render, key, render)
+            return future
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = self._cache.stats()
+            stats.update(pending=len(self._pending), renders=self.renders, failures=self.failures)
+            return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _render(self, key: str, render: Callable[[], str]) -> str:
+        try:
+            value = render()
+        except Exception:
+            with self._lock:
+                self.failures += 1
+                self._pending.pop(key, None)
+            raise
+        with self._lock:
+            self._cache.put(key, value)
+            self._pending.pop(key, None)
+            self.renders += 1
+        return value
+
+
+_shared_cache: Optional[RenderCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_render_cache() -> RenderCache:
+    """Cache de renderização único do processo, compartilhado por todas as páginas e sessões."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = RenderCache()
+        return _shared_cache
+
+
+class DeferredOutput:
+    """
+    Exibe saídas do `RenderCache` em uma página Streamlit sem bloquear o restante.
+
+    Acertos são exibidos na hora; falhas deixam um espaço reservado com aviso, a
+    página continua sendo executada (métricas e tabelas aparecem imediatamente) e
+    `flush`, chamado no fim do script, preenche os espaços quando as renderizações
+    terminam.
+    """
+
+    def __init__(self, cache: RenderCache):
+        self.cache = cache
+        self._pending: List[Tuple[object, Future, Callable[[str], None]]] = []
+
+    def html(self, key: str, render: Callable[[], str], height: int = 600) -> None:
+        import streamlit as st
+        self._show(key, render, lambda value: st.components.v1.html(value, height=height))
+
+    def plotly(self, key: str, render: Callable[[], str]) -> None:
+        import streamlit as st
+        self._show(key, render, lambda value: st.plotly_chart(_figure(value)))
+
+    def flush(self, timeout: float = RENDER_TIMEOUT) -> None:
+        pending, self._pending = self._pending, []
+        for placeholder, future, show in pending:
+            try:
+                value = future.result(timeout=timeout)
+            except Exception as e:
+                placeholder.error(f"Erro ao renderizar: {e}")
+                continue
+            with placeholder.container():
+                show(value)
+
+    def _show(self, key: str, render: Callable[[], str], show: Callable[[str], None]) -> None:
+        import streamlit as st
+        future = self.cache.submit(key, render)
+        if future.done() and future.exception() is None:
+            show(future.result())
+            return
+        placeholder = st.empty()
+        placeholder.info("Gerando visualização...")
+        self._pending.append((placeholder, future, show))
+
+
+def deferred_map(output: DeferredOutput, zones: List[Zone], resources: List[Resource], height: int = 600) -> None:
+    """Mapa de zonas e recursos via cache; as cópias para a thread só são feitas em uma falha."""
+    key = render_key('map', map_inputs(zones, resources))
+    snapshot = snapshot_scenario(zones, resources) if output.cache.lookup(key) is None else (zones, resources)
+    output.html(key, lambda: map_html(*snapshot), height=height)
+
+
+def map_html(zones: List[Zone], resources: List[Resource]) -> str:
+    from src.visualization.map import DamageMap
+    map_obj = DamageMap().create_map(zones, resources)
+    return map_obj._repr_html_() if map_obj else ''
+
+
+def _figure(value: str):
+    import plotly.io as pio
+    return pio.from_json(value)